@@ -0,0 +1,91 @@
+"""
+Compare the vectorized EligibilityIndex against per-scheme check_eligibility,
+and measure the profile-bucket cache on a second pass over the same profiles.
+
+Run from the backend directory:
+    python -m benchmarks.eligibility_benchmark [--profiles 2000]
+"""
+import argparse
+import json
+import random
+import time
+import numpy as np
+from services.scheme_extractor import STATES, normalize_schemes
+from services.eligibility_index import EligibilityIndex, check_eligibility
+
+GENDERS = ['male', 'female', 'other']
+CASTES = ['SC', 'ST', 'OBC', 'General']
+OCCUPATIONS = ['farmer', 'student', 'unemployed', 'worker', 'self-employed']
+RESIDENCES = ['rural', 'urban']
+
+
+def random_profile(rng):
+    return {
+        'age': rng.randint(0, 90),
+        'gender': rng.choice(GENDERS),
+        'family_income': rng.choice([0, 50000, 100000, 250000, 800000, 2500000, rng.randint(0, 3000000)]),
+        'caste': rng.choice(CASTES),
+        'occupation': rng.choice(OCCUPATIONS),
+        'residence': rng.choice(RESIDENCES),
+        'state': rng.choice([s.title() for s in STATES] + ['Ladakh']),
+        'interests': '',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default='myscheme_raw.json')
+    parser.add_argument('--profiles', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        schemes = normalize_schemes(json.load(f))
+
+    start = time.perf_counter()
+    index = EligibilityIndex(schemes)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(args.seed)
+    profiles = [random_profile(rng) for _ in range(args.profiles)]
+
+    scalar_times = []
+    vector_times = []
+    for profile in profiles:
+        start = time.perf_counter()
+        expected = [i for i, s in enumerate(schemes) if check_eligibility(s, profile)]
+        scalar_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual = index.eligible_indices(profile)
+        vector_times.append(time.perf_counter() - start)
+
+        if actual.tolist() != expected:
+            raise SystemExit(f"Mismatch for profile {profile}")
+
+    # Fresh profiles fill the cache; the checks prove bucketed keys never collide wrongly
+    cached_index = EligibilityIndex(schemes, cache_size=len(profiles))
+    for profile in profiles:
+        if cached_index.eligible_indices(profile).tolist() != index.eligible_indices(profile).tolist():
+            raise SystemExit(f"Cached mismatch for profile {profile}")
+    cached_times = []
+    for profile in profiles:
+        start = time.perf_counter()
+        cached_index.eligible_indices(profile)
+        cached_times.append(time.perf_counter() - start)
+
+    scalar_us = np.array(scalar_times) * 1e6
+    vector_us = np.array(vector_times) * 1e6
+    print(f"Schemes: {index.size}, profiles: {len(profiles)} (all results identical)")
+    print(f"Index build: {build_ms:.2f} ms")
+    print(f"check_eligibility loop: p50 {np.percentile(scalar_us, 50):.1f} us, p99 {np.percentile(scalar_us, 99):.1f} us")
+    print(f"EligibilityIndex mask:  p50 {np.percentile(vector_us, 50):.1f} us, p99 {np.percentile(vector_us, 99):.1f} us")
+    print(f"Speedup (p50): {np.percentile(scalar_us, 50) / np.percentile(vector_us, 50):.1f}x")
+    cached_us = np.array(cached_times) * 1e6
+    stats = cached_index.cache_stats()
+    print(f"Profile-bucket cache:   p50 {np.percentile(cached_us, 50):.1f} us, p99 {np.percentile(cached_us, 99):.1f} us "
+          f"({stats['entries']} distinct buckets for {len(profiles)} profiles)")
+
+
+if __name__ == '__main__':
+    main()
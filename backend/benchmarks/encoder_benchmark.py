@@ -0,0 +1,183 @@
+"""
+Compare the scheme encoder backends and vector storage widths.
+
+Encoder backends (torch, onnx, onnx_int8) are checked for cosine parity against
+the torch embeddings and for top-k agreement on the real corpus, then timed
+on single queries and on batched corpus encoding. Each backend runs in its own
+process so the reported RSS is not shared with the others.
+
+Vector storage (float32, float16, int8, pq) is compared on bytes per vector,
+reconstruction cosine and recall@k against the float32 flat index.
+
+Run from the backend directory:
+    python -m benchmarks.encoder_benchmark [--backends torch onnx_int8] [--min-cosine 0.98]
+
+Exits non-zero when a backend's minimum cosine similarity to torch falls
+below --min-cosine, so it can gate switching SCHEME_ENCODER_BACKEND.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+import numpy as np
+import faiss
+from config.settings import settings
+from services.scheme_encoder import ENCODER_BACKENDS, load_encoder
+from services.scheme_extractor import normalize_schemes
+from services.scheme_index import VECTOR_STORAGES, SchemeIndexBuilder
+from benchmarks.index_benchmark import build_queries
+
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_backend(backend, summaries, queries, batch_size, result_queue):
+    """Runs in a child process: load one backend, time it and send back its embeddings"""
+    try:
+        baseline_rss = rss_mb()
+        start = time.perf_counter()
+        model = load_encoder(settings.SCHEME_EMBEDDING_MODEL, backend, settings.SCHEME_ONNX_FILE)
+        load_seconds = time.perf_counter() - start
+
+        model.encode(queries[:8], convert_to_numpy=True)  # warm-up
+        latencies = []
+        query_vectors = []
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(model.encode([query], convert_to_numpy=True)[0])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        corpus = model.encode(summaries, convert_to_numpy=True, batch_size=batch_size, show_progress_bar=False)
+        corpus_seconds = time.perf_counter() - start
+
+        latencies_ms = np.array(latencies) * 1000
+        result_queue.put({
+            'backend': backend,
+            'load_seconds': load_seconds,
+            'rss_mb': rss_mb() - baseline_rss,
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99)),
+            'docs_per_second': len(summaries) / corpus_seconds,
+            'queries': np.asarray(query_vectors, dtype='float32'),
+            'corpus': np.asarray(corpus, dtype='float32'),
+        })
+    except Exception as e:
+        result_queue.put({'backend': backend, 'error': str(e)})
+
+
+def measure_backend(backend, summaries, queries, batch_size):
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=run_backend, args=(backend, summaries, queries, batch_size, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def cosine_rows(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.einsum('ij,ij->i', a, b)
+
+
+def top_k(corpus, queries, k):
+    builder = SchemeIndexBuilder('flat_ip')
+    index = builder.build(builder.prepare(corpus))
+    return index.search(builder.prepare(queries), k)[1]
+
+
+def overlap(found, truth, k):
+    return float(np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(truth))]))
+
+
+def compare_backends(args, summaries, queries):
+    results = {}
+    for backend in args.backends:
+        print(f"Running {backend}...")
+        results[backend] = measure_backend(backend, summaries, queries, args.batch_size)
+
+    reference = results.get('torch')
+    header = (f"{'backend':<12}{'load s':>9}{'RSS MB':>9}{'p50 ms':>9}{'p99 ms':>9}{'docs/s':>9}"
+              f"{'min cos':>10}{'mean cos':>10}{'top-k agree':>13}")
+    print('\n' + header)
+    print('-' * len(header))
+
+    failed = False
+    for backend, result in results.items():
+        if 'error' in result:
+            print(f"{backend:<12}unavailable: {result['error']}")
+            continue
+        parity = ''
+        if reference is not None and 'error' not in reference and backend != 'torch':
+            cosines = np.concatenate([cosine_rows(result['queries'], reference['queries']),
+                                      cosine_rows(result['corpus'], reference['corpus'])])
+            agreement = overlap(top_k(result['corpus'], result['queries'], args.k),
+                                top_k(reference['corpus'], reference['queries'], args.k), args.k)
+            parity = f"{cosines.min():>10.4f}{cosines.mean():>10.4f}{agreement:>13.4f}"
+            failed = failed or cosines.min() < args.min_cosine
+        print(f"{backend:<12}{result['load_seconds']:>9.2f}{result['rss_mb']:>9.0f}{result['p50_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{result['docs_per_second']:>9.1f}{parity}")
+
+    return reference, failed
+
+
+def compare_storage(args, corpus, queries):
+    truth = top_k(corpus, queries, args.k)
+    header = f"{'storage':<12}{'bytes/vec':>11}{'index MB':>10}{'min cos':>10}{'mean cos':>10}{'recall@k':>10}"
+    print('\n' + header)
+    print('-' * len(header))
+    for storage in VECTOR_STORAGES:
+        builder = SchemeIndexBuilder('flat_ip', vector_storage=storage, pq_m=args.pq_m)
+        vectors = builder.prepare(corpus)
+        index = builder.build(vectors)
+        stored, scale = builder.compress(vectors)
+        if storage == 'pq':
+            reconstructed = index.reconstruct_n(0, index.ntotal)
+            bytes_per_vector = faiss.downcast_index(index).pq.code_size
+        else:
+            reconstructed = builder.decompress(stored, scale)
+            bytes_per_vector = stored.itemsize * stored.shape[1]
+        cosines = cosine_rows(reconstructed, vectors)
+        recall = overlap(index.search(builder.prepare(queries), args.k)[1], truth, args.k)
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+        print(f"{storage:<12}{bytes_per_vector:>11}{size_mb:>10.2f}{cosines.min():>10.4f}{cosines.mean():>10.4f}{recall:>10.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default='myscheme_raw.json')
+    parser.add_argument('--backends', nargs='+', default=list(ENCODER_BACKENDS), choices=ENCODER_BACKENDS)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--pq-m', type=int, default=settings.SCHEME_PQ_M)
+    parser.add_argument('--min-cosine', type=float, default=0.98)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        schemes = normalize_schemes(json.load(f))
+    summaries = [s['semantic_summary'] for s in schemes]
+    queries = build_queries(schemes, args.queries, random.Random(args.seed))
+    print(f"Corpus: {len(summaries)} schemes, {len(queries)} queries, model {settings.SCHEME_EMBEDDING_MODEL}\n")
+
+    reference, failed = compare_backends(args, summaries, queries)
+    if reference is not None and 'error' not in reference:
+        compare_storage(args, reference['corpus'], reference['queries'])
+
+    if failed:
+        print(f"\n✗ Cosine parity below {args.min_cosine} against torch")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Measure event loop responsiveness while /schemes/recommend saturates a worker.
+
+The scheme and community routers are mounted in one in-process app, which
+shares a single event loop like a uvicorn worker. Many concurrent
+recommendation requests are fired at it while two probes run on the same
+loop:
+
+  * loop lag: how late a 10ms asyncio.sleep wakes up. This is the delay every
+    WebSocket frame on the worker would see.
+  * /api/communities/status latency: a trivial async endpoint.
+
+Each --workers value is one round. 0 runs retrieval inline on the event loop,
+the old behaviour, and N uses the dedicated retrieval thread pool.
+
+Run from the backend directory:
+    python -m benchmarks.event_loop_benchmark [--requests 400] [--concurrency 32] [--workers 0 4]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import numpy as np
+import httpx
+
+# The scheme router refuses to import without a key; /recommend never calls Groq
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from fastapi import FastAPI
+from routes.scheme_router import router as scheme_router
+from routes.community_routes import router as community_router
+from services.scheme_corpus import scheme_corpus_manager
+from services.retrieval_executor import scheme_retrieval_executor
+from services.embedding_cache import query_embedding_cache
+
+INTERESTS = ['education', 'scholarship', 'farming', 'health insurance', 'pension', 'housing',
+             'business loan', 'skill training', 'women empowerment', 'disability support']
+
+
+def random_profile(rng):
+    return {
+        'age': rng.randint(5, 80),
+        'gender': rng.choice(['male', 'female']),
+        'family_income': rng.choice([50000, 150000, 300000, 800000]),
+        'caste': rng.choice(['General', 'OBC', 'SC', 'ST']),
+        'occupation': rng.choice(['student', 'farmer', 'worker', 'unemployed', 'business']),
+        'residence': rng.choice(['rural', 'urban']),
+        'state': rng.choice(['Karnataka', 'Gujarat', 'Bihar', 'Kerala', 'Punjab']),
+        # A random suffix keeps queries out of the embedding cache
+        'interests': f"{rng.choice(INTERESTS)} {rng.randint(0, 10 ** 9)}",
+    }
+
+
+def percentiles(samples_ms):
+    samples = np.array(samples_ms) if samples_ms else np.zeros(1)
+    return np.percentile(samples, 50), np.percentile(samples, 99), samples.max()
+
+
+async def measure(client, args, workers, rng):
+    scheme_retrieval_executor.shutdown()
+    scheme_retrieval_executor.max_workers = workers
+    query_embedding_cache.clear()
+
+    done = asyncio.Event()
+    loop_lag_ms, probe_ms, request_ms = [], [], []
+
+    async def lag_probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            loop_lag_ms.append((time.perf_counter() - start - 0.01) * 1000)
+
+    async def http_probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get('/api/communities/status')
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def recommend():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post('/schemes/recommend', json=random_profile(rng))
+            response.raise_for_status()
+            request_ms.append((time.perf_counter() - start) * 1000)
+
+    probes = [asyncio.create_task(lag_probe()), asyncio.create_task(http_probe())]
+    start = time.perf_counter()
+    await asyncio.gather(*(recommend() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*probes)
+
+    return {
+        'workers': workers,
+        'throughput': args.requests / elapsed,
+        'request': percentiles(request_ms),
+        'loop_lag': percentiles(loop_lag_ms),
+        'probe': percentiles(probe_ms),
+    }
+
+
+async def run(args):
+    app = FastAPI()
+    app.include_router(scheme_router, prefix='/schemes')
+    app.include_router(community_router, prefix='/api/communities')
+
+    scheme_corpus_manager.start()
+    while scheme_corpus_manager.busy:
+        await asyncio.sleep(0.2)
+    if not scheme_corpus_manager.ready:
+        raise SystemExit(f"Scheme corpus failed to load: {scheme_corpus_manager.last_error}")
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+        results = [await measure(client, args, workers, rng) for workers in args.workers]
+
+    header = (f"{'workers':>8}{'req/s':>9}{'req p50':>10}{'req p99':>10}"
+              f"{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'probe p50':>11}{'probe p99':>11}")
+    print(f"\n{args.requests} /recommend requests, concurrency {args.concurrency} (all times in ms)")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['workers']:>8}{result['throughput']:>9.1f}"
+              f"{result['request'][0]:>10.1f}{result['request'][1]:>10.1f}"
+              f"{result['loop_lag'][0]:>10.2f}{result['loop_lag'][1]:>10.2f}{result['loop_lag'][2]:>10.2f}"
+              f"{result['probe'][0]:>11.2f}{result['probe'][1]:>11.2f}")
+    scheme_retrieval_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 4])
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
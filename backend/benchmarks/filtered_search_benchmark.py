@@ -0,0 +1,76 @@
+"""
+Eligibility-filtered chat retrieval: the old fixed k*2 window vs FilteredSearcher.
+
+For random profiles and queries, the old path searched 2k neighbours and kept
+the eligible ones, returning ineligible schemes if none passed. The new path
+is checked against an exact ranking of every eligible scheme, and reports
+candidates scanned and latency.
+
+Uses the configured model and index (SCHEME_EMBEDDING_MODEL, SCHEME_INDEX_TYPE,
+...), reusing the scheme artifact when one exists.
+
+Run from the backend directory:
+    python -m benchmarks.filtered_search_benchmark [--profiles 500]
+"""
+import argparse
+import random
+import time
+import numpy as np
+from benchmarks.eligibility_benchmark import random_profile
+from benchmarks.shared_worker_benchmark import QUERIES
+from services.filtered_search import FilteredSearcher
+from services.scheme_corpus import build_scheme_corpus
+from config.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=500)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_scheme_corpus()
+    searcher = FilteredSearcher(settings.SCHEME_FILTER_EXACT_FRACTION, settings.SCHEME_FILTER_MAX_WINDOW)
+    rng = random.Random(args.seed)
+    k = args.k
+
+    old_short = old_ineligible = new_short = mismatches = 0
+    scanned, latencies = [], []
+    for _ in range(args.profiles):
+        profile = random_profile(rng)
+        eligible = corpus.eligibility_index.eligible_indices(profile)
+        eligible_set = set(eligible.tolist())
+        query = corpus.encode_query(rng.choice(QUERIES))
+
+        # Previous behaviour: 2k neighbours, eligible ones first, ineligible if none pass
+        neighbours = corpus.search(query, k * 2)
+        passing = [i for i in neighbours if i in eligible_set]
+        old = passing[:k] if passing else neighbours[:k]
+        old_ineligible += any(i not in eligible_set for i in old)
+        old_short += len(old) < min(k, len(eligible))
+
+        start = time.perf_counter()
+        result = searcher.search(corpus, query, eligible, k)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        scanned.append(result.scanned)
+        new_short += len(result.ids) < min(k, len(eligible))
+
+        expected, _ = corpus.search_subset(query, eligible, k)
+        if not set(result.ids) <= eligible_set:
+            raise SystemExit(f"Ineligible scheme returned for {profile}")
+        mismatches += sorted(result.ids) != sorted(expected.tolist())
+
+    latencies = np.array(latencies)
+    scanned = np.array(scanned)
+    print(f"{len(corpus)} schemes, {args.profiles} profiles, k={k}, index {corpus.index.__class__.__name__}\n")
+    print(f"old k*2 window:   {old_short} short results, {old_ineligible} with ineligible schemes")
+    print(f"FilteredSearcher: {new_short} short results, 0 with ineligible schemes, "
+          f"{mismatches} differing from exact top-k")
+    print(f"  strategies: {searcher.stats()['strategies']}")
+    print(f"  scanned: p50 {np.percentile(scanned, 50):.0f}, p99 {np.percentile(scanned, 99):.0f}, max {scanned.max()}")
+    print(f"  latency: p50 {np.percentile(latencies, 50):.1f} us, p99 {np.percentile(latencies, 99):.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare FAISS index backends for scheme retrieval on the real corpus.
+
+Reports recall@k against the exact flat baseline, build time, serialized
+index size and p50/p99 single-query latency for every configuration.
+
+Run from the backend directory:
+    python -m benchmarks.index_benchmark [--k 10] [--replicate 10]
+
+--replicate N tiles the corpus N times with small random jitter to
+approximate a larger dataset (e.g. after merging state scheme portals).
+"""
+import argparse
+import json
+import random
+import time
+import numpy as np
+import faiss
+from sentence_transformers import SentenceTransformer
+from config.settings import settings
+from services.scheme_extractor import normalize_schemes
+from services.scheme_index import SchemeIndexBuilder
+
+INTERESTS = ['education', 'scholarship', 'farming', 'health insurance', 'pension', 'housing',
+             'business loan', 'skill training', 'women empowerment', 'disability support']
+
+
+def build_queries(schemes, count, rng):
+    names = [s['name'] for s in schemes if s['name']]
+    queries = rng.sample(names, min(count // 2, len(names)))
+    while len(queries) < count:
+        queries.append(f"{rng.choice(INTERESTS)} for {rng.choice(['male', 'female'])} "
+                       f"{rng.choice(['farmer', 'student', 'worker', 'unemployed'])} age {rng.randint(10, 80)}")
+    return queries
+
+
+def configurations(args):
+    yield SchemeIndexBuilder('flat_l2')
+    yield SchemeIndexBuilder('flat_ip')
+    for ef_search in args.ef_search:
+        yield SchemeIndexBuilder('hnsw', hnsw_m=args.hnsw_m, hnsw_ef_search=ef_search)
+    for nprobe in args.nprobe:
+        yield SchemeIndexBuilder('ivf', ivf_nlist=args.nlist, ivf_nprobe=nprobe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default='myscheme_raw.json')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--replicate', type=int, default=1)
+    parser.add_argument('--hnsw-m', type=int, default=settings.SCHEME_HNSW_M)
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[16, 32, 64, 128])
+    parser.add_argument('--nlist', type=int, default=settings.SCHEME_IVF_NLIST)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(args.data, 'r', encoding='utf-8') as f:
+        schemes = normalize_schemes(json.load(f))
+
+    model = SentenceTransformer(settings.SCHEME_EMBEDDING_MODEL)
+    print(f"Encoding {len(schemes)} schemes with {settings.SCHEME_EMBEDDING_MODEL}...")
+    corpus = model.encode([s['semantic_summary'] for s in schemes], convert_to_numpy=True, batch_size=64).astype('float32')
+    if args.replicate > 1:
+        noise = np.random.default_rng(args.seed).normal(0, 0.01, size=(corpus.shape[0] * (args.replicate - 1), corpus.shape[1]))
+        corpus = np.vstack([corpus, np.tile(corpus, (args.replicate - 1, 1)) + noise.astype('float32')])
+    queries = model.encode(build_queries(schemes, args.queries, rng), convert_to_numpy=True).astype('float32')
+    print(f"Corpus: {corpus.shape[0]} vectors x {corpus.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+
+    # Exact ground truth per metric: raw L2 for flat_l2, cosine for everything else
+    ground_truth = {}
+    for normalized, builder in ((False, SchemeIndexBuilder('flat_l2')), (True, SchemeIndexBuilder('flat_ip'))):
+        exact = builder.build(builder.prepare(corpus))
+        _, ground_truth[normalized] = exact.search(builder.prepare(queries), args.k)
+
+    header = f"{'index':<44}{'recall@k':>10}{'build ms':>11}{'size MB':>10}{'p50 us':>10}{'p99 us':>10}"
+    print(header)
+    print('-' * len(header))
+    for builder in configurations(args):
+        vectors = builder.prepare(corpus)
+        start = time.perf_counter()
+        index = builder.build(vectors)
+        build_ms = (time.perf_counter() - start) * 1000
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+        prepared_queries = builder.prepare(queries)
+        latencies = []
+        results = np.empty((len(queries), args.k), dtype='int64')
+        for i in range(len(prepared_queries)):
+            start = time.perf_counter()
+            _, found = index.search(prepared_queries[i:i + 1], args.k)
+            latencies.append(time.perf_counter() - start)
+            results[i] = found[0]
+
+        truth = ground_truth[builder.normalize_vectors]
+        recall = np.mean([len(set(results[i]) & set(truth[i])) / args.k for i in range(len(queries))])
+        latencies_us = np.array(latencies) * 1e6
+
+        params = {key: value for key, value in builder.describe().items() if key not in ('type', 'normalized_vectors')}
+        label = builder.index_type + (' ' + ','.join(f"{k}={v}" for k, v in params.items()) if params else '')
+        print(f"{label:<44}{recall:>10.4f}{build_ms:>11.1f}{size_mb:>10.2f}"
+              f"{np.percentile(latencies_us, 50):>10.1f}{np.percentile(latencies_us, 99):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
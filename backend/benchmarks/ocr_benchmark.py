@@ -0,0 +1,53 @@
+"""
+Scanned-PDF OCR wall time for different concurrency and batch settings.
+
+OCRs the same PDF with the page-at-a-time behaviour (one thread, one page
+per Vision request) and with the concurrent / batched pipeline, checking that
+every run returns the same pages in the same order. Makes real Vision calls,
+so GOOGLE_SERVICE_ACCOUNT_JSON must be set; each run bills one request per
+page or batch.
+
+Run from the backend directory:
+    python -m benchmarks.ocr_benchmark scanned.pdf [--runs 1,1 4,1 4,4 8,1]
+"""
+import argparse
+import contextlib
+import io
+import time
+from config.settings import settings
+from services.document_processor import DocumentProcessor
+from services.vision_service import vision_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pdf')
+    parser.add_argument('--runs', nargs='+', default=['1,1', '4,1', '4,4', '8,1'],
+                        help='concurrency,batch_size pairs; the first is the baseline')
+    args = parser.parse_args()
+
+    if not vision_service.is_available():
+        raise SystemExit("Vision API is not configured")
+    with open(args.pdf, 'rb') as f:
+        pdf_bytes = f.read()
+
+    baseline = None
+    print(f"{'concurrency':>11}  {'batch':>5}  {'pages':>5}  {'wall_ms':>8}  {'render_ms':>9}  {'vision_ms':>9}  same")
+    for run in args.runs:
+        concurrency, batch_size = (int(value) for value in run.split(','))
+        settings.OCR_MAX_CONCURRENCY, settings.OCR_BATCH_SIZE = concurrency, batch_size
+        processor = DocumentProcessor()
+        started = time.perf_counter()
+        # The services log every call; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages, timings = processor.ocr_pdf_pages(pdf_bytes)
+        wall_ms = (time.perf_counter() - started) * 1000
+        if baseline is None:
+            baseline = pages
+        print(f"{concurrency:>11}  {batch_size:>5}  {len(pages):>5}  {wall_ms:>8.0f}  "
+              f"{sum(t.render_ms for t in timings):>9.0f}  {sum(t.ocr_ms / t.batch_pages for t in timings):>9.0f}  "
+              f"{'yes' if pages == baseline else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
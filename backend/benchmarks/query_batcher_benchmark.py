@@ -0,0 +1,104 @@
+"""
+Measure /schemes/recommend throughput with and without query encode batching.
+
+Concurrent recommendation requests with distinct interests (so every query
+misses the embedding cache) are fired at an in-process app, first with the
+batcher off and then on. Each round uses the retrieval pool size the server
+would start with for that setting: SCHEME_RETRIEVAL_WORKERS, raised to
+SCHEME_BATCH_MAX_SIZE while batching, so the batch sizes reported are the
+ones a default deployment reaches.
+
+Run from the backend directory:
+    python -m benchmarks.query_batcher_benchmark [--requests 400] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import httpx
+
+# The scheme router refuses to import without a key; /recommend never calls Groq
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from fastapi import FastAPI
+from config.settings import settings
+from routes.scheme_router import router as scheme_router
+from services.scheme_corpus import scheme_corpus_manager
+from services.retrieval_executor import retrieval_workers, scheme_retrieval_executor
+from services.embedding_cache import query_embedding_cache
+from services.query_batcher import Histogram, query_encode_batcher
+from benchmarks.event_loop_benchmark import percentiles, random_profile
+
+
+async def measure(client, args, batching, rng):
+    query_encode_batcher.enabled = batching
+    query_encode_batcher.batch_sizes = Histogram(query_encode_batcher.batch_sizes.bounds)
+    scheme_retrieval_executor.shutdown()
+    scheme_retrieval_executor.max_workers = retrieval_workers(
+        settings.SCHEME_RETRIEVAL_WORKERS, query_encode_batcher.enabled, settings.SCHEME_BATCH_MAX_SIZE
+    )
+    query_embedding_cache.clear()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    request_ms = []
+
+    async def recommend():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post('/schemes/recommend', json=random_profile(rng))
+            response.raise_for_status()
+            request_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(recommend() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    stats = query_encode_batcher.stats()
+    return {
+        'batching': batching,
+        'pool': scheme_retrieval_executor.max_workers,
+        'throughput': args.requests / elapsed,
+        'request': percentiles(request_ms),
+        'mean_batch': stats['batch_size']['mean'] if batching else 1.0,
+    }
+
+
+async def run(args):
+    app = FastAPI()
+    app.include_router(scheme_router, prefix='/schemes')
+
+    scheme_corpus_manager.start()
+    while scheme_corpus_manager.busy:
+        await asyncio.sleep(0.2)
+    if not scheme_corpus_manager.ready:
+        raise SystemExit(f"Scheme corpus failed to load: {scheme_corpus_manager.last_error}")
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+        # One untimed round loads the model's kernels and the eligibility cache
+        await measure(client, argparse.Namespace(requests=args.concurrency, concurrency=args.concurrency), False, rng)
+        results = [await measure(client, args, batching, rng) for batching in (False, True)]
+
+    header = f"{'batching':>9}{'pool':>6}{'req/s':>9}{'req p50':>10}{'req p99':>10}{'mean batch':>12}"
+    print(f"\n{args.requests} /recommend requests, concurrency {args.concurrency}, "
+          f"window {settings.SCHEME_BATCH_WINDOW_MS:g}ms, max batch {settings.SCHEME_BATCH_MAX_SIZE} (times in ms)")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{'on' if result['batching'] else 'off':>9}{result['pool']:>6}{result['throughput']:>9.1f}"
+              f"{result['request'][0]:>10.1f}{result['request'][1]:>10.1f}{result['mean_batch']:>12.2f}")
+    scheme_retrieval_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Per-worker memory of the full scheme recommender: independent workers vs pre-forked ones.
+
+  spawn    every worker is a fresh interpreter that imports torch, loads the
+           model and opens the artifact itself, like `uvicorn --workers N`
+  prefork  one parent loads everything, freezes the GC and forks the
+           workers, like `python serve.py --workers N`
+
+Each worker embeds --queries queries and runs retrieval, eligibility and
+context assembly on them. All workers then stay alive together while their
+memory is read from /proc/self/smaps_rollup (see worker_memory_benchmark).
+USS is what each additional worker costs; in prefork mode the parent's USS is
+paid once.
+
+The artifact is built on the first run and reused after that, as in
+production. Set SCHEME_EMBEDDING_MODEL / SCHEME_ARTIFACT_DIR to benchmark
+another model or cache location.
+
+Run from the backend directory:
+    python -m benchmarks.shared_worker_benchmark [--workers 4]
+"""
+import argparse
+import gc
+import multiprocessing
+import numpy as np
+from benchmarks.worker_memory_benchmark import memory_kb
+
+QUERIES = [
+    'scholarship for girl students in rural areas',
+    'loan for small farmers to buy equipment',
+    'pension for senior citizens',
+    'housing assistance for low income families',
+    'skill training for unemployed youth',
+    'health insurance for workers',
+]
+PROFILE = {
+    'age': 25, 'gender': 'female', 'family_income': 100000, 'caste': 'SC',
+    'occupation': 'student', 'residence': 'rural', 'state': 'Gujarat', 'interests': ''
+}
+
+
+def build_corpus():
+    from services.scheme_corpus import build_scheme_corpus
+    return build_scheme_corpus()
+
+
+def serve_queries(corpus, queries):
+    eligible = corpus.eligibility_index.eligible_indices(PROFILE)
+    for i in range(queries):
+        embedding = corpus.encode_query(f"{QUERIES[i % len(QUERIES)]} {i}")
+        positions = corpus.search(embedding, 20)
+        top, _ = corpus.search_subset(embedding, eligible, 5)
+        corpus.contexts.assemble(list(top) + positions[:3], 1500)
+
+
+def report(barrier, results, name):
+    barrier.wait()  # measure while every worker is alive
+    results.put((name, memory_kb()))
+    barrier.wait()
+
+
+def spawn_worker(queries, barrier, results):
+    serve_queries(build_corpus(), queries)
+    report(barrier, results, 'worker')
+
+
+def prefork_parent(args, barrier, results):
+    corpus = build_corpus()
+    gc.collect()
+    gc.freeze()
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=prefork_worker, args=(corpus, args.queries, barrier, results))
+               for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    report(barrier, results, 'parent')
+    for worker in workers:
+        worker.join()
+
+
+def prefork_worker(corpus, queries, barrier, results):
+    serve_queries(corpus, queries)
+    report(barrier, results, 'worker')
+
+
+def measure(mode, args):
+    context = multiprocessing.get_context('spawn')
+    if mode == 'spawn':
+        barrier = context.Barrier(args.workers)
+        results = context.Queue()
+        processes = [context.Process(target=spawn_worker, args=(args.queries, barrier, results))
+                     for _ in range(args.workers)]
+    else:
+        barrier = context.Barrier(args.workers + 1)
+        results = context.Queue()
+        processes = [context.Process(target=prefork_parent, args=(args, barrier, results))]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in range(barrier.parties)]
+    for process in processes:
+        process.join()
+
+    workers = [memory for name, memory in samples if name == 'worker']
+    parent = next((memory for name, memory in samples if name == 'parent'), None)
+    mean = {key: float(np.mean([w[key] for w in workers])) / 1024 for key in workers[0]}
+    return mean, parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    # Build (or validate) the artifact once, outside the measured processes
+    warmup = multiprocessing.get_context('spawn').Process(target=build_corpus)
+    warmup.start()
+    warmup.join()
+
+    print(f"\n{args.workers} workers, {args.queries} queries per worker (MB per worker)\n")
+    header = f"{'mode':<10}{'RSS':>10}{'PSS':>10}{'USS':>10}{'parent USS':>12}{'total USS':>12}"
+    print(header)
+    print('-' * len(header))
+    for mode in ('spawn', 'prefork'):
+        mean, parent = measure(mode, args)
+        parent_uss = parent['uss'] / 1024 if parent else 0.0
+        print(f"{mode:<10}{mean['rss']:>10.1f}{mean['pss']:>10.1f}{mean['uss']:>10.1f}"
+              f"{parent_uss:>12.1f}{mean['uss'] * args.workers + parent_uss:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
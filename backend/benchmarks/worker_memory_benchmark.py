@@ -0,0 +1,121 @@
+"""
+Per-worker memory of the scheme corpus data: list of dicts vs the memory-mapped SchemeStore.
+
+Starts --workers fresh processes per layout, like `uvicorn --workers N`.
+Each one loads the normalized schemes, builds the eligibility index and
+prompt contexts the way SchemeCorpus does, and serves --lookups random scheme
+reads. All workers then stay alive together while their memory is read from
+/proc/self/smaps_rollup:
+
+  RSS  resident pages, counting shared page-cache pages in full
+  PSS  shared pages split between the processes mapping them
+  USS  pages private to the worker, i.e. what each extra worker costs
+
+The model and FAISS index are left out.
+
+Run from the backend directory:
+    python -m benchmarks.worker_memory_benchmark [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import numpy as np
+from services.scheme_extractor import normalize_schemes
+from services.scheme_store import SchemeStore, write_scheme_store
+from services.scheme_context import SchemeContexts
+from services.eligibility_index import EligibilityIndex
+
+
+def memory_kb():
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+
+def worker(layout, path, lookups, seed, barrier, results):
+    baseline = memory_kb()
+    if layout == 'dicts':
+        with open(path, 'r', encoding='utf-8') as f:
+            schemes = json.load(f)
+        contexts = SchemeContexts.render(schemes)
+    else:
+        schemes = SchemeStore(path)
+        contexts = SchemeContexts.from_store(schemes)
+    eligibility = EligibilityIndex(schemes)
+
+    rng = random.Random(seed)
+    for _ in range(lookups):
+        i = rng.randrange(len(schemes))
+        scheme = schemes[i]
+        _ = (scheme['name'], scheme['benefits']['description'], scheme['eligibility'], contexts.compact[i])
+
+    barrier.wait()  # every worker is loaded; measure while all mappings are live
+    loaded = memory_kb()
+    results.put({key: loaded[key] - baseline[key] for key in loaded})
+    barrier.wait()
+    del eligibility
+
+
+def measure(layout, path, args):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(layout, path, args.lookups, args.seed + n, barrier, results))
+        for n in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: float(np.mean([s[key] for s in samples])) / 1024 for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default='myscheme_raw.json')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        schemes = normalize_schemes(json.load(f))
+
+    workdir = tempfile.mkdtemp(prefix='scheme-memory-')
+    try:
+        dicts_path = os.path.join(workdir, 'schemes.json')
+        with open(dicts_path, 'w', encoding='utf-8') as f:
+            json.dump(schemes, f, ensure_ascii=False)
+        store_path = os.path.join(workdir, 'store')
+        os.makedirs(store_path)
+        extra_text, extra_numeric = SchemeContexts.render(schemes).store_columns()
+        write_scheme_store(store_path, schemes, extra_text, extra_numeric)
+
+        print(f"{len(schemes)} schemes, {args.workers} workers, {args.lookups} lookups per worker (MB per worker)\n")
+        header = f"{'layout':<14}{'RSS':>10}{'PSS':>10}{'USS':>10}{'total USS':>12}"
+        print(header)
+        print('-' * len(header))
+        for layout, path in (('dicts', dicts_path), ('scheme store', store_path)):
+            result = measure('dicts' if layout == 'dicts' else 'store', path, args)
+            print(f"{layout:<14}{result['rss']:>10.1f}{result['pss']:>10.1f}{result['uss']:>10.1f}"
+                  f"{result['uss'] * args.workers:>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
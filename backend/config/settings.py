@@ -4,9 +4,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings:
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    # Connection pool of the long-lived async Groq client used by the scheme chat
+    GROQ_MAX_CONNECTIONS: int = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+    GROQ_KEEPALIVE_SECONDS: float = float(os.getenv("GROQ_KEEPALIVE_SECONDS", "60"))
     GOOGLE_SERVICE_ACCOUNT_JSON: str = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON", "")
     
     # Add ElevenLabs configuration
@@ -15,8 +20,82 @@ class Settings:
     
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
     
+    # Scheme recommender
+    SCHEME_EMBEDDING_MODEL: str = os.getenv("SCHEME_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    # torch, onnx or onnx_int8; the onnx backends need: pip install 'sentence-transformers[onnx]'
+    SCHEME_ENCODER_BACKEND: str = os.getenv("SCHEME_ENCODER_BACKEND", "torch")
+    # Quantized graph to load from the model repo for onnx_int8; exported locally if missing
+    SCHEME_ONNX_FILE: str = os.getenv("SCHEME_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+    SCHEME_NORMALIZE_WORKERS: int = int(os.getenv("SCHEME_NORMALIZE_WORKERS", "1"))
+    SCHEME_ARTIFACT_DIR: str = os.getenv("SCHEME_ARTIFACT_DIR", os.path.join(BACKEND_DIR, ".scheme_cache"))
+    # int8 ONNX encoders exported for onnx_int8; kept apart from the artifacts, which are pruned on every save
+    SCHEME_ENCODER_CACHE_DIR: str = os.getenv("SCHEME_ENCODER_CACHE_DIR", os.path.join(BACKEND_DIR, ".encoder_cache"))
+    # flat_l2 (exact, raw vectors), flat_ip (exact cosine), hnsw or ivf (approximate cosine)
+    SCHEME_INDEX_TYPE: str = os.getenv("SCHEME_INDEX_TYPE", "flat_l2")
+    SCHEME_HNSW_M: int = int(os.getenv("SCHEME_HNSW_M", "32"))
+    SCHEME_HNSW_EF_CONSTRUCTION: int = int(os.getenv("SCHEME_HNSW_EF_CONSTRUCTION", "200"))
+    SCHEME_HNSW_EF_SEARCH: int = int(os.getenv("SCHEME_HNSW_EF_SEARCH", "64"))
+    # 0 picks nlist from the corpus size
+    SCHEME_IVF_NLIST: int = int(os.getenv("SCHEME_IVF_NLIST", "0"))
+    SCHEME_IVF_NPROBE: int = int(os.getenv("SCHEME_IVF_NPROBE", "8"))
+    # float32, float16, int8 or pq (product quantization, flat/ivf only)
+    SCHEME_VECTOR_STORAGE: str = os.getenv("SCHEME_VECTOR_STORAGE", "float32")
+    SCHEME_PQ_M: int = int(os.getenv("SCHEME_PQ_M", "48"))
+    SCHEME_PQ_NBITS: int = int(os.getenv("SCHEME_PQ_NBITS", "8"))
+    # Eligibility results per canonical profile bucket; 0 disables
+    SCHEME_ELIGIBILITY_CACHE_SIZE: int = int(os.getenv("SCHEME_ELIGIBILITY_CACHE_SIZE", "4096"))
+    SCHEME_EMBEDDING_CACHE_SIZE: int = int(os.getenv("SCHEME_EMBEDDING_CACHE_SIZE", "10000"))
+    # Empty disables persisting the query embedding cache across restarts
+    SCHEME_EMBEDDING_CACHE_PATH: str = os.getenv("SCHEME_EMBEDDING_CACHE_PATH", "")
+    # Concurrent query encodes arriving within the window share one batched encode; 0 disables
+    SCHEME_BATCH_WINDOW_MS: float = float(os.getenv("SCHEME_BATCH_WINDOW_MS", "3"))
+    SCHEME_BATCH_MAX_SIZE: int = int(os.getenv("SCHEME_BATCH_MAX_SIZE", "32"))
+    # Threads for query encoding and FAISS search off the event loop; 0 runs them inline.
+    # While batching is on the pool is raised to SCHEME_BATCH_MAX_SIZE so a batch can fill
+    SCHEME_RETRIEVAL_WORKERS: int = int(os.getenv("SCHEME_RETRIEVAL_WORKERS", "4"))
+    # Chat retrieval for a profile ranks the eligible rows exactly when they are at most this
+    # fraction of the corpus; otherwise it widens an index search window up to the max below
+    SCHEME_FILTER_EXACT_FRACTION: float = float(os.getenv("SCHEME_FILTER_EXACT_FRACTION", "0.1"))
+    SCHEME_FILTER_MAX_WINDOW: int = int(os.getenv("SCHEME_FILTER_MAX_WINDOW", "1024"))
+    # /schemes/search: largest page, deepest result a cursor can reach, and the shortest
+    # query answered by scheme-name prefix matching instead of the encoder
+    SCHEME_SEARCH_MAX_PAGE_SIZE: int = int(os.getenv("SCHEME_SEARCH_MAX_PAGE_SIZE", "50"))
+    SCHEME_SEARCH_MAX_RESULTS: int = int(os.getenv("SCHEME_SEARCH_MAX_RESULTS", "200"))
+    SCHEME_NAME_PREFIX_MIN_CHARS: int = int(os.getenv("SCHEME_NAME_PREFIX_MIN_CHARS", "3"))
+    # Approximate tokens of scheme context per chat prompt; long forms are used while they fit
+    SCHEME_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("SCHEME_CONTEXT_TOKEN_BUDGET", "1500"))
+    # Chat sessions expire after this much idle time; LRU eviction past either cap
+    SCHEME_SESSION_TTL_SECONDS: int = int(os.getenv("SCHEME_SESSION_TTL_SECONDS", "3600"))
+    SCHEME_SESSION_MAX_SESSIONS: int = int(os.getenv("SCHEME_SESSION_MAX_SESSIONS", "10000"))
+    SCHEME_SESSION_MAX_BYTES: int = int(os.getenv("SCHEME_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+    SCHEME_SESSION_MAX_HISTORY: int = int(os.getenv("SCHEME_SESSION_MAX_HISTORY", "20"))
+    # Required in the X-Admin-Token header for /schemes/admin/*; empty disables those endpoints
+    SCHEME_ADMIN_TOKEN: str = os.getenv("SCHEME_ADMIN_TOKEN", "")
+    
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
+    # Room for multipart boundaries and form fields; upload request bodies past
+    # MAX_FILE_SIZE plus this are rejected with a 413 while still being received
+    UPLOAD_FORM_OVERHEAD_BYTES: int = int(os.getenv("UPLOAD_FORM_OVERHEAD_BYTES", str(64 * 1024)))
     MAX_PDF_PAGES: int = 50
+    # PDF pages with less embedded text than this are treated as scanned and OCRed
+    PDF_MIN_PAGE_TEXT_CHARS: int = int(os.getenv("PDF_MIN_PAGE_TEXT_CHARS", "40"))
+    # Extracted text of uploads, keyed by file hash: an in-memory LRU plus a directory
+    # bounded in bytes (holds document text; an empty DOCUMENT_CACHE_DIR disables it)
+    DOCUMENT_CACHE_MEMORY_BYTES: int = int(os.getenv("DOCUMENT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+    DOCUMENT_CACHE_DIR: str = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(BACKEND_DIR, ".document_cache"))
+    DOCUMENT_CACHE_DISK_BYTES: int = int(os.getenv("DOCUMENT_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+    # Document analyses keyed by text, query, mode, model and prompt version: memory, sqlite or none
+    ANALYSIS_CACHE_BACKEND: str = os.getenv("ANALYSIS_CACHE_BACKEND", "memory")
+    ANALYSIS_CACHE_TTL_SECONDS: float = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(24 * 3600)))
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1000"))
+    ANALYSIS_CACHE_PATH: str = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(BACKEND_DIR, ".analysis_cache", "analyses.sqlite3"))
+    # Scanned PDFs: pages OCRed, concurrent Vision requests, and pages per request
+    # (batch_annotate_images, at most 16); 1 sends each page on its own text_detection call
+    OCR_MAX_PAGES: int = int(os.getenv("OCR_MAX_PAGES", "20"))
+    OCR_MAX_CONCURRENCY: int = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+    OCR_BATCH_SIZE: int = int(os.getenv("OCR_BATCH_SIZE", "1"))
+    # Rendered page bytes per batch request, under Vision's request size limit
+    OCR_BATCH_MAX_BYTES: int = int(os.getenv("OCR_BATCH_MAX_BYTES", str(8 * 1024 * 1024)))
     ALLOWED_FILE_TYPES: List[str] = [
         "application/pdf",
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -11,11 +11,20 @@ from routes.voice_routes import router as voice_router
 from routes.scheme_router import router as scheme_router
 from routes.community_routes import router as community_router
 from config.settings import settings
+from services.uploads import UploadSizeLimitMiddleware
 
 load_dotenv()
 
 app = FastAPI(title="AI Legal Assistant API")
 
+# Oversized uploads are refused while still arriving, before they are spooled.
+# Added before CORS so its 413 responses still carry the CORS headers
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=settings.MAX_FILE_SIZE + settings.UPLOAD_FORM_OVERHEAD_BYTES,
+    paths=["/document/analyze", "/document/validate", "/voice/analyze-and-speak"],
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
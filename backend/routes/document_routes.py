@@ -2,9 +2,12 @@ from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
 from typing import Optional
 from services.document_processor import document_processor
+from services.document_cache import document_text_cache
 from services.url_scraper import url_scraper
 from services.groq_service import groq_service
+from services.analysis_cache import analysis_cache
 from services.analysis_formatter import analysis_formatter
+from services.uploads import read_upload
 from config.settings import settings
 import traceback
 
@@ -34,17 +37,14 @@ async def analyze_document(
     try:
         document_text = ""
         source_name = ""
+        extraction_report = None
         
         if file:
             print("Processing file upload...")
-            file_bytes = await file.read()
-            print(f"File size: {len(file_bytes)} bytes")
+            upload = await read_upload(file, settings.MAX_FILE_SIZE)
+            print(f"File size: {upload.size} bytes")
             
-            if len(file_bytes) > settings.MAX_FILE_SIZE:
-                print("ERROR: File too large")
-                raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
-            
-            if not file_bytes:
+            if not upload.size:
                 print("ERROR: Empty file")
                 raise HTTPException(status_code=400, detail="Empty file uploaded")
             
@@ -68,11 +68,8 @@ async def analyze_document(
                 )
             
             print("Extracting text from file...")
-            document_text = document_processor.process_file(
-                file_bytes,
-                content_type,
-                file.filename
-            )
+            extracted = document_processor.process_upload(upload)
+            document_text, extraction_report = extracted.text, extracted.report
             print(f"Extracted text length: {len(document_text)}")
             print(f"Text preview: {document_text[:100]}...")
             source_name = file.filename
@@ -101,8 +98,8 @@ async def analyze_document(
             )
         
         print("Analyzing document with GROQ...")
-        analysis = groq_service.analyze_document(document_text, user_query=message if message else None)
-        print(f"Analysis complete. Fishy clauses found: {len(analysis.get('fishy_clauses', []))}")
+        analysis, cached = groq_service.analyze_document_cached(document_text, user_query=message if message else None)
+        print(f"Analysis complete{' (cached)' if cached else ''}. Fishy clauses found: {len(analysis.get('fishy_clauses', []))}")
         
         print("Formatting response...")
         formatted_response = analysis_formatter.format_analysis_as_markdown(
@@ -119,7 +116,9 @@ async def analyze_document(
             "response": formatted_response,
             "analysis": analysis,
             "terms": terms_for_highlighting,
-            "source": source_name
+            "source": source_name,
+            "extraction": extraction_report,
+            "cached": cached
         })
     
     except HTTPException:
@@ -129,13 +128,21 @@ async def analyze_document(
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.get("/cache/stats")
+async def document_cache_stats():
+    """Hit rates and sizes of the extracted document text and analysis caches"""
+    return {
+        "document_text": document_text_cache.stats(),
+        "analysis": analysis_cache.stats()
+    }
+
 @router.post("/validate")
 async def validate_file(file: UploadFile = File(...)):
     try:
-        file_bytes = await file.read()
-        
-        if len(file_bytes) > settings.MAX_FILE_SIZE:
-            return {"valid": False, "error": "File size exceeds 10MB limit"}
+        try:
+            await read_upload(file, settings.MAX_FILE_SIZE)
+        except HTTPException as e:
+            return {"valid": False, "error": e.detail}
         
         content_type = file.content_type.lower() if file.content_type else ""
         
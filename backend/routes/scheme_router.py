@@ -1,16 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import hmac
 import json
-import re
-import os
-import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from groq import Groq
-from typing import Optional, List, Dict
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+from typing import Optional, List, Dict, Tuple
 from dotenv import load_dotenv
 import os
-from fastapi import APIRouter
+from config.settings import settings
+from services.embedding_cache import query_embedding_cache
+from services.filtered_search import FilteredSearchResult, scheme_filtered_searcher
+from services.query_batcher import query_encode_batcher
+from services.scheme_index import scheme_index_builder
+from services.scheme_search import scheme_searcher
+from services.retrieval_executor import scheme_retrieval_executor
+from services.session_store import scheme_session_store
+from services.scheme_corpus import SchemeCorpus, scheme_corpus_manager
 
 load_dotenv()
 router = APIRouter()
@@ -19,328 +25,21 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise RuntimeError("GROQ_API_KEY is not set in environment variables")
 
-
-# Global variables for schemes data and models
-normalized_schemes = []
-model = None
-faiss_index = None
-dimension = None
-conversation_sessions = {}
-
-# Helper functions for extraction
-def extract_age_range(text):
-    text_lower = text.lower()
-    min_age = None
-    max_age = None
-    age_pattern = r'(\d+)\s*(?:to|-)\s*(\d+)\s*years?'
-    match = re.search(age_pattern, text_lower)
-    if match:
-        min_age = int(match.group(1))
-        max_age = int(match.group(2))
-    else:
-        below_pattern = r'below\s*(\d+)\s*years?'
-        match = re.search(below_pattern, text_lower)
-        if match:
-            max_age = int(match.group(1))
-        above_pattern = r'above\s*(\d+)\s*years?'
-        match = re.search(above_pattern, text_lower)
-        if match:
-            min_age = int(match.group(1))
-    return min_age, max_age
-
-def extract_gender(text):
-    text_lower = text.lower()
-    if 'female' in text_lower or 'women' in text_lower or 'girl' in text_lower:
-        return 'female'
-    elif 'male' in text_lower and 'female' not in text_lower:
-        return 'male'
-    return 'any'
-
-def extract_income(text):
-    text_lower = text.lower()
-    income_pattern = r'(?:income|earning).*?(?:below|less than|up to|maximum).*?(?:rs\.?|inr|₹)?\s*(\d+(?:,\d+)*)'
-    match = re.search(income_pattern, text_lower)
-    if match:
-        income_str = match.group(1).replace(',', '')
-        return int(income_str)
-    bpl_pattern = r'\b(?:bpl|below poverty line)\b'
-    if re.search(bpl_pattern, text_lower):
-        return 100000
-    return None
-
-def extract_caste(text):
-    text_lower = text.lower()
-    castes = []
-    if re.search(r'\b(?:sc|scheduled caste)\b', text_lower):
-        castes.append('SC')
-    if re.search(r'\b(?:st|scheduled tribe)\b', text_lower):
-        castes.append('ST')
-    if re.search(r'\b(?:obc|other backward class)\b', text_lower):
-        castes.append('OBC')
-    if re.search(r'\b(?:general|unreserved)\b', text_lower):
-        castes.append('General')
-    return castes if castes else ['Any']
-
-def extract_occupation(text):
-    text_lower = text.lower()
-    occupations = []
-    if 'farmer' in text_lower or 'agriculture' in text_lower:
-        occupations.append('farmer')
-    if 'student' in text_lower or 'education' in text_lower:
-        occupations.append('student')
-    if 'unemployed' in text_lower:
-        occupations.append('unemployed')
-    if 'worker' in text_lower or 'labour' in text_lower or 'labor' in text_lower:
-        occupations.append('worker')
-    return occupations if occupations else ['any']
-
-def extract_residence(text):
-    text_lower = text.lower()
-    if 'rural' in text_lower and 'urban' not in text_lower:
-        return 'rural'
-    elif 'urban' in text_lower and 'rural' not in text_lower:
-        return 'urban'
-    return 'any'
-
-def extract_state(text):
-    text_lower = text.lower()
-    states = ['andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa', 'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka', 'kerala', 'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram', 'nagaland', 'odisha', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu', 'telangana', 'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal', 'delhi']
-    for state in states:
-        if state in text_lower:
-            return state.title()
-    return None
-
-def extract_benefit_type(text):
-    text_lower = text.lower()
-    if 'scholarship' in text_lower or 'education' in text_lower:
-        return 'scholarship'
-    elif 'pension' in text_lower:
-        return 'pension'
-    elif 'loan' in text_lower or 'credit' in text_lower:
-        return 'loan'
-    elif 'subsidy' in text_lower:
-        return 'subsidy'
-    elif 'insurance' in text_lower:
-        return 'insurance'
-    else:
-        return 'financial_assistance'
-
-def extract_benefit_amount(text):
-    text_lower = text.lower()
-    amount_pattern = r'(?:rs\.?|inr|₹)\s*(\d+(?:,\d+)*)'
-    match = re.search(amount_pattern, text_lower)
-    if match:
-        amount_str = match.group(1).replace(',', '')
-        return int(amount_str)
-    return None
-
-def extract_category(text):
-    text_lower = text.lower()
-    if 'education' in text_lower or 'student' in text_lower or 'scholarship' in text_lower:
-        return 'education'
-    elif 'health' in text_lower or 'medical' in text_lower:
-        return 'health'
-    elif 'agriculture' in text_lower or 'farmer' in text_lower:
-        return 'agriculture'
-    elif 'employment' in text_lower or 'skill' in text_lower:
-        return 'employment'
-    elif 'pension' in text_lower or 'senior' in text_lower or 'elderly' in text_lower:
-        return 'social_security'
-    elif 'women' in text_lower or 'girl' in text_lower:
-        return 'women_empowerment'
-    else:
-        return 'general_welfare'
-
-def extract_target_groups(text):
-    text_lower = text.lower()
-    groups = []
-    if 'women' in text_lower or 'girl' in text_lower:
-        groups.append('women')
-    if 'student' in text_lower or 'education' in text_lower:
-        groups.append('students')
-    if 'farmer' in text_lower:
-        groups.append('farmers')
-    if 'senior' in text_lower or 'elderly' in text_lower or 'aged' in text_lower:
-        groups.append('senior_citizens')
-    if 'child' in text_lower:
-        groups.append('children')
-    if 'disabled' in text_lower or 'handicapped' in text_lower:
-        groups.append('disabled')
-    if 'widow' in text_lower:
-        groups.append('widows')
-    if 'minority' in text_lower:
-        groups.append('minorities')
-    return groups if groups else ['general']
-
-def determine_level(text):
-    text_lower = text.lower()
-    states = ['andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa', 'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka', 'kerala', 'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram', 'nagaland', 'odisha', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu', 'telangana', 'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal', 'delhi']
-    for state in states:
-        if state in text_lower:
-            return 'state'
-    return 'central'
-
-def load_schemes_data():
-    """Load and normalize schemes data"""
-    global normalized_schemes, model, faiss_index, dimension
-    
-    print("\n" + "="*60)
-    print("Loading Government Schemes Database")
-    print("="*60)
-    
-    try:
-        # Try to load schemes data - check multiple possible paths
-        scheme_file = None
-        possible_paths = [
-            'myscheme_raw.json',
-            'backend/myscheme_raw.json',
-            '../myscheme_raw.json',
-            'data/myscheme_raw.json',
-            os.path.join(os.path.dirname(__file__), '..', '..', 'myscheme_raw.json'),
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                scheme_file = path
-                print(f"✓ Found scheme data at: {path}")
-                break
-        
-        if not scheme_file:
-            print("✗ ERROR: myscheme_raw.json not found!")
-            print(f"  Searched in: {', '.join(possible_paths)}")
-            return
-            
-        with open(scheme_file, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-            
-    except json.JSONDecodeError:
-        print("⚠ JSON decode error, attempting to clean and parse...")
-        with open(scheme_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            content = content.replace('\n', ' ').replace('\r', ' ')
-            content = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', content)
-            try:
-                raw_data = json.loads(content)
-            except:
-                lines = content.split('},')
-                raw_data = []
-                for i, line in enumerate(lines):
-                    if not line.strip():
-                        continue
-                    if not line.strip().endswith('}'):
-                        line = line + '}'
-                    if not line.strip().startswith('{'):
-                        line = '{' + line
-                    try:
-                        obj = json.loads(line)
-                        raw_data.append(obj)
-                    except:
-                        pass
-
-    print(f"✓ Loaded {len(raw_data)} raw schemes")
-    print("Processing and normalizing schemes...")
-    
-    # Normalize schemes
-    for idx, scheme in enumerate(raw_data):
-        try:
-            combined_text = ' '.join([str(scheme.get(k, '')) for k in scheme.keys()])
-            min_age, max_age = extract_age_range(combined_text)
-            gender = extract_gender(combined_text)
-            max_income = extract_income(combined_text)
-            caste = extract_caste(combined_text)
-            occupation = extract_occupation(combined_text)
-            residence = extract_residence(combined_text)
-            state_specific = extract_state(combined_text)
-            benefit_type = extract_benefit_type(combined_text)
-            benefit_amount = extract_benefit_amount(combined_text)
-            category = extract_category(combined_text)
-            target_groups = extract_target_groups(combined_text)
-            level = determine_level(combined_text)
-            state_field = state_specific if state_specific else 'All'
-            
-            semantic_summary = f"{scheme.get('schemeName', '')}. {scheme.get('Details', '')} {scheme.get('Benefits', '')}"
-            
-            tags = []
-            tags.extend(target_groups)
-            tags.append(category)
-            tags.extend(caste if caste != ['Any'] else [])
-            tags.extend(occupation if occupation != ['any'] else [])
-            
-            normalized_scheme = {
-                'scheme_id': f'scheme_{idx+1}',
-                'name': scheme.get('schemeName', ''),
-                'level': level,
-                'state': state_field,
-                'category': category,
-                'target_groups': target_groups,
-                'eligibility': {
-                    'min_age': min_age,
-                    'max_age': max_age,
-                    'gender': gender,
-                    'max_family_income': max_income,
-                    'caste': caste,
-                    'occupation': occupation,
-                    'residence': residence,
-                    'state_specific': state_specific
-                },
-                'benefits': {
-                    'type': benefit_type,
-                    'amount': benefit_amount,
-                    'description': scheme.get('Benefits', '')
-                },
-                'details': scheme.get('Details', ''),
-                'application_process': scheme.get('How to Avail', ''),
-                'tags': list(set(tags)),
-                'semantic_summary': semantic_summary,
-                'full_text': combined_text
-            }
-            normalized_schemes.append(normalized_scheme)
-        except Exception as e:
-            print(f"  ⚠ Error processing scheme {idx}: {e}")
-            pass
-
-    print(f"✓ Normalized {len(normalized_schemes)} schemes")
-
-    # Load model and create FAISS index
-    print("Loading AI model (this may take a moment)...")
-    try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✓ Sentence transformer model loaded")
-    except Exception as e:
-        print(f"✗ Error loading model: {e}")
-        return
-    
-    print("Creating FAISS semantic search index...")
-    try:
-        all_scheme_summaries = [s['semantic_summary'] for s in normalized_schemes]
-        print(f"  Encoding {len(all_scheme_summaries)} schemes (this may take 1-2 minutes)...")
-        
-        # Encode in batches with progress
-        batch_size = 100
-        all_embeddings = []
-        for i in range(0, len(all_scheme_summaries), batch_size):
-            batch = all_scheme_summaries[i:i+batch_size]
-            batch_embeddings = model.encode(batch, convert_to_numpy=True, show_progress_bar=False)
-            all_embeddings.append(batch_embeddings)
-            print(f"  Progress: {min(i+batch_size, len(all_scheme_summaries))}/{len(all_scheme_summaries)} schemes encoded")
-        
-        all_scheme_embeddings = np.vstack(all_embeddings)
-        print(f"✓ All schemes encoded into vectors")
-        
-        dimension = all_scheme_embeddings.shape[1]
-        print(f"  Creating FAISS index with dimension {dimension}...")
-        faiss_index = faiss.IndexFlatL2(dimension)
-        faiss_index.add(all_scheme_embeddings.astype('float32'))
-        print(f"✓ FAISS index created with {len(normalized_schemes)} schemes")
-    except Exception as e:
-        print(f"✗ Error creating FAISS index: {e}")
-        import traceback
-        traceback.print_exc()
-        return
-    
-    print("="*60)
-    print("✓ Scheme Recommender System Ready!")
-    print("="*60 + "\n")
+# One long-lived client per worker: pooled keep-alive connections are reused across requests
+groq_client = AsyncGroq(
+    api_key=GROQ_API_KEY,
+    http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+        max_connections=settings.GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.GROQ_MAX_CONNECTIONS,
+        keepalive_expiry=settings.GROQ_KEEPALIVE_SECONDS
+    ))
+)
+
+CHAT_COMPLETION_PARAMS = {
+    "model": "llama-3.3-70b-versatile",
+    "temperature": 0.7,
+    "max_tokens": 2000
+}
 
 # Pydantic models
 class UserProfile(BaseModel):
@@ -359,140 +58,101 @@ class ChatMessage(BaseModel):
     context: Optional[List[Dict]] = None
     user_profile: Optional[Dict] = None
 
-def check_eligibility(scheme, user):
-    """Check if user is eligible for a scheme"""
-    elig = scheme['eligibility']
-    
-    if elig['min_age'] is not None and user['age'] < elig['min_age']:
-        return False
-    if elig['max_age'] is not None and user['age'] > elig['max_age']:
-        return False
-    
-    if elig['gender'] != 'any' and user['gender'] != elig['gender']:
-        return False
-    
-    if elig['max_family_income'] is not None and user['family_income'] > elig['max_family_income']:
-        return False
-    
-    if 'Any' not in elig['caste'] and user['caste'] not in elig['caste']:
-        return False
-    
-    if 'any' not in elig['occupation'] and user['occupation'] not in elig['occupation']:
-        return False
-    
-    if elig['residence'] != 'any' and user['residence'] != elig['residence']:
-        return False
-    
-    if elig['state_specific'] is not None and user['state'] != elig['state_specific']:
-        return False
-    
-    return True
-
-def retrieve_relevant_schemes(query: str, user_profile: Dict = None, k: int = 5):
-    """Use FAISS to retrieve relevant schemes based on query"""
-    if not model or not faiss_index:
-        raise HTTPException(status_code=500, detail="Scheme data not loaded. Please restart the server.")
+class SchemeSearchRequest(BaseModel):
+    query: str
+    limit: int = 10
+    cursor: Optional[str] = None  # next_cursor of the previous page
+    user_profile: Optional[UserProfile] = None
+
+class SchemeChanges(BaseModel):
+    upsert: List[Dict] = []  # raw myscheme records, identified by their 'slug'
+    delete: List[str] = []   # scheme ids
+
+async def get_corpus() -> SchemeCorpus:
+    """Current scheme corpus snapshot; fast 503 while it is still being built.
+    A revision written by another worker is mapped in first, off the event loop."""
+    corpus = scheme_corpus_manager.corpus
+    if corpus is None:
+        status = scheme_corpus_manager.status()
+        detail = "Scheme data is still loading. Please retry shortly."
+        if status['state'] == 'failed':
+            detail = f"Scheme data failed to load: {status['last_error']}"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+    if scheme_corpus_manager.is_stale():
+        corpus = await scheme_retrieval_executor.run(scheme_corpus_manager.sync) or corpus
+    return corpus
+
+def require_admin(token: Optional[str]):
+    """Guard for admin endpoints; disabled unless SCHEME_ADMIN_TOKEN is configured"""
+    if not settings.SCHEME_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Scheme admin API is disabled")
+    if not token or not hmac.compare_digest(token, settings.SCHEME_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def retrieve_relevant_schemes(corpus: SchemeCorpus, query: str, eligible_ids=None, k: int = 5) -> FilteredSearchResult:
+    """Use FAISS to retrieve the corpus positions of relevant schemes, best first.
+    With eligible_ids, only those schemes are returned (k of them when that many exist)."""
+    query_embedding = corpus.encode_query(query)
+    return scheme_filtered_searcher.search(corpus, query_embedding, eligible_ids, k)
+
+def rank_recommendations(corpus: SchemeCorpus, user_dict: Dict, k: int = 8):
+    """Eligible scheme positions and the top k of them for the profile's interests"""
+    eligible_ids = corpus.eligibility_index.eligible_indices(user_dict)
+    if len(eligible_ids) == 0:
+        return eligible_ids, []
+
+    query = f"{user_dict['interests']} for {user_dict['gender']} {user_dict['occupation']} age {user_dict['age']}"
+    query_embedding = corpus.encode_query(query)
+
+    # Rank only the eligible rows of the precomputed scheme vectors
+    top_ids, _ = corpus.search_subset(query_embedding, eligible_ids, k)
+    return eligible_ids, [corpus.schemes[i] for i in top_ids]
+
+async def prepare_chat(chat_msg: ChatMessage) -> Tuple:
+    """Update the session and retrieve schemes for a chat turn.
+    Returns the session, the schemes used as context and the LLM messages."""
+    corpus = await get_corpus()
     
-    query_embedding = model.encode([query], convert_to_numpy=True)
-    distances, indices = faiss_index.search(query_embedding.astype('float32'), k * 2)
+    user_id = chat_msg.user_id
+    message = chat_msg.message
+    user_profile = chat_msg.user_profile
+    context_history = chat_msg.context or []
     
-    retrieved_schemes = [normalized_schemes[i] for i in indices[0]]
+    # Initialize session if needed
+    session = scheme_session_store.get_or_create(user_id, user_profile)
     
-    # Filter by user profile if provided
+    # Update profile if provided
     if user_profile:
-        eligible = [s for s in retrieved_schemes if check_eligibility(s, user_profile)]
-        if eligible:
-            return eligible[:k]
-    
-    return retrieved_schemes[:k]
-
-def format_scheme_for_context(scheme):
-    """Format scheme data for LLM context"""
-    context = f"""
-Scheme: {scheme['name']}
-Category: {scheme['category']}
-Level: {scheme['level']}
-State: {scheme['state']}
-Benefits: {scheme['benefits']['description']}
-"""
-    if scheme['benefits']['amount']:
-        context += f"Amount: ₹{scheme['benefits']['amount']:,}\n"
+        session.profile = user_profile
+    # Recompute eligibility on a profile update, or when the corpus was reloaded since
+    if user_profile or session.eligibility_stale(corpus.generation):
+        eligible_ids = await scheme_retrieval_executor.run(corpus.eligibility_index.eligible_indices, session.profile)
+        session.set_eligibility(eligible_ids, len(corpus), corpus.generation)
+        scheme_session_store.update(session)
     
-    context += f"Details: {scheme['details']}\n"
+    # Retrieve relevant schemes using RAG, restricted to the eligible ones once a profile is known
+    retrieval = await scheme_retrieval_executor.run(
+        retrieve_relevant_schemes,
+        corpus,
+        message, 
+        session.eligible_ids(len(corpus)) if session.profile else None,
+        k=5
+    )
     
-    if scheme.get('application_process'):
-        context += f"How to Apply: {scheme['application_process']}\n"
+    # Build context for LLM from the precomputed blocks, within the token budget
+    schemes_context, included_ids, _ = corpus.contexts.assemble(retrieval.ids, settings.SCHEME_CONTEXT_TOKEN_BUDGET)
+    relevant_schemes = [corpus.schemes[i] for i in included_ids]
     
-    elig = scheme['eligibility']
-    context += "\nEligibility:\n"
-    if elig['min_age'] or elig['max_age']:
-        age_str = ""
-        if elig['min_age']:
-            age_str += f"Min age: {elig['min_age']}"
-        if elig['max_age']:
-            age_str += f", Max age: {elig['max_age']}"
-        context += f"- Age: {age_str}\n"
-    if elig['gender'] != 'any':
-        context += f"- Gender: {elig['gender']}\n"
-    if elig['max_family_income']:
-        context += f"- Max income: ₹{elig['max_family_income']:,}\n"
-    if 'Any' not in elig['caste']:
-        context += f"- Caste: {', '.join(elig['caste'])}\n"
+    # Build conversation history
+    history_text = ""
+    if context_history:
+        for msg in context_history[-5:]:  # Last 5 messages
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            history_text += f"{role.capitalize()}: {content}\n"
     
-    return context
-
-# API Routes
-@router.post("/chat")
-async def scheme_chat(chat_msg: ChatMessage):
-    """Chat endpoint for conversational scheme queries"""
-    try:
-        if not GROQ_API_KEY:
-            raise HTTPException(status_code=500, detail="GROQ_API_KEY not configured")
-        
-        if not normalized_schemes:
-            raise HTTPException(status_code=500, detail="Scheme data not loaded. Please check server logs.")
-        
-        user_id = chat_msg.user_id
-        message = chat_msg.message
-        user_profile = chat_msg.user_profile
-        context_history = chat_msg.context or []
-        
-        # Initialize session if needed
-        if user_id not in conversation_sessions:
-            conversation_sessions[user_id] = {
-                'profile': user_profile,
-                'eligible_schemes': [],
-                'history': []
-            }
-        
-        # Update profile if provided
-        if user_profile:
-            conversation_sessions[user_id]['profile'] = user_profile
-            # Get eligible schemes
-            eligible = [s for s in normalized_schemes if check_eligibility(s, user_profile)]
-            conversation_sessions[user_id]['eligible_schemes'] = eligible
-        
-        # Retrieve relevant schemes using RAG
-        session = conversation_sessions[user_id]
-        relevant_schemes = retrieve_relevant_schemes(
-            message, 
-            session.get('profile'),
-            k=5
-        )
-        
-        # Build context for LLM
-        schemes_context = "\n\n".join([format_scheme_for_context(s) for s in relevant_schemes])
-        
-        # Build conversation history
-        history_text = ""
-        if context_history:
-            for msg in context_history[-5:]:  # Last 5 messages
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                history_text += f"{role.capitalize()}: {content}\n"
-        
-        # Create prompt
-        system_prompt = """You are a helpful government schemes advisor chatbot for India. You help users find and understand government schemes they're eligible for.
+    # Create prompt
+    system_prompt = """You are a helpful government schemes advisor chatbot for India. You help users find and understand government schemes they're eligible for.
 
 Your role:
 1. Answer questions about specific schemes
@@ -503,10 +163,10 @@ Your role:
 
 Always be friendly, clear, and helpful. Use the scheme information provided to give accurate answers."""
 
-        user_prompt = f"""Based on the following relevant government schemes and user query, provide a helpful response.
+    user_prompt = f"""Based on the following relevant government schemes and user query, provide a helpful response.
 
 User Profile:
-{f"Age: {session['profile']['age']}, Gender: {session['profile']['gender']}, Income: ₹{session['profile']['family_income']}, Occupation: {session['profile']['occupation']}, State: {session['profile']['state']}" if session.get('profile') else "Not provided yet"}
+{f"Age: {session.profile['age']}, Gender: {session.profile['gender']}, Income: ₹{session.profile['family_income']}, Occupation: {session.profile['occupation']}, State: {session.profile['state']}" if session.profile else "Not provided yet"}
 
 Conversation History:
 {history_text if history_text else "This is the start of the conversation"}
@@ -518,75 +178,119 @@ User Question: {message}
 
 Provide a conversational, helpful response. If recommending schemes, format them nicely with markdown. If the user asks about application process, eligibility, or specific details, provide that information from the schemes data above."""
 
-        # Call Groq API
-        client = Groq(api_key=GROQ_API_KEY)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    return session, relevant_schemes, messages
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# API Routes
+@router.post("/chat")
+async def scheme_chat(chat_msg: ChatMessage):
+    """Chat endpoint for conversational scheme queries"""
+    try:
+        if not GROQ_API_KEY:
+            raise HTTPException(status_code=500, detail="GROQ_API_KEY not configured")
         
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=2000
-        )
+        session, relevant_schemes, messages = await prepare_chat(chat_msg)
+        
+        # Call Groq API
+        chat_completion = await groq_client.chat.completions.create(messages=messages, **CHAT_COMPLETION_PARAMS)
         
         response_text = chat_completion.choices[0].message.content
         
         # Store in session history
-        session['history'].append({
-            'user': message,
-            'assistant': response_text,
-            'schemes_used': [s['name'] for s in relevant_schemes]
-        })
+        scheme_session_store.add_turn(session, chat_msg.message, response_text, [s['name'] for s in relevant_schemes])
         
         return {
             "response": response_text,
             "relevant_schemes": [s['name'] for s in relevant_schemes],
-            "eligible_count": len(session.get('eligible_schemes', []))
+            "eligible_count": session.eligible_count
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in scheme_chat: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def scheme_chat_stream(chat_msg: ChatMessage):
+    """Streaming variant of /chat as Server-Sent Events.
+
+    Events: `schemes` (relevant scheme names, sent before the LLM call starts),
+    `token` for each content delta, then `done` with the full response, or
+    `error` if the completion fails midway. Session history is updated once the
+    stream completes.
+    """
+    try:
+        if not GROQ_API_KEY:
+            raise HTTPException(status_code=500, detail="GROQ_API_KEY not configured")
+        
+        session, relevant_schemes, messages = await prepare_chat(chat_msg)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in scheme_chat_stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    scheme_names = [s['name'] for s in relevant_schemes]
+    
+    async def events():
+        yield sse_event("schemes", {"relevant_schemes": scheme_names, "eligible_count": session.eligible_count})
+        
+        parts = []
+        stream = None
+        try:
+            stream = await groq_client.chat.completions.create(messages=messages, stream=True, **CHAT_COMPLETION_PARAMS)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield sse_event("token", {"content": delta})
+        except Exception as e:
+            print(f"Error in scheme_chat_stream: {str(e)}")
+            yield sse_event("error", {"detail": str(e)})
+            return
+        finally:
+            # Also runs when the client disconnects; releases the pooled connection
+            if stream is not None:
+                await stream.close()
+        
+        response_text = "".join(parts)
+        scheme_session_store.add_turn(session, chat_msg.message, response_text, scheme_names)
+        yield sse_event("done", {"response": response_text})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/recommend")
 async def recommend_schemes(user_profile: UserProfile):
     """Initial scheme recommendation based on user profile"""
     try:
-        if not normalized_schemes:
-            raise HTTPException(status_code=500, detail="Scheme data not loaded. Please check server logs.")
+        corpus = await get_corpus()
         
         user_dict = user_profile.dict()
         
-        # Filter eligible schemes
-        eligible_schemes = [s for s in normalized_schemes if check_eligibility(s, user_dict)]
+        # Filter eligible schemes and rank them off the event loop
+        eligible_ids, top_schemes = await scheme_retrieval_executor.run(rank_recommendations, corpus, user_dict, 8)
         
-        if len(eligible_schemes) == 0:
+        if len(eligible_ids) == 0:
             return {
                 "response": "Unfortunately, no schemes match your eligibility criteria. You can still ask me questions about government schemes!",
                 "count": 0
             }
         
-        # Get top schemes using semantic search
-        query = f"{user_dict['interests']} for {user_dict['gender']} {user_dict['occupation']} age {user_dict['age']}"
-        query_embedding = model.encode([query], convert_to_numpy=True)
-        
-        # Create temporary index for eligible schemes
-        eligible_summaries = [s['semantic_summary'] for s in eligible_schemes]
-        eligible_embeddings = model.encode(eligible_summaries, convert_to_numpy=True)
-        
-        temp_index = faiss.IndexFlatL2(dimension)
-        temp_index.add(eligible_embeddings.astype('float32'))
-        
-        k = min(8, len(eligible_schemes))
-        distances, indices = temp_index.search(query_embedding.astype('float32'), k)
-        
-        top_schemes = [eligible_schemes[i] for i in indices[0]]
-        
         # Format as markdown
         markdown = "# Your Personalized Government Schemes\n\n"
-        markdown += f"Based on your profile, I found **{len(eligible_schemes)} schemes** you're eligible for. Here are the top recommendations:\n\n---\n\n"
+        markdown += f"Based on your profile, I found **{len(eligible_ids)} schemes** you're eligible for. Here are the top recommendations:\n\n---\n\n"
         
         for i, scheme in enumerate(top_schemes, 1):
             markdown += f"## {i}. {scheme['name']}\n\n"
@@ -610,29 +314,126 @@ async def recommend_schemes(user_profile: UserProfile):
         
         return {
             "response": markdown,
-            "count": len(eligible_schemes),
+            "count": len(eligible_ids),
             "top_schemes": [s['name'] for s in top_schemes]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in recommend_schemes: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/search")
+async def search_schemes(request: SchemeSearchRequest):
+    """Ranked scheme ids and names for a query, without calling the LLM.
+    Scheme names and name prefixes are matched directly; other queries are ranked semantically."""
+    try:
+        corpus = await get_corpus()
+        profile = request.user_profile.dict() if request.user_profile else None
+        page = await scheme_retrieval_executor.run(
+            scheme_searcher.search, corpus, request.query, profile, request.cursor, request.limit
+        )
+        return {
+            "results": page.results,
+            "match": page.match,
+            "total": page.total,
+            "next_cursor": page.next_cursor
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in search_schemes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/status")
 async def status():
     """Get status of scheme recommender"""
+    corpus = scheme_corpus_manager.corpus
     return {
-        "schemes_loaded": len(normalized_schemes),
-        "model_loaded": model is not None,
-        "faiss_index_ready": faiss_index is not None,
-        "active_sessions": len(conversation_sessions),
-        "groq_configured": bool(GROQ_API_KEY)
+        "loader": scheme_corpus_manager.status(),
+        "schemes_loaded": len(corpus) if corpus else 0,
+        "model_loaded": corpus is not None and corpus.model is not None,
+        "faiss_index_ready": corpus is not None and corpus.index is not None,
+        "encoder": corpus.model_name if corpus else None,
+        "index": scheme_index_builder.describe(),
+        "active_sessions": len(scheme_session_store),
+        "sessions": scheme_session_store.stats(),
+        "groq_configured": bool(GROQ_API_KEY),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "eligibility_cache": corpus.eligibility_index.cache_stats() if corpus else None,
+        "query_encode_batcher": query_encode_batcher.stats(),
+        "retrieval_executor": scheme_retrieval_executor.stats(),
+        "filtered_search": scheme_filtered_searcher.stats(),
+        "search": scheme_searcher.stats()
     }
 
-# Load data on module import
-try:
-    load_schemes_data()
-except Exception as e:
-    print(f"✗ Error loading schemes data: {e}")
-    print("  Scheme recommender will not be available until data is loaded")
-    print("  Please ensure myscheme_raw.json is in the correct location")
\ No newline at end of file
+@router.post("/admin/reload", status_code=202)
+async def reload_schemes(x_admin_token: Optional[str] = Header(None)):
+    """Rebuild the corpus, model and index in the background and swap them in atomically"""
+    require_admin(x_admin_token)
+    if not scheme_corpus_manager.start():
+        raise HTTPException(status_code=409, detail="A scheme corpus build is already in progress")
+    return {"message": "Scheme corpus reload started", "loader": scheme_corpus_manager.status()}
+
+async def apply_scheme_changes(upserts: List[Dict], delete_ids: List[str]) -> Dict:
+    """Run an incremental corpus update off the event loop and map its failures to HTTP errors"""
+    await get_corpus()
+    try:
+        summary = await scheme_retrieval_executor.run(scheme_corpus_manager.apply_changes, upserts, delete_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in apply_scheme_changes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if summary is None:
+        raise HTTPException(status_code=409, detail="A scheme corpus build or update is already in progress")
+    return summary
+
+@router.put("/admin/schemes/{scheme_id}")
+async def upsert_scheme(scheme_id: str, scheme: Dict = Body(...), x_admin_token: Optional[str] = Header(None)):
+    """Add or replace one scheme from its raw myscheme record, re-embedding it only if its summary changed.
+    Other serve.py workers map the new revision in before their next scheme request."""
+    require_admin(x_admin_token)
+    return await apply_scheme_changes([dict(scheme, slug=scheme_id)], [])
+
+@router.delete("/admin/schemes/{scheme_id}")
+async def delete_scheme(scheme_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Remove one scheme from the corpus and its index"""
+    require_admin(x_admin_token)
+    if scheme_id not in (await get_corpus()).position_by_id:
+        raise HTTPException(status_code=404, detail=f"Scheme '{scheme_id}' not found")
+    return await apply_scheme_changes([], [scheme_id])
+
+@router.post("/admin/schemes")
+async def update_schemes(changes: SchemeChanges, x_admin_token: Optional[str] = Header(None)):
+    """Apply a batch of upserts and deletions (e.g. a nightly refresh) as one corpus revision"""
+    require_admin(x_admin_token)
+    if not changes.upsert and not changes.delete:
+        raise HTTPException(status_code=400, detail="No scheme changes given")
+    return await apply_scheme_changes(changes.upsert, changes.delete)
+
+@router.on_event("startup")
+def start_scheme_loading():
+    """Build the corpus off the startup path so the server can bind its port immediately.
+    Workers forked by serve.py inherit a preloaded corpus and cache and skip both."""
+    if scheme_corpus_manager.ready:
+        return
+    query_embedding_cache.load()
+    scheme_corpus_manager.start()
+
+@router.on_event("shutdown")
+async def close_groq_client():
+    """Close pooled LLM connections"""
+    await groq_client.close()
+
+@router.on_event("shutdown")
+def save_query_embedding_cache():
+    """Persist hot query embeddings so they survive a restart"""
+    try:
+        query_embedding_cache.save()
+    except Exception as e:
+        print(f"⚠ Could not save query embedding cache: {e}")
+    scheme_retrieval_executor.shutdown()
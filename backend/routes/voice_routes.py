@@ -5,6 +5,7 @@ import httpx
 import io
 from services.groq_service import groq_service
 from services.document_processor import document_processor
+from services.uploads import read_upload
 from config.settings import settings
 import speech_recognition as sr
 from pydub import AudioSegment
@@ -91,17 +92,8 @@ async def analyze_and_speak(
         source_name = ""
         if document:
             print("Processing document...")
-            doc_bytes = await document.read()
-            
-            if len(doc_bytes) > settings.MAX_FILE_SIZE:
-                raise HTTPException(status_code=400, detail="Document too large")
-            
-            content_type = document.content_type.lower() if document.content_type else ""
-            document_text = document_processor.process_file(
-                doc_bytes,
-                content_type,
-                document.filename
-            )
+            upload = await read_upload(document, settings.MAX_FILE_SIZE)
+            document_text = document_processor.process_upload(upload).text
             source_name = document.filename
             print(f"Document text length: {len(document_text)}")
         
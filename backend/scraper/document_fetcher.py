@@ -33,12 +33,13 @@ def create_id_to_scheme_map(schemes_raw_data):
     id_map = {}
     if not isinstance(schemes_raw_data, dict):
         return id_map
-    for value in schemes_raw_data.values():
+    for slug, value in schemes_raw_data.items():
         if value is None or not isinstance(value, dict):
             continue
         scheme_id = value.get('data', {}).get('_id')
         if scheme_id:
-            id_map[scheme_id] = value
+            # The raw file is keyed by slug; keep it as the scheme's stable id
+            id_map[scheme_id] = dict(value, slug=slug)
     return id_map
 
 def fetch_document_data(scheme_id):
@@ -134,6 +135,7 @@ def process_and_combine_data():
 
         # Create the new structured dictionary
         new_entry = {
+            "slug": scheme_info.get('slug'),
             "schemeName": scheme_en.get('basicDetails', {}).get('schemeName'),
             "Details": details.strip(),
             "Benefits": scheme_content.get('benefits_md'),
@@ -0,0 +1,98 @@
+"""
+Pre-fork server for running the API with several workers.
+
+`uvicorn --workers N` spawns fresh interpreters, so every worker imports torch,
+loads the embedding model and opens the scheme artifact on its own. This
+launcher loads them once and then forks the workers: the model weights are
+shared copy-on-write, and the memory-mapped scheme store, embeddings and FAISS
+index are shared through the page cache.
+
+Workers that exit unexpectedly are replaced from the parent, so they come up
+with the preloaded corpus too. Scheme upserts and deletes through the admin
+API are written to the shared artifact, and every worker maps the new revision
+in before serving its next scheme request. /schemes/admin/reload only reloads
+the worker that serves it; restart this process to roll a new scheme dump out
+to all of them.
+
+POSIX only. Run from the backend directory:
+    python serve.py --workers 4 [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import gc
+import os
+import signal
+import traceback
+import uvicorn
+from main import app
+from services.embedding_cache import query_embedding_cache
+from services.scheme_corpus import scheme_corpus_manager
+
+
+def spawn_worker(config: uvicorn.Config, sock) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 0
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        print(traceback.format_exc())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API in pre-forked workers sharing the scheme model and index")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '2')))
+    args = parser.parse_args()
+
+    query_embedding_cache.load()
+    if not scheme_corpus_manager.preload():
+        print("⚠ Scheme corpus was not preloaded; each worker will load its own on startup")
+
+    # Everything allocated so far lives as long as the workers; freezing it keeps the
+    # cyclic GC from writing to those objects and un-sharing their pages after the fork
+    gc.collect()
+    gc.freeze()
+
+    config = uvicorn.Config(app, host=args.host, port=args.port)
+    sock = config.bind_socket()
+    workers = {spawn_worker(config, sock) for _ in range(args.workers)}
+    print(f"✓ Started {len(workers)} workers on http://{args.host}:{args.port}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠ Worker {pid} exited with status {status}, starting a replacement")
+            workers.add(spawn_worker(config, sock))
+
+    sock.close()
+    print("✓ All workers stopped")
+
+
+if __name__ == '__main__':
+    main()
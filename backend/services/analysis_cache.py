@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from config.settings import settings
+
+ANALYSIS_CACHE_BACKENDS = ('memory', 'sqlite', 'none')
+
+
+class MemoryAnalysisBackend:
+    """In-process LRU of serialized analyses with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "evictions": self.evictions}
+
+
+class SQLiteAnalysisBackend:
+    """Analyses in a SQLite file, so they survive restarts and are shared by pre-forked workers.
+    Expired rows are purged, and the least recently used dropped past max_entries, on every write."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use, so a worker forked by serve.py gets its own connection
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS analyses_accessed ON analyses (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)", (key, value, now + ttl_seconds, now))
+                conn.execute("DELETE FROM analyses WHERE expires_at <= ?", (now,))
+                excess = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY accessed_at LIMIT ?)",
+                        (excess,)
+                    )
+                    self.evictions += excess
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "evictions": self.evictions}
+
+
+def create_backend(name: str, max_entries: int, path: str = ""):
+    if name not in ANALYSIS_CACHE_BACKENDS:
+        raise ValueError(f"Unknown analysis cache backend '{name}'. Expected one of: {', '.join(ANALYSIS_CACHE_BACKENDS)}")
+    if name == 'memory':
+        return MemoryAnalysisBackend(max_entries)
+    if name == 'sqlite':
+        return SQLiteAnalysisBackend(path, max_entries)
+    return None
+
+
+class AnalysisCache:
+    """Document analysis results keyed by what determines them: the document text the
+    prompt sees, the user query, the form-filling mode, the model and the prompt version.
+
+    Text and query are whitespace-normalized before hashing, so trivially different
+    re-submissions share an entry; case is kept, since the model answers in kind. Entries expire after
+    ttl_seconds. Backend errors are logged and treated as misses.
+    """
+
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def key(text: str, user_query: Optional[str], form_mode: bool, model: str, prompt_version: int) -> str:
+        payload = json.dumps([
+            ' '.join(text.split()),
+            ' '.join((user_query or '').split()),
+            form_mode,
+            model,
+            prompt_version
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠ Analysis cache read failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Stored serialized, so callers can never mutate a cached analysis
+        return json.loads(value)
+
+    def put(self, key: str, analysis: Dict):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps(analysis, ensure_ascii=False), self.ttl_seconds)
+        except Exception as e:
+            print(f"⚠ Analysis cache write failed: {e}")
+            return
+        with self._lock:
+            self.stores += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+        if self.enabled:
+            try:
+                stats.update(self.backend.stats())
+            except Exception as e:
+                stats["error"] = str(e)
+        return stats
+
+
+analysis_cache = AnalysisCache(
+    create_backend(settings.ANALYSIS_CACHE_BACKEND, settings.ANALYSIS_CACHE_MAX_ENTRIES, settings.ANALYSIS_CACHE_PATH),
+    settings.ANALYSIS_CACHE_TTL_SECONDS
+)
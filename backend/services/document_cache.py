@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from config.settings import settings
+
+
+class DocumentTextCache:
+    """Two-tier cache of extracted document text, keyed by the SHA-256 of the file bytes.
+
+    The key also covers the file kind and an extractor version, so the same
+    bytes uploaded to /document/analyze and /voice/analyze-and-speak share an
+    entry, while a change to the extraction logic or its settings misses and
+    re-extracts. Entries live in an in-memory LRU bounded by text size and in a
+    directory of JSON files bounded by total bytes, which pre-forked workers
+    share; the least recently used files are removed when it grows past its
+    budget.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: str = "", disk_bytes: int = 0):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._entry_sizes: Dict[str, int] = {}
+        self._memory_used = 0
+        # Bytes this process believes the disk tier holds; rescanned when it reaches the budget
+        self._disk_used: Optional[int] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def key(file_bytes: bytes, kind: str, version: str) -> str:
+        return DocumentTextCache.key_for_hash(hashlib.sha256(file_bytes).hexdigest(), kind, version)
+
+    @staticmethod
+    def key_for_hash(content_hash: str, kind: str, version: str) -> str:
+        """key() for a file whose SHA-256 hex digest is already known, e.g. hashed while uploading"""
+        return hashlib.sha256(f"{content_hash}:{kind}:{version}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict):
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        with self._lock:
+            self.stores += 1
+
+    def _remember(self, key: str, entry: Dict):
+        size = len(entry.get('text', '')) + 256
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._memory_used -= self._entry_sizes[key]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._entry_sizes[key] = size
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._memory_used -= self._entry_sizes.pop(evicted)
+                self.memory_evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Mark it recently used for disk eviction
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠ Could not read cached document text {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: Dict):
+        if not self.disk_dir or self.disk_bytes <= 0:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+            if len(data) > self.disk_bytes:
+                return
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠ Could not write cached document text {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_used is None:
+                self._disk_used = self._scan_disk_usage()
+            else:
+                self._disk_used += len(data)
+            if self._disk_used > self.disk_bytes:
+                self._evict_disk()
+
+    def _cache_files(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._cache_files())
+
+    def _evict_disk(self):
+        """Remove least recently used files until the disk tier is at 90% of its budget.
+        Rescans the directory, since other workers write to it too."""
+        files = sorted(self._cache_files(), key=lambda item: item[2])
+        used = sum(size for _, size, _ in files)
+        target = int(self.disk_bytes * 0.9)
+        for path, size, _ in files:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+                used -= size
+                self.disk_evictions += 1
+            except FileNotFoundError:
+                used -= size
+        self._disk_used = used
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._entry_sizes.clear()
+            self._memory_used = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_used,
+                "max_memory_bytes": self.memory_bytes,
+                "disk_bytes": self._disk_used,
+                "max_disk_bytes": self.disk_bytes if self.disk_dir else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
+
+
+document_text_cache = DocumentTextCache(
+    settings.DOCUMENT_CACHE_MEMORY_BYTES,
+    settings.DOCUMENT_CACHE_DIR,
+    settings.DOCUMENT_CACHE_DISK_BYTES
+)
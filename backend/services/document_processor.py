@@ -1,55 +1,215 @@
+import hashlib
 import io
-import PyPDF2
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 import docx
 import fitz
 from PIL import Image
-from services.vision_service import vision_service
+from config.settings import settings
+from services.document_cache import document_text_cache
+from services.uploads import UploadedDocument
+from services.vision_service import OcrResult, vision_service
+
+# Bump whenever extraction output changes, so cached document text is re-extracted
+EXTRACTOR_VERSION = 4
+
+# Messages the extractors return instead of document text
+_FAILURE_PREFIXES = ("PDF extraction error", "DOCX extraction error", "Invalid image")
+
+class OcrPageTiming(NamedTuple):
+    page: int
+    render_ms: float    # rasterizing the page
+    wait_ms: float      # queued for a free OCR thread
+    ocr_ms: float       # the Vision request that carried the page
+    batch_pages: int    # pages in that request
+    chars: int
+
+class PdfExtraction(NamedTuple):
+    text: str
+    page_count: int
+    text_pages: List[int]       # 1-based pages taken from the embedded text layer
+    ocr_pages: List[int]        # pages OCRed because they had too little embedded text
+    unreadable_pages: List[int] # pages with no text at all: OCR unavailable, failed, found nothing or past OCR_MAX_PAGES
+    ocr_failed_pages: List[int] # pages whose Vision request failed, so a retry may read them
+    
+    def report(self) -> Dict:
+        return {
+            "page_count": self.page_count,
+            "text_pages": self.text_pages,
+            "ocr_pages": self.ocr_pages,
+            "unreadable_pages": self.unreadable_pages,
+            "ocr_failed_pages": self.ocr_failed_pages
+        }
+
+class ExtractedDocument(NamedTuple):
+    text: str
+    report: Optional[Dict]  # PdfExtraction.report() for PDFs, else None
+    ocr_failed: bool = False  # a Vision request failed; the result may differ on a retry, so it is not cached
 
 class DocumentProcessor:
     
+    def __init__(self):
+        # Shared by all requests, so concurrent Vision calls stay bounded process-wide
+        self._ocr_executor = None
+        self._lock = threading.Lock()
+    
     def extract_text_from_pdf(self, file_bytes: bytes) -> str:
         try:
-            pdf_file = io.BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            
-            if text.strip():
-                return text.strip()
-            
-            return self._extract_with_ocr(file_bytes)
+            return self.extract_pdf(file_bytes).text
         except Exception as e:
             return f"PDF extraction error: {str(e)}"
     
-    def _extract_with_ocr(self, file_bytes: bytes) -> str:
-        if not vision_service.is_available():
-            return "No text found - OCR not available"
+    def extract_pdf(self, file_bytes: bytes) -> PdfExtraction:
+        """Extract a PDF page by page in one pass over the document.
         
+        Pages with at least PDF_MIN_PAGE_TEXT_CHARS characters of embedded text
+        use it; the others (scans, signature pages, image annexures) are OCRed,
+        up to OCR_MAX_PAGES of them. A short page that is not OCRed, or where OCR
+        finds nothing, keeps its embedded text. Pages stay in document order.
+        """
+        pdf_doc = fitz.open(stream=file_bytes, filetype="pdf")
         try:
-            pdf_doc = fitz.open(stream=file_bytes, filetype="pdf")
-            all_text = []
+            page_texts = {}
+            scanned = []
+            for page_num in range(pdf_doc.page_count):
+                page_text = pdf_doc[page_num].get_text().strip()
+                if page_text:
+                    page_texts[page_num] = page_text
+                if len(page_text) < settings.PDF_MIN_PAGE_TEXT_CHARS:
+                    scanned.append(page_num)
+            
+            ocr_texts, ocr_failed = {}, []
+            if scanned and vision_service.is_available():
+                started = time.perf_counter()
+                pages, timings = self._ocr_pages(pdf_doc, scanned[:settings.OCR_MAX_PAGES])
+                self._print_ocr_timings(timings, time.perf_counter() - started)
+                ocr_texts = {page_num: result.text for page_num, result in pages if result.text}
+                ocr_failed = [page_num for page_num, result in pages if result.error]
+            
+            parts, text_pages = [], []
+            for page_num in range(pdf_doc.page_count):
+                if page_num in ocr_texts:
+                    parts.append(f"--- Page {page_num + 1} ---\n{ocr_texts[page_num]}")
+                elif page_num in page_texts:
+                    parts.append(page_texts[page_num])
+                    text_pages.append(page_num + 1)
             
-            for page_num in range(min(pdf_doc.page_count, 20)):
-                page = pdf_doc[page_num]
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                img_data = pix.tobytes("png")
-                
-                ocr_text = vision_service.extract_text_from_image(img_data)
-                if not ocr_text.startswith("Error") and ocr_text != "No text found in image":
-                    all_text.append(f"--- Page {page_num + 1} ---\n{ocr_text}")
+            if parts:
+                text = "\n\n".join(parts)
+            elif not vision_service.is_available():
+                text = "No text found - OCR not available"
+            else:
+                text = "No text extracted"
             
+            extraction = PdfExtraction(
+                text, pdf_doc.page_count,
+                text_pages,
+                [page_num + 1 for page_num in sorted(ocr_texts)],
+                [page_num + 1 for page_num in scanned if page_num not in ocr_texts and page_num not in page_texts],
+                [page_num + 1 for page_num in ocr_failed]
+            )
+            print(f"PDF pages: {pdf_doc.page_count} total, {len(extraction.text_pages)} text, "
+                  f"{len(extraction.ocr_pages)} OCRed {extraction.ocr_pages}, "
+                  f"{len(extraction.unreadable_pages)} unreadable {extraction.unreadable_pages}"
+                  + (f", OCR failed on {extraction.ocr_failed_pages}" if extraction.ocr_failed_pages else ""))
+            return extraction
+        finally:
             pdf_doc.close()
-            return "\n\n".join(all_text) if all_text else "No text extracted"
-        except Exception as e:
-            return f"OCR extraction error: {str(e)}"
     
-    def extract_text_from_docx(self, file_bytes: bytes) -> str:
+    def ocr_pdf_pages(self, file_bytes: bytes, page_numbers: Optional[Sequence[int]] = None):
+        """OCR pages of a PDF (0-based, default the first OCR_MAX_PAGES) whatever text they contain"""
+        pdf_doc = fitz.open(stream=file_bytes, filetype="pdf")
         try:
-            docx_file = io.BytesIO(file_bytes)
+            if page_numbers is None:
+                page_numbers = range(min(pdf_doc.page_count, settings.OCR_MAX_PAGES))
+            return self._ocr_pages(pdf_doc, page_numbers)
+        finally:
+            pdf_doc.close()
+    
+    def _ocr_pages(self, pdf_doc, page_numbers: Sequence[int]) -> Tuple[List[Tuple[int, OcrResult]], List[OcrPageTiming]]:
+        """OCR the given pages of an open document. Returns (page number, OcrResult) pairs and timings, in the given order.
+        
+        Pages are rendered here while earlier ones are still being OCRed on the
+        shared pool, grouped OCR_BATCH_SIZE to a Vision request. Rendering stays
+        at most two requests per pool thread ahead, bounding the page images held.
+        """
+        pending = deque()
+        pages, timings = [], []
+        batch, batch_bytes = [], 0
+        
+        def submit():
+            nonlocal batch, batch_bytes
+            pending.append(self._get_ocr_executor().submit(self._ocr_batch, batch, time.perf_counter()))
+            batch, batch_bytes = [], 0
+        
+        for page_num in page_numbers:
+            render_start = time.perf_counter()
+            pix = pdf_doc[page_num].get_pixmap(matrix=fitz.Matrix(2, 2))
+            img_data = pix.tobytes("png")
+            render_ms = (time.perf_counter() - render_start) * 1000
+            
+            if batch and batch_bytes + len(img_data) > settings.OCR_BATCH_MAX_BYTES:
+                submit()
+            batch.append((page_num, img_data, render_ms))
+            batch_bytes += len(img_data)
+            if len(batch) >= settings.OCR_BATCH_SIZE:
+                submit()
+            
+            while len(pending) > settings.OCR_MAX_CONCURRENCY * 2:
+                self._collect(pending.popleft(), pages, timings)
+        
+        if batch:
+            submit()
+        while pending:
+            self._collect(pending.popleft(), pages, timings)
+        return pages, timings
+    
+    @staticmethod
+    def _collect(future, pages: List, timings: List):
+        for page_num, result, timing in future.result():
+            pages.append((page_num, result))
+            timings.append(timing)
+    
+    def _ocr_batch(self, batch: List[Tuple[int, bytes, float]], submitted_at: float) -> List:
+        """One Vision request for a batch of rendered pages; runs on the OCR pool"""
+        ocr_start = time.perf_counter()
+        images = [img_data for _, img_data, _ in batch]
+        if len(images) == 1:
+            results = [vision_service.ocr_image(images[0])]
+        else:
+            results = vision_service.ocr_images(images)
+        ocr_ms = (time.perf_counter() - ocr_start) * 1000
+        wait_ms = (ocr_start - submitted_at) * 1000
+        return [
+            (page_num, result, OcrPageTiming(page_num + 1, render_ms, wait_ms, ocr_ms, len(batch), len(result.text)))
+            for (page_num, _, render_ms), result in zip(batch, results)
+        ]
+    
+    def _get_ocr_executor(self) -> ThreadPoolExecutor:
+        if self._ocr_executor is None:
+            with self._lock:
+                if self._ocr_executor is None:
+                    self._ocr_executor = ThreadPoolExecutor(max_workers=settings.OCR_MAX_CONCURRENCY, thread_name_prefix='ocr')
+        return self._ocr_executor
+    
+    @staticmethod
+    def _print_ocr_timings(timings: List[OcrPageTiming], elapsed: float):
+        print(f"\n=== OCR timings: {len(timings)} pages in {elapsed * 1000:.0f} ms ===")
+        print("page  render_ms  wait_ms  ocr_ms  batch  chars")
+        for t in timings:
+            print(f"{t.page:>4}  {t.render_ms:>9.1f}  {t.wait_ms:>7.1f}  {t.ocr_ms:>6.1f}  {t.batch_pages:>5}  {t.chars:>5}")
+        # Pages of one batch share its request time
+        print(f"Rendering {sum(t.render_ms for t in timings):.0f} ms, "
+              f"Vision {sum(t.ocr_ms / t.batch_pages for t in timings):.0f} ms "
+              f"over {round(sum(1 / t.batch_pages for t in timings))} requests")
+    
+    def extract_text_from_docx(self, file_bytes) -> str:
+        """file_bytes may also be a seekable file object, which is read in place"""
+        try:
+            docx_file = file_bytes if hasattr(file_bytes, 'read') else io.BytesIO(file_bytes)
             doc = docx.Document(docx_file)
             text = "\n".join([para.text for para in doc.paragraphs if para.text])
             return text.strip() if text.strip() else "No text found in document"
@@ -57,26 +217,86 @@ class DocumentProcessor:
             return f"DOCX extraction error: {str(e)}"
     
     def extract_text_from_image(self, file_bytes: bytes) -> str:
+        return self._extract_image(file_bytes).text
+    
+    def _extract_image(self, file_bytes: bytes) -> ExtractedDocument:
         try:
             Image.open(io.BytesIO(file_bytes)).verify()
         except Exception as e:
-            return f"Invalid image: {str(e)}"
+            return ExtractedDocument(f"Invalid image: {str(e)}", None)
         
-        return vision_service.extract_text_from_image(file_bytes)
+        result = vision_service.ocr_image(file_bytes)
+        return ExtractedDocument(result.message(), None, result.error is not None)
     
-    def process_file(self, file_bytes: bytes, content_type: str, filename: str) -> str:
+    @staticmethod
+    def _file_kind(content_type: str, filename: str) -> Optional[str]:
         filename_lower = filename.lower()
-        
         if content_type == "application/pdf" or filename_lower.endswith('.pdf'):
-            return self.extract_text_from_pdf(file_bytes)
-        
-        elif (content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" 
-              or filename_lower.endswith('.docx')):
-            return self.extract_text_from_docx(file_bytes)
+            return 'pdf'
+        if (content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" 
+                or filename_lower.endswith('.docx')):
+            return 'docx'
+        if content_type.startswith("image/") or filename_lower.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
+            return 'image'
+        return None
+    
+    @staticmethod
+    def cache_version() -> str:
+        """EXTRACTOR_VERSION plus the settings that change extraction output, including
+        whether OCR is configured, so scanned pages are read once Vision is set up"""
+        ocr = 'ocr' if vision_service.is_available() else 'no-ocr'
+        return f"{EXTRACTOR_VERSION}:{settings.PDF_MIN_PAGE_TEXT_CHARS}:{settings.OCR_MAX_PAGES}:{ocr}"
+    
+    def process_document(self, file_bytes: bytes, content_type: str, filename: str) -> ExtractedDocument:
+        """Extract text from an upload, with a page report for PDFs.
+        Results are cached by file content, so re-uploads skip parsing and OCR."""
+        content_hash = hashlib.sha256(file_bytes).hexdigest()
+        return self._process_cached(content_type, filename, content_hash, lambda kind: self._extract(kind, file_bytes))
+    
+    def process_upload(self, upload: UploadedDocument) -> ExtractedDocument:
+        """process_document() for an upload read with read_upload(), reusing its hash and
+        reading the spooled file in place rather than a copy of its bytes"""
+        return self._process_cached(upload.content_type, upload.filename, upload.sha256,
+                                    lambda kind: self._extract_upload(kind, upload))
+    
+    def _process_cached(self, content_type: str, filename: str, content_hash: str, extract) -> ExtractedDocument:
+        kind = self._file_kind(content_type, filename)
+        if kind is None:
+            return ExtractedDocument(f"Unsupported file type: {content_type}", None)
         
-        elif content_type.startswith("image/") or filename_lower.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
-            return self.extract_text_from_image(file_bytes)
+        key = document_text_cache.key_for_hash(content_hash, kind, self.cache_version())
+        cached = document_text_cache.get(key)
+        if cached is not None:
+            print(f"Document text cache hit ({kind}, {len(cached['text'])} chars)")
+            return ExtractedDocument(cached['text'], cached['report'])
         
-        return f"Unsupported file type: {content_type}"
+        document = extract(kind)
+        # Pages unreadable for a fixed reason (blank, past OCR_MAX_PAGES) are covered by
+        # cache_version; a failed Vision request may succeed next time, so that result is not kept
+        if not document.ocr_failed and not document.text.startswith(_FAILURE_PREFIXES):
+            document_text_cache.put(key, {"text": document.text, "report": document.report})
+        return document
+    
+    def _extract_upload(self, kind: str, upload: UploadedDocument) -> ExtractedDocument:
+        if kind == 'docx':
+            upload.file.seek(0)
+            return self._extract(kind, upload.file)
+        with upload.buffer() as data:
+            # The Vision client sends bytes, so images are the one copy left
+            return self._extract(kind, bytes(data) if kind == 'image' else data)
+    
+    def _extract(self, kind: str, file_bytes: bytes) -> ExtractedDocument:
+        if kind == 'pdf':
+            try:
+                extraction = self.extract_pdf(file_bytes)
+                return ExtractedDocument(extraction.text, extraction.report(), bool(extraction.ocr_failed_pages))
+            except Exception as e:
+                return ExtractedDocument(f"PDF extraction error: {str(e)}", None)
+        if kind == 'docx':
+            return ExtractedDocument(self.extract_text_from_docx(file_bytes), None)
+        return self._extract_image(file_bytes)
+    
+    def process_file(self, file_bytes: bytes, content_type: str, filename: str) -> str:
+        return self.process_document(file_bytes, content_type, filename).text
 
 document_processor = DocumentProcessor()
\ No newline at end of file
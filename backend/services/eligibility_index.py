@@ -0,0 +1,187 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Bit 0 stands for any user value that no scheme in the corpus restricts on
+OTHER_BIT = np.uint64(1)
+ALL_BITS = np.uint64(0xFFFFFFFFFFFFFFFF)
+MAX_VOCAB = 63
+
+
+def check_eligibility(scheme, user):
+    """Check if user is eligible for a scheme"""
+    elig = scheme['eligibility']
+
+    if elig['min_age'] is not None and user['age'] < elig['min_age']:
+        return False
+    if elig['max_age'] is not None and user['age'] > elig['max_age']:
+        return False
+
+    if elig['gender'] != 'any' and user['gender'] != elig['gender']:
+        return False
+
+    if elig['max_family_income'] is not None and user['family_income'] > elig['max_family_income']:
+        return False
+
+    if 'Any' not in elig['caste'] and user['caste'] not in elig['caste']:
+        return False
+
+    if 'any' not in elig['occupation'] and user['occupation'] not in elig['occupation']:
+        return False
+
+    if elig['residence'] != 'any' and user['residence'] != elig['residence']:
+        return False
+
+    if elig['state_specific'] is not None and user['state'] != elig['state_specific']:
+        return False
+
+    return True
+
+
+class _BitmaskColumn:
+    """Allowed values per scheme as a uint64 bitmask; unrestricted schemes allow every bit"""
+
+    def __init__(self, name: str, allowed_values: List):
+        self.name = name
+        self.codes: Dict = {}
+        masks = np.empty(len(allowed_values), dtype=np.uint64)
+        for i, values in enumerate(allowed_values):
+            if values is None:
+                masks[i] = ALL_BITS
+                continue
+            mask = np.uint64(0)
+            for value in values:
+                if value not in self.codes:
+                    if len(self.codes) >= MAX_VOCAB:
+                        raise ValueError(f"Too many distinct {name} values for a 64-bit eligibility mask")
+                    self.codes[value] = np.uint64(1) << np.uint64(len(self.codes) + 1)
+                mask |= self.codes[value]
+            masks[i] = mask
+        self.masks = masks
+
+    def bit_for(self, value) -> np.uint64:
+        try:
+            return self.codes.get(value, OTHER_BIT)
+        except TypeError:
+            # Unhashable profile values can never equal a scheme value
+            return OTHER_BIT
+
+    def allows(self, value) -> np.ndarray:
+        return (self.masks & self.bit_for(value)) != 0
+
+
+class EligibilityIndex:
+    """Columnar, vectorized equivalent of check_eligibility over the whole corpus.
+
+    Numeric limits are float64 columns with NaN for "no limit" (every comparison
+    against NaN is False, so negated comparisons pass). Categorical criteria are
+    bitmask columns, so a profile becomes a boolean mask in a handful of NumPy ops.
+
+    With cache_size > 0, results are memoized per profile_key(). The cache lives
+    on the index, so a corpus reload starts with an empty one.
+    """
+
+    def __init__(self, schemes: List[Dict], cache_size: int = 0):
+        eligibility = [s['eligibility'] for s in schemes]
+        self.size = len(schemes)
+
+        self.min_age = self._numeric([e['min_age'] for e in eligibility])
+        self.max_age = self._numeric([e['max_age'] for e in eligibility])
+        self.max_income = self._numeric([e['max_family_income'] for e in eligibility])
+
+        self.gender = _BitmaskColumn('gender', [None if e['gender'] == 'any' else [e['gender']] for e in eligibility])
+        self.caste = _BitmaskColumn('caste', [None if 'Any' in e['caste'] else e['caste'] for e in eligibility])
+        self.occupation = _BitmaskColumn('occupation', [None if 'any' in e['occupation'] else e['occupation'] for e in eligibility])
+        self.residence = _BitmaskColumn('residence', [None if e['residence'] == 'any' else [e['residence']] for e in eligibility])
+        self.state = _BitmaskColumn('state', [None if e['state_specific'] is None else [e['state_specific']] for e in eligibility])
+
+        # Distinct thresholds; a profile value's position among them decides every comparison
+        self.min_age_bounds = self._bounds(self.min_age)
+        self.max_age_bounds = self._bounds(self.max_age)
+        self.max_income_bounds = self._bounds(self.max_income)
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _numeric(values: List) -> np.ndarray:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+    @staticmethod
+    def _bounds(column: np.ndarray) -> np.ndarray:
+        return np.unique(column[~np.isnan(column)])
+
+    def profile_key(self, user: Dict) -> Optional[Tuple]:
+        """Canonical key: two profiles with the same key are eligible for exactly the same schemes.
+
+        age < min_age holds for the thresholds above the age, so the count of
+        thresholds <= age pins down every min_age comparison; likewise the count
+        of thresholds < value for max_age and max_income. Categorical values map
+        to their column bit, which folds every value no scheme names into OTHER.
+        Returns None for NaN numbers, which compare differently from any bucket.
+        """
+        if user['age'] != user['age'] or user['family_income'] != user['family_income']:
+            return None
+        return (
+            int(np.searchsorted(self.min_age_bounds, user['age'], side='right')),
+            int(np.searchsorted(self.max_age_bounds, user['age'], side='left')),
+            int(np.searchsorted(self.max_income_bounds, user['family_income'], side='left')),
+            int(self.gender.bit_for(user['gender'])),
+            int(self.caste.bit_for(user['caste'])),
+            int(self.occupation.bit_for(user['occupation'])),
+            int(self.residence.bit_for(user['residence'])),
+            int(self.state.bit_for(user['state'])),
+        )
+
+    def mask(self, user: Dict) -> np.ndarray:
+        """Boolean array, True where the user is eligible for the scheme at that position"""
+        return (
+            ~(user['age'] < self.min_age)
+            & ~(user['age'] > self.max_age)
+            & ~(user['family_income'] > self.max_income)
+            & self.gender.allows(user['gender'])
+            & self.caste.allows(user['caste'])
+            & self.occupation.allows(user['occupation'])
+            & self.residence.allows(user['residence'])
+            & self.state.allows(user['state'])
+        )
+
+    def eligible_indices(self, user: Dict) -> np.ndarray:
+        """Positions of eligible schemes, in corpus order (read-only when cached)"""
+        if self.cache_size <= 0:
+            return np.flatnonzero(self.mask(user))
+
+        key = self.profile_key(user)
+        if key is None:
+            return np.flatnonzero(self.mask(user))
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        indices = np.flatnonzero(self.mask(user))
+        indices.flags.writeable = False
+        with self._cache_lock:
+            self._cache[key] = indices
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return indices
+
+    def cache_stats(self) -> Dict:
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,116 @@
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from config.settings import settings
+
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU cache of query embeddings keyed on (model id, normalized text).
+
+    Queries are whitespace-collapsed before lookup, and lowercased too for
+    encoders whose tokenizer lowercases its input (such as the uncased MiniLM),
+    so this never changes the embedding a query would get.
+    """
+
+    def __init__(self, max_entries: int, persist_path: str = ""):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_query(text: str, lowercase: bool = False) -> str:
+        return ' '.join((text.lower() if lowercase else text).split())
+
+    def get(self, text: str, model_id: str, lowercase: bool = False) -> Optional[np.ndarray]:
+        key = (model_id, self.normalize_query(text, lowercase))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, model_id: str, vector: np.ndarray, lowercase: bool = False) -> np.ndarray:
+        key = (model_id, self.normalize_query(text, lowercase))
+        vector = np.array(vector, dtype='float32').reshape(-1)
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return vector
+
+    def get_or_encode(self, text: str, model_id: str, encode: Callable[[str], np.ndarray],
+                      lowercase: bool = False) -> np.ndarray:
+        """Return the cached vector for text, encoding and caching it on a miss.
+        lowercase: the encoder lowercases its input, so case variants can share an entry."""
+        vector = self.get(text, model_id, lowercase)
+        if vector is None:
+            vector = self.put(text, model_id, encode(text), lowercase)
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": bool(self.persist_path)
+            }
+
+    def save(self):
+        """Write the cache to persist_path (if configured), most recently used last"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            items = list(self._entries.items())
+        if not items:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+        tmp_path = f"{self.persist_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                model_ids=np.array([key[0] for key, _ in items]),
+                queries=np.array([key[1] for key, _ in items]),
+                vectors=np.vstack([vector for _, vector in items])
+            )
+        os.replace(tmp_path, self.persist_path)
+        print(f"✓ Saved {len(items)} cached query embeddings to {self.persist_path}")
+
+    def load(self):
+        """Warm the cache from persist_path, if it exists"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with np.load(self.persist_path) as data:
+                for model_id, query, vector in zip(data['model_ids'], data['queries'], data['vectors']):
+                    self.put(str(query), str(model_id), vector)
+            print(f"✓ Loaded {len(self._entries)} cached query embeddings from {self.persist_path}")
+        except Exception as e:
+            print(f"⚠ Could not load query embedding cache: {e}")
+
+
+query_embedding_cache = EmbeddingCache(
+    settings.SCHEME_EMBEDDING_CACHE_SIZE,
+    settings.SCHEME_EMBEDDING_CACHE_PATH
+)
@@ -0,0 +1,90 @@
+import math
+import threading
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional
+from config.settings import settings
+from services.query_batcher import Histogram
+
+
+class FilteredSearchResult(NamedTuple):
+    ids: List[int]  # corpus positions, best first
+    scanned: int    # index candidates checked plus rows ranked exactly
+    strategy: str   # unfiltered, exact, window or window+exact
+
+
+class FilteredSearcher:
+    """Top-k search restricted to a set of eligible scheme positions.
+
+    Narrow sets (at most exact_fraction of the corpus) are ranked exactly over
+    their own rows, costing one distance per eligible scheme. Broad sets probe
+    the index with a window sized so k eligible hits are expected, widening it
+    4x until k hits are found. If max_window is reached, or an approximate index
+    returns fewer candidates than asked for, the eligible rows are ranked
+    exactly. Either way the result has min(k, len(eligible_ids)) eligible schemes, at a
+    cost bounded by about 2 * max_window + len(eligible_ids) candidates.
+    """
+
+    def __init__(self, exact_fraction: float, max_window: int):
+        self.exact_fraction = exact_fraction
+        self.max_window = max_window
+        self._lock = threading.Lock()
+        self.strategies: Dict[str, int] = {}
+        self.short_results = 0
+        self.scanned = Histogram([8, 32, 128, 512, 2048, 8192])
+
+    def search(self, corpus, query_embedding, eligible_ids: Optional[np.ndarray], k: int) -> FilteredSearchResult:
+        if eligible_ids is None:
+            ids = corpus.search(query_embedding, k)
+            return self._record(FilteredSearchResult(ids, len(ids), 'unfiltered'), k)
+
+        size = len(corpus)
+        eligible_count = len(eligible_ids)
+        wanted = min(k, eligible_count)
+        if wanted == 0:
+            return self._record(FilteredSearchResult([], 0, 'exact'), k)
+
+        if eligible_count <= self.exact_fraction * size:
+            ids, _ = corpus.search_subset(query_embedding, eligible_ids, wanted)
+            return self._record(FilteredSearchResult(ids.tolist(), eligible_count, 'exact'), k)
+
+        mask = np.zeros(size, dtype=bool)
+        mask[eligible_ids] = True
+        # A random candidate is eligible with probability eligible_count / size
+        window = min(size, self.max_window, max(2 * k, math.ceil(2 * k * size / eligible_count)))
+        scanned = 0
+        while True:
+            positions = corpus.search(query_embedding, window)
+            scanned += len(positions)
+            hits = [int(p) for p in positions if mask[p]]
+            if len(hits) >= wanted:
+                return self._record(FilteredSearchResult(hits[:wanted], scanned, 'window'), k)
+            if len(positions) < window or window >= self.max_window or window >= size:
+                break
+            window = min(size, self.max_window, window * 4)
+
+        ids, _ = corpus.search_subset(query_embedding, eligible_ids, wanted)
+        return self._record(FilteredSearchResult(ids.tolist(), scanned + eligible_count, 'window+exact'), k)
+
+    def _record(self, result: FilteredSearchResult, k: int) -> FilteredSearchResult:
+        with self._lock:
+            self.strategies[result.strategy] = self.strategies.get(result.strategy, 0) + 1
+            self.scanned.observe(result.scanned)
+            if len(result.ids) < k:
+                self.short_results += 1
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "exact_fraction": self.exact_fraction,
+                "max_window": self.max_window,
+                "strategies": dict(self.strategies),
+                "short_results": self.short_results,
+                "scanned": self.scanned.snapshot()
+            }
+
+
+scheme_filtered_searcher = FilteredSearcher(
+    settings.SCHEME_FILTER_EXACT_FRACTION,
+    settings.SCHEME_FILTER_MAX_WINDOW
+)
@@ -1,7 +1,14 @@
 import json
 import re
+from typing import Tuple
 from groq import Groq
 from config.settings import settings
+from services.analysis_cache import analysis_cache
+
+# Bump whenever the analysis prompt or its post-processing changes, so cached analyses are redone
+ANALYSIS_PROMPT_VERSION = 1
+# Characters of document text the analysis prompt includes
+ANALYSIS_TEXT_CHARS = 15000
 
 class GroqService:
     def __init__(self):
@@ -84,12 +91,29 @@ Return a JSON object with:
     
     def analyze_document(self, text: str, user_query: str = None) -> dict:
         """Main document analysis with form filling support"""
-        
+        return self.analyze_document_cached(text, user_query)[0]
+    
+    def analyze_document_cached(self, text: str, user_query: str = None) -> Tuple[dict, bool]:
+        """analyze_document(), served from the analysis cache when the same text and query
+        were analyzed before. Returns the analysis and whether it came from the cache."""
         is_form_query = self._is_form_filling_query(user_query or "", text)
         
         print(f"User query: {user_query}")
         print(f"Is form query: {is_form_query}")
         
+        key = analysis_cache.key(text[:ANALYSIS_TEXT_CHARS], user_query, is_form_query, self.model, ANALYSIS_PROMPT_VERSION)
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            print("Analysis cache hit")
+            return cached, True
+        
+        parsed = self._analyze(text, user_query, is_form_query)
+        # Unparseable responses are not kept, so a retry asks the model again
+        if "error" not in parsed:
+            analysis_cache.put(key, parsed)
+        return parsed, False
+    
+    def _analyze(self, text: str, user_query: str, is_form_query: bool) -> dict:
         base_instructions = """
 You are a legal document analyzer. Analyze this document and provide:
 
@@ -152,7 +176,7 @@ Answer this specific question clearly and directly using information from the do
         prompt = f"""{base_instructions}
 
 DOCUMENT TEXT:
-{text[:15000]}
+{text[:ANALYSIS_TEXT_CHARS]}
 
 Return ONLY a valid JSON object with this exact structure:
 {{
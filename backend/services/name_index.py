@@ -0,0 +1,55 @@
+import bisect
+import re
+import numpy as np
+from typing import Sequence, Tuple
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_name(text: str) -> str:
+    """Case- and punctuation-insensitive form of a scheme name or name query"""
+    return ' '.join(_NON_WORD.sub(' ', (text or '').casefold()).split())
+
+
+class SchemeNameIndex:
+    """Sorted array of normalized scheme names for exact and prefix lookups.
+
+    Built once per corpus. A lookup is two binary searches, so name queries
+    are answered without running the encoder or touching the vector index.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        order = sorted(range(len(names)), key=lambda i: (normalize_name(names[i]), i))
+        self.keys = [normalize_name(names[i]) for i in order]
+        self.positions = np.array(order, dtype=np.int64)
+        self.key_lengths = np.array([len(key) for key in self.keys], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _range(self, key: str, prefix: bool) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self.keys, key)
+        if not prefix:
+            return lo, bisect.bisect_right(self.keys, key, lo)
+        # Every key with this prefix sorts before key + the largest code point
+        return lo, bisect.bisect_left(self.keys, key + '\U0010ffff', lo)
+
+    def lookup(self, query: str, min_prefix_chars: int) -> Tuple[str, np.ndarray, np.ndarray]:
+        """Match type, positions and scores for a name query.
+
+        'exact' when the query equals one or more names (score 1.0), else 'prefix'
+        for names it starts, if it has at least min_prefix_chars characters, scored
+        by the share of the name it covers and sorted best first, else 'none'.
+        """
+        key = normalize_name(query)
+        lo, hi = self._range(key, prefix=False) if key else (0, 0)
+        if hi > lo:
+            return 'exact', self.positions[lo:hi], np.ones(hi - lo, dtype=np.float32)
+        if key and len(key) >= min_prefix_chars:
+            lo, hi = self._range(key, prefix=True)
+            if hi > lo:
+                scores = len(key) / self.key_lengths[lo:hi]
+                # Stable, so names of equal length stay alphabetical
+                order = np.argsort(-scores, kind='stable')
+                return 'prefix', self.positions[lo:hi][order], scores[order]
+        return 'none', self.positions[:0], self.key_lengths[:0]
@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import Dict, List, Sequence
+from config.settings import settings
+
+
+class Histogram:
+    """Fixed-bucket histogram; bounds are inclusive upper edges, the last bucket is open"""
+
+    def __init__(self, bounds: Sequence[float], unit: str = ''):
+        self.bounds = list(bounds)
+        self.unit = unit
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={bound:g}{self.unit}" for bound in self.bounds] + [f">{self.bounds[-1]:g}{self.unit}"]
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total, 3) if self.total else 0.0,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class _Request:
+    __slots__ = ('model', 'text', 'future', 'enqueued_at')
+
+    def __init__(self, model, text: str):
+        self.model = model
+        self.text = text
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class QueryEncodeBatcher:
+    """Coalesces concurrent single-query encodes into one batched model.encode call.
+
+    The first queued query opens a window of window_ms; everything that arrives
+    before it closes (or until max_batch_size) is encoded together and each
+    caller gets its own vector back through a future. Queries for different
+    models, e.g. across a corpus reload, are encoded in separate calls.
+    """
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.enabled = window_ms > 0 and max_batch_size > 1
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100], unit='ms')
+
+    def encode(self, model, text: str) -> np.ndarray:
+        """Encode a single query, sharing a batch with concurrent callers when enabled"""
+        if not self.enabled:
+            return model.encode([text], convert_to_numpy=True)[0]
+        return self.submit(model, text).result()
+
+    def submit(self, model, text: str) -> Future:
+        self._ensure_worker()
+        request = _Request(model, text)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='query-encode-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            groups: Dict[int, List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(id(request.model), []).append(request)
+            for requests in groups.values():
+                self._encode_group(requests, started)
+
+    def _encode_group(self, requests: List[_Request], started: float):
+        # Identical queries in one window are encoded once
+        texts = list(dict.fromkeys(request.text for request in requests))
+        try:
+            vectors = requests[0].model.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        positions = {text: i for i, text in enumerate(texts)}
+        with self._lock:
+            self.batches += 1
+            self.batch_sizes.observe(len(requests))
+            for request in requests:
+                self.queue_wait_ms.observe((started - request.enqueued_at) * 1000)
+        for request in requests:
+            request.future.set_result(vectors[positions[request.text]])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "pending": self._queue.qsize(),
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_wait": self.queue_wait_ms.snapshot()
+            }
+
+
+query_encode_batcher = QueryEncodeBatcher(
+    settings.SCHEME_BATCH_WINDOW_MS,
+    settings.SCHEME_BATCH_MAX_SIZE
+)
@@ -0,0 +1,75 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from config.settings import settings
+from services.query_batcher import query_encode_batcher
+
+
+class RetrievalExecutor:
+    """Dedicated thread pool for CPU-bound scheme retrieval (query encoding, FAISS, ranking).
+
+    Keeps that work off the asyncio event loop so WebSockets and other requests
+    on the same worker are not stalled. numpy, FAISS and torch release the GIL
+    in their heavy loops, so a few threads run in parallel. max_workers=0 runs
+    the work inline on the event loop, as before.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scheme-retrieval')
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        call = functools.partial(fn, *args, **kwargs)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            if self.max_workers <= 0:
+                return call()
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "completed": self.completed
+            }
+
+
+def retrieval_workers(workers: int, batch_enabled: bool, batch_max_size: int) -> int:
+    """Pool size for the configured workers. A thread waiting on a batched encode sits
+    idle, and a batch can only hold as many queries as there are threads waiting, so
+    while batching is on the pool is raised to the largest batch."""
+    if workers <= 0 or not batch_enabled:
+        return workers
+    return max(workers, batch_max_size)
+
+
+scheme_retrieval_executor = RetrievalExecutor(retrieval_workers(
+    settings.SCHEME_RETRIEVAL_WORKERS,
+    query_encode_batcher.enabled,
+    settings.SCHEME_BATCH_MAX_SIZE
+))
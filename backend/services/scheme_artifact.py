@@ -0,0 +1,182 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import faiss
+from typing import Optional, List, Dict, Tuple
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, so no cross-process lock is needed
+    fcntl = None
+from config.settings import settings
+from services.scheme_store import SchemeStore, write_scheme_store
+
+# Bump whenever normalization, the stored prompt contexts or the on-disk
+# layout change so stale artifacts are rebuilt instead of loaded.
+ARTIFACT_FORMAT_VERSION = 5
+
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.faiss"
+MANIFEST_FILE = "manifest.json"
+
+
+class SchemeArtifactStore:
+    """Versioned on-disk cache of the normalized schemes (as a SchemeStore), their embeddings and the FAISS index"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def compute_key(self, scheme_file: str, model_name: str, index_config: Dict = None) -> str:
+        """Content hash of the raw scheme dump plus the embedding model, index build config and format version"""
+        hasher = hashlib.sha256()
+        with open(scheme_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        hasher.update(model_name.encode('utf-8'))
+        hasher.update(json.dumps(index_config or {}, sort_keys=True).encode('utf-8'))
+        hasher.update(str(ARTIFACT_FORMAT_VERSION).encode('utf-8'))
+        return hasher.hexdigest()[:32]
+
+    def _artifact_dir(self, key: str) -> str:
+        return os.path.join(self.root_dir, key)
+
+    def load(self, key: str, writable_index: bool = False) -> Optional[Dict]:
+        """Load an artifact, memory-mapping the scheme store, embeddings and index. Returns None on a miss.
+        writable_index reads a private, modifiable copy of the index instead of mapping it."""
+        artifact_dir = self._artifact_dir(key)
+        manifest_path = os.path.join(artifact_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('key') != key or manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+                return None
+
+            schemes = SchemeStore(artifact_dir)
+            embeddings = np.load(os.path.join(artifact_dir, EMBEDDINGS_FILE), mmap_mode='r')
+            index_path = os.path.join(artifact_dir, INDEX_FILE)
+            index = faiss.read_index(index_path) if writable_index else self._read_index(index_path)
+
+            if len(schemes) != embeddings.shape[0] or index.ntotal != len(schemes):
+                print(f"⚠ Scheme artifact {key} is inconsistent, ignoring it")
+                return None
+
+            return {
+                'schemes': schemes,
+                'embeddings': embeddings,
+                'index': index,
+                'manifest': manifest
+            }
+        except Exception as e:
+            print(f"⚠ Could not load scheme artifact {key}: {e}")
+            return None
+
+    def manifest_stamp(self, key: str) -> Optional[Tuple[int, int]]:
+        """Cheap change marker for an artifact: saves replace the whole directory,
+        so the manifest's inode and mtime change with every revision"""
+        try:
+            stat = os.stat(os.path.join(self._artifact_dir(key), MANIFEST_FILE))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextlib.contextmanager
+    def write_lock(self, key: str):
+        """Exclusive lock across processes (e.g. serve.py workers) for updating an artifact in place"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root_dir, exist_ok=True)
+        with open(os.path.join(self.root_dir, f".{key}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def find_previous(self, key: str, model_name: str, index_config: Dict) -> Optional[Dict]:
+        """Load another artifact built with the same encoder and index config, e.g. the one for
+        the previous version of the scheme dump, so its vectors can be reused"""
+        if not os.path.isdir(self.root_dir):
+            return None
+        for entry in sorted(os.listdir(self.root_dir)):
+            if entry == key or '.tmp-' in entry:
+                continue
+            try:
+                with open(os.path.join(self.root_dir, entry, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if manifest.get('model_name') == model_name and manifest.get('index_config') == index_config:
+                return self.load(entry)
+        return None
+
+    def _read_index(self, path: str):
+        """Read the index memory-mapped so every worker shares its pages through the page cache.
+        IO_FLAG_MMAP only maps inverted lists; flat, SQ, PQ and HNSW codes need IO_FLAG_MMAP_IFC,
+        which IVF readers reject, so the flag sets are tried from most to least shared."""
+        read_only = faiss.IO_FLAG_READ_ONLY
+        flag_sets = [faiss.IO_FLAG_MMAP | read_only]
+        if hasattr(faiss, 'IO_FLAG_MMAP_IFC'):
+            flag_sets.insert(0, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_MMAP | read_only)
+        for flags in flag_sets:
+            try:
+                return faiss.read_index(path, flags)
+            except Exception:
+                continue
+        # Not every index type supports mmap I/O; fall back to a regular read
+        return faiss.read_index(path)
+
+    def save(self, key: str, schemes: List[Dict], embeddings: np.ndarray, index, metadata: Dict = None,
+             extra_text: Dict[str, List[str]] = None, extra_numeric: Dict[str, np.ndarray] = None):
+        """Write a complete artifact to a staging directory and rename it into place.
+        extra_text / extra_numeric are stored as additional scheme store columns."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        artifact_dir = self._artifact_dir(key)
+        staging_dir = f"{artifact_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+
+        try:
+            write_scheme_store(staging_dir, schemes, extra_text, extra_numeric)
+            np.save(os.path.join(staging_dir, EMBEDDINGS_FILE), np.ascontiguousarray(embeddings))
+            faiss.write_index(index, os.path.join(staging_dir, INDEX_FILE))
+
+            # metadata may come from an earlier manifest of this artifact; the fields below always win
+            manifest = dict(metadata or {})
+            manifest.update({
+                'key': key,
+                'format_version': ARTIFACT_FORMAT_VERSION,
+                'scheme_count': len(schemes),
+                'dimension': int(embeddings.shape[1]),
+                'embedding_dtype': str(embeddings.dtype),
+                'created_at': time.time(),
+            })
+            # The manifest is written last so a half-written artifact is never considered valid
+            with open(os.path.join(staging_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+            os.replace(staging_dir, artifact_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        self._prune(keep_key=key)
+
+    def _prune(self, keep_key: str):
+        """Remove artifacts for older dataset or model versions"""
+        for entry in os.listdir(self.root_dir):
+            if entry == keep_key or '.tmp-' in entry:
+                continue
+            path = os.path.join(self.root_dir, entry)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+scheme_artifact_store = SchemeArtifactStore(settings.SCHEME_ARTIFACT_DIR)
@@ -0,0 +1,149 @@
+import re
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Pieces a BPE tokenizer splits on: words, numbers and single punctuation marks.
+# Long words are charged one token per 6 characters, as they split into sub-words.
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+COMPACT_TEXT_CHARS = 280
+LONG_TEXT_CHARS = 2000
+
+STORE_COLUMNS = ('context_long', 'context_compact', 'context_long_tokens', 'context_compact_tokens')
+
+
+def count_tokens(text: str) -> int:
+    """Approximate LLM token count for budgeting prompts; no tokenizer download needed"""
+    return sum(1 + len(piece) // 6 for piece in _TOKEN_PIECES.findall(text))
+
+
+def _clip(text: str, limit: int) -> str:
+    text = ' '.join((text or '').split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(' ', 1)[0]
+    return cut.rstrip(',;:') + '…'
+
+
+def _eligibility_lines(elig: Dict) -> str:
+    lines = ""
+    if elig['min_age'] or elig['max_age']:
+        age_str = ""
+        if elig['min_age']:
+            age_str += f"Min age: {elig['min_age']}"
+        if elig['max_age']:
+            age_str += f", Max age: {elig['max_age']}"
+        lines += f"- Age: {age_str}\n"
+    if elig['gender'] != 'any':
+        lines += f"- Gender: {elig['gender']}\n"
+    if elig['max_family_income']:
+        lines += f"- Max income: ₹{elig['max_family_income']:,}\n"
+    if 'Any' not in elig['caste']:
+        lines += f"- Caste: {', '.join(elig['caste'])}\n"
+    return lines
+
+
+def render_long(scheme: Dict) -> str:
+    """Full prompt block for a scheme, with benefits, details and application steps capped at LONG_TEXT_CHARS"""
+    context = f"""
+Scheme: {scheme['name']}
+Category: {scheme['category']}
+Level: {scheme['level']}
+State: {scheme['state']}
+Benefits: {_clip(scheme['benefits']['description'], LONG_TEXT_CHARS)}
+"""
+    if scheme['benefits']['amount']:
+        context += f"Amount: ₹{scheme['benefits']['amount']:,}\n"
+
+    context += f"Details: {_clip(scheme['details'], LONG_TEXT_CHARS)}\n"
+
+    if scheme.get('application_process'):
+        context += f"How to Apply: {_clip(scheme['application_process'], LONG_TEXT_CHARS)}\n"
+
+    context += "\nEligibility:\n" + _eligibility_lines(scheme['eligibility'])
+    return context
+
+
+def render_compact(scheme: Dict) -> str:
+    """Short prompt block: identity, benefit, amount, eligibility and a clipped summary"""
+    context = f"""
+Scheme: {scheme['name']} ({scheme['level']}, {scheme['state']})
+Benefits: {_clip(scheme['benefits']['description'], COMPACT_TEXT_CHARS)}
+"""
+    if scheme['benefits']['amount']:
+        context += f"Amount: ₹{scheme['benefits']['amount']:,}\n"
+    context += f"Details: {_clip(scheme['details'], COMPACT_TEXT_CHARS)}\n"
+    eligibility = _eligibility_lines(scheme['eligibility'])
+    if eligibility:
+        context += "Eligibility:\n" + eligibility
+    return context
+
+
+class SchemeContexts:
+    """Prompt blocks for every scheme in a long and a compact form, with their token counts.
+
+    Rendered once when the corpus is built and persisted as columns of the
+    scheme store, so a loaded corpus reads them lazily from the shared mmap.
+    """
+
+    def __init__(self, long: Sequence[str], compact: Sequence[str], long_tokens: np.ndarray, compact_tokens: np.ndarray):
+        self.long = long
+        self.compact = compact
+        self.long_tokens = long_tokens
+        self.compact_tokens = compact_tokens
+
+    @classmethod
+    def render(cls, schemes: Sequence[Dict]) -> 'SchemeContexts':
+        long = [render_long(s) for s in schemes]
+        compact = [render_compact(s) for s in schemes]
+        return cls(
+            long, compact,
+            np.array([count_tokens(text) for text in long], dtype=np.int32),
+            np.array([count_tokens(text) for text in compact], dtype=np.int32)
+        )
+
+    @classmethod
+    def from_store(cls, store) -> Optional['SchemeContexts']:
+        """Contexts persisted with store_columns(), or None if the store predates them"""
+        if not all(store.has_column(name) for name in STORE_COLUMNS):
+            return None
+        return cls(
+            store.text_column('context_long'), store.text_column('context_compact'),
+            store.numeric_column('context_long_tokens').astype(np.int32),
+            store.numeric_column('context_compact_tokens').astype(np.int32)
+        )
+
+    def store_columns(self) -> Tuple[Dict[str, List[str]], Dict[str, np.ndarray]]:
+        """Extra (text, numeric) columns for write_scheme_store()"""
+        return (
+            {'context_long': list(self.long), 'context_compact': list(self.compact)},
+            {'context_long_tokens': self.long_tokens, 'context_compact_tokens': self.compact_tokens}
+        )
+
+    def assemble(self, positions: Sequence[int], token_budget: int, separator: str = "\n\n") -> Tuple[str, List[int], int]:
+        """Join the blocks for positions (best first) within token_budget.
+
+        Earlier schemes get the long form as long as the compact forms of the
+        ones after them still fit; otherwise they fall back to compact. Schemes
+        that do not fit even in compact form are dropped. Returns the context,
+        the positions included and the tokens used.
+        """
+        positions = list(positions)
+        separator_tokens = count_tokens(separator)
+        compact_costs = [int(self.compact_tokens[p]) + separator_tokens for p in positions]
+        reserved = sum(compact_costs)
+
+        blocks, included, used = [], [], 0
+        for position, compact_cost in zip(positions, compact_costs):
+            reserved -= compact_cost
+            long_cost = int(self.long_tokens[position]) + separator_tokens
+            if used + long_cost + reserved <= token_budget:
+                blocks.append(self.long[position])
+                used += long_cost
+            elif used + compact_cost <= token_budget:
+                blocks.append(self.compact[position])
+                used += compact_cost
+            else:
+                continue
+            included.append(position)
+        return separator.join(blocks), included, used
@@ -0,0 +1,531 @@
+import itertools
+import os
+import threading
+import time
+import traceback
+import faiss
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config.settings import settings
+from services.scheme_artifact import scheme_artifact_store
+from services.scheme_extractor import normalize_schemes, scheme_feature_extractor
+from services.scheme_reader import RawSchemeReader
+from services.eligibility_index import EligibilityIndex
+from services.name_index import SchemeNameIndex
+from services.scheme_context import SchemeContexts
+from services.embedding_cache import query_embedding_cache
+from services.query_batcher import query_encode_batcher
+from services.scheme_index import faiss_ids, scheme_index_builder
+from services.scheme_encoder import encoder_id, encoder_lowercases, load_encoder
+
+
+# Each corpus build gets a new generation so per-corpus derived state can tell it is stale
+_corpus_generations = itertools.count(1)
+
+
+def find_scheme_file():
+    """Locate myscheme_raw.json - check multiple possible paths"""
+    possible_paths = [
+        'myscheme_raw.json',
+        'backend/myscheme_raw.json',
+        '../myscheme_raw.json',
+        'data/myscheme_raw.json',
+        os.path.join(os.path.dirname(__file__), '..', 'myscheme_raw.json'),
+        os.path.join(os.path.dirname(__file__), '..', '..', 'myscheme_raw.json'),
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            print(f"✓ Found scheme data at: {path}")
+            return path
+
+    print("✗ ERROR: myscheme_raw.json not found!")
+    print(f"  Searched in: {', '.join(possible_paths)}")
+    return None
+
+
+def encode_summaries(encoder, summaries, batch_size=100):
+    """Encode scheme summaries in batches with progress"""
+    print(f"  Encoding {len(summaries)} schemes (this may take 1-2 minutes)...")
+    all_embeddings = []
+    for i in range(0, len(summaries), batch_size):
+        batch = summaries[i:i+batch_size]
+        batch_embeddings = encoder.encode(batch, convert_to_numpy=True, show_progress_bar=False)
+        all_embeddings.append(batch_embeddings)
+        print(f"  Progress: {min(i+batch_size, len(summaries))}/{len(summaries)} schemes encoded")
+    return np.vstack(all_embeddings).astype('float32')
+
+
+def embed_schemes(model, summaries: Sequence[str], previous: Optional[Tuple] = None) -> Tuple[np.ndarray, int]:
+    """Prepared vectors for summaries. previous is a (summaries, stored embeddings, vector_scale)
+    triple of an earlier corpus; rows whose summary it already has are copied from it and only
+    the rest are encoded. Returns the vectors and how many were encoded."""
+    reuse = {}
+    if previous is not None:
+        reuse = {summary: row for row, summary in enumerate(previous[0])}
+    missing = [i for i, summary in enumerate(summaries) if summary not in reuse]
+    if len(missing) == len(summaries):
+        return scheme_index_builder.prepare(encode_summaries(model, list(summaries))), len(missing)
+
+    _, old_embeddings, old_scale = previous
+    kept = [i for i, summary in enumerate(summaries) if summary in reuse]
+    vectors = np.empty((len(summaries), old_embeddings.shape[1]), dtype='float32')
+    vectors[kept] = scheme_index_builder.decompress(old_embeddings[[reuse[summaries[i]] for i in kept]], old_scale)
+    if missing:
+        vectors[missing] = scheme_index_builder.prepare(encode_summaries(model, [summaries[i] for i in missing]))
+    return vectors, len(missing)
+
+
+class SchemeCorpus:
+    """Immutable snapshot of everything scheme retrieval needs.
+
+    Requests grab one snapshot and use it throughout, so a reload can build a new
+    corpus next to the live one and swap it in without affecting in-flight work.
+    """
+
+    def __init__(self, schemes, model, index, embeddings, artifact_key: str, model_name: str, vector_scale: float = 1.0,
+                 contexts: SchemeContexts = None, metadata: Dict = None, artifact_backed: bool = False):
+        # A memory-mapped SchemeStore when loaded from an artifact, else a list of dicts
+        self.schemes = schemes
+        self.scheme_ids: List[str] = (list(schemes.text_column('scheme_id')) if hasattr(schemes, 'text_column')
+                                      else [s['scheme_id'] for s in schemes])
+        self.position_by_id = {scheme_id: i for i, scheme_id in enumerate(self.scheme_ids)}
+        if len(self.position_by_id) != len(self.scheme_ids):
+            raise ValueError("Scheme ids are not unique")
+        # The index labels vectors with faiss_ids(); sorted, they map search hits back to positions
+        self.faiss_ids = faiss_ids(self.scheme_ids)
+        self._label_order = np.argsort(self.faiss_ids, kind='stable')
+        self._sorted_labels = self.faiss_ids[self._label_order]
+        if np.any(self._sorted_labels[1:] == self._sorted_labels[:-1]):
+            raise ValueError("Two scheme ids hash to the same FAISS id")
+        self.name_index = SchemeNameIndex(schemes.text_column('name') if hasattr(schemes, 'text_column')
+                                          else [s['name'] for s in schemes])
+        self.model = model
+        self.lowercases_queries = encoder_lowercases(model)
+        # Encoder id (model plus backend), so vectors from different backends never mix
+        self.model_name = model_name
+        self.index = index
+        # Stored at the configured vector width; see SchemeIndexBuilder.compress()
+        self.embeddings = embeddings
+        self.vector_scale = vector_scale
+        self.dimension = embeddings.shape[1]
+        full = scheme_index_builder.decompress(embeddings, vector_scale)
+        self.sq_norms = np.einsum('ij,ij->i', full, full)
+        self.eligibility_index = EligibilityIndex(schemes, cache_size=settings.SCHEME_ELIGIBILITY_CACHE_SIZE)
+        self.contexts = contexts or SchemeContexts.render(schemes)
+        self.artifact_key = artifact_key
+        # Manifest metadata carried into in-place artifact updates
+        self.metadata = metadata or {}
+        self.revision = self.metadata.get('revision', 0)
+        # True when index and embeddings are mapped from the artifact (and so read-only)
+        self.artifact_backed = artifact_backed
+        self.generation = next(_corpus_generations)
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.schemes)
+
+    def encode_query(self, query: str):
+        """Embed a single query as a (1, dimension) float32 array, served from the LRU cache when possible.
+        Cache misses go through the micro-batcher so concurrent queries share one encode call."""
+        vector = query_embedding_cache.get_or_encode(
+            query,
+            self.model_name,
+            lambda text: query_encode_batcher.encode(self.model, text),
+            lowercase=self.lowercases_queries
+        )
+        return scheme_index_builder.prepare(vector.reshape(1, -1))
+
+    def search(self, query_embedding, k):
+        """Nearest scheme positions from the FAISS index"""
+        distances, labels = self.index.search(query_embedding, k)
+        # Approximate indexes pad with -1 when they find fewer than k neighbours
+        labels = labels[0][labels[0] >= 0]
+        return self._label_order[np.searchsorted(self._sorted_labels, labels)].tolist()
+
+    def search_subset(self, query_embedding, candidate_ids, k):
+        """Exact L2 top-k over a subset of the stored scheme vectors, without re-encoding them.
+        On L2-normalized vectors this ranks identically to cosine similarity."""
+        k = min(k, len(candidate_ids))
+        if k == 0:
+            return candidate_ids[:0], np.empty(0, dtype='float32')
+        query = query_embedding.reshape(-1).astype('float32')
+        # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+        rows = scheme_index_builder.decompress(self.embeddings[candidate_ids], self.vector_scale)
+        distances = self.sq_norms[candidate_ids] - 2.0 * (rows @ query) + float(query @ query)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind='stable')]
+        return candidate_ids[top], distances[top]
+
+    def similarities(self, query_embedding, positions) -> np.ndarray:
+        """Cosine similarity of the query to the stored vectors at positions"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0:
+            return np.empty(0, dtype='float32')
+        query = query_embedding.reshape(-1).astype('float32')
+        rows = scheme_index_builder.decompress(self.embeddings[positions], self.vector_scale)
+        norms = np.sqrt(self.sq_norms[positions]) * float(np.sqrt(query @ query))
+        return (rows @ query) / np.maximum(norms, 1e-12)
+
+    def writable_index(self):
+        """A private copy of the index that can be modified, or None if one cannot be made.
+        Artifact indexes are read again from disk: mmap-read indexes must not be cloned."""
+        if not self.artifact_backed:
+            return faiss.clone_index(self.index)
+        artifact = scheme_artifact_store.load(self.artifact_key, writable_index=True)
+        if artifact is None or artifact['manifest'].get('revision', 0) != self.revision:
+            return None
+        return artifact['index']
+
+
+def corpus_from_artifact(artifact: Dict, model, artifact_key: str, model_name: str) -> SchemeCorpus:
+    return SchemeCorpus(
+        artifact['schemes'], model, scheme_index_builder.configure(artifact['index']),
+        artifact['embeddings'], artifact_key, model_name,
+        vector_scale=artifact['manifest'].get('vector_scale', 1.0),
+        contexts=SchemeContexts.from_store(artifact['schemes']),
+        metadata=artifact['manifest'], artifact_backed=True
+    )
+
+
+def persist_corpus(schemes, model, index, stored: np.ndarray, vector_scale: float, contexts: SchemeContexts,
+                   artifact_key: str, model_name: str, metadata: Dict) -> SchemeCorpus:
+    """Save an artifact and serve the corpus from it, memory-mapped, so the in-memory
+    copies can be freed. Falls back to an in-memory corpus if the artifact cannot be saved."""
+    metadata = dict(metadata, vector_scale=vector_scale)
+    artifact = None
+    try:
+        extra_text, extra_numeric = contexts.store_columns()
+        scheme_artifact_store.save(artifact_key, schemes, stored, index, metadata=metadata,
+                                   extra_text=extra_text, extra_numeric=extra_numeric)
+        print(f"✓ Saved scheme artifact {artifact_key} (revision {metadata.get('revision', 0)}) "
+              f"to {scheme_artifact_store.root_dir}")
+        artifact = scheme_artifact_store.load(artifact_key)
+    except Exception as e:
+        print(f"⚠ Could not save scheme artifact: {e}")
+
+    if artifact:
+        return corpus_from_artifact(artifact, model, artifact_key, model_name)
+    return SchemeCorpus(schemes, model, index, stored, artifact_key, model_name,
+                        vector_scale=vector_scale, contexts=contexts, metadata=metadata)
+
+
+def build_scheme_corpus(model=None) -> SchemeCorpus:
+    """Load and normalize schemes data, reusing the persisted artifact when the dataset is unchanged.
+    Pass the live model to reuse it instead of loading the weights again."""
+    print("\n" + "="*60)
+    print("Loading Government Schemes Database")
+    print("="*60)
+
+    scheme_file = find_scheme_file()
+    if not scheme_file:
+        raise FileNotFoundError("myscheme_raw.json not found")
+
+    model_name = encoder_id(settings.SCHEME_EMBEDDING_MODEL, settings.SCHEME_ENCODER_BACKEND)
+    index_config = dict(type=scheme_index_builder.index_type, **scheme_index_builder.build_params())
+    artifact_key = scheme_artifact_store.compute_key(scheme_file, model_name, index_config)
+
+    load_start = time.perf_counter()
+    artifact = scheme_artifact_store.load(artifact_key)
+    if artifact:
+        schemes = artifact['schemes']
+        print(f"✓ Loaded scheme artifact {artifact_key} ({len(schemes)} schemes) in {time.perf_counter() - load_start:.3f}s")
+    else:
+        print(f"  No artifact for {artifact_key}, building from {scheme_file}")
+        print("Reading and normalizing schemes...")
+        reader = RawSchemeReader(scheme_file)
+        # Records are normalized as they are read, so the raw dump is never held in memory
+        schemes = normalize_schemes(reader, workers=settings.SCHEME_NORMALIZE_WORKERS)
+        print(f"✓ Read {reader.records} raw schemes, normalized {len(schemes)}")
+        if reader.skipped:
+            offsets = ', '.join(str(record.offset) for record in reader.skipped[:10])
+            print(f"⚠ Skipped {len(reader.skipped)} malformed records (character offsets: {offsets}"
+                  f"{', ...' if len(reader.skipped) > 10 else ''})")
+
+    if model is None:
+        print("Loading AI model (this may take a moment)...")
+        model = load_encoder(settings.SCHEME_EMBEDDING_MODEL, settings.SCHEME_ENCODER_BACKEND, settings.SCHEME_ONNX_FILE)
+        print(f"✓ Sentence transformer model loaded ({settings.SCHEME_ENCODER_BACKEND} backend)")
+
+    if artifact:
+        corpus = corpus_from_artifact(artifact, model, artifact_key, model_name)
+    else:
+        print("Creating FAISS semantic search index...")
+        summaries = [s['semantic_summary'] for s in schemes]
+        # A new dump usually changes few schemes; reuse the vectors of the last artifact for the rest
+        previous = scheme_artifact_store.find_previous(artifact_key, model_name, index_config)
+        if previous:
+            previous = ([s['semantic_summary'] for s in previous['schemes']], previous['embeddings'],
+                        previous['manifest'].get('vector_scale', 1.0))
+        embeddings, encoded = embed_schemes(model, summaries, previous)
+        print(f"✓ All schemes encoded into vectors ({len(schemes) - encoded} reused from the previous artifact)")
+        print(f"  Creating {scheme_index_builder.index_type} FAISS index with dimension {embeddings.shape[1]}...")
+        ids = faiss_ids([s['scheme_id'] for s in schemes])
+        index = scheme_index_builder.build(embeddings, ids)
+        print(f"✓ FAISS index created with {len(schemes)} schemes")
+        stored, vector_scale = scheme_index_builder.compress(embeddings)
+        corpus = persist_corpus(
+            schemes, model, index, stored, vector_scale, SchemeContexts.render(schemes), artifact_key, model_name,
+            metadata={'model_name': model_name, 'index': scheme_index_builder.describe(), 'index_config': index_config,
+                      'revision': 0, 'source_file': os.path.abspath(scheme_file),
+                      'skipped_record_offsets': [record.offset for record in reader.skipped]}
+        )
+
+    print(f"✓ Eligibility columns compiled for {corpus.eligibility_index.size} schemes")
+    print("="*60)
+    print("✓ Scheme Recommender System Ready!")
+    print("="*60 + "\n")
+    return corpus
+
+
+def update_scheme_corpus(corpus: SchemeCorpus, raw_upserts: Iterable[Dict], delete_ids: Iterable[str]) -> Tuple[SchemeCorpus, Dict]:
+    """Apply scheme upserts (raw myscheme records) and deletions to a corpus without rebuilding it.
+
+    Only new schemes and those whose summary changed are embedded; their old
+    vectors are removed from a writable copy of the index and the new ones added
+    under the same scheme-id labels. hnsw cannot remove vectors, so it is rebuilt
+    from the stored vectors instead, still without re-encoding. The artifact is
+    rewritten under the same key with its revision bumped. Returns the new corpus
+    and a summary of the change.
+    """
+    started = time.perf_counter()
+    upserts = {}
+    for raw in raw_upserts:
+        scheme = scheme_feature_extractor.normalize(raw)
+        if scheme['scheme_id'] in upserts:
+            raise ValueError(f"Scheme '{scheme['scheme_id']}' is upserted more than once")
+        upserts[scheme['scheme_id']] = scheme
+    delete_ids = set(delete_ids)
+    unknown = sorted(delete_ids - corpus.position_by_id.keys())
+    if unknown:
+        raise ValueError(f"Unknown scheme ids: {', '.join(unknown)}")
+    conflicting = sorted(delete_ids & upserts.keys())
+    if conflicting:
+        raise ValueError(f"Schemes both upserted and deleted: {', '.join(conflicting)}")
+
+    # Surviving schemes keep their order; new ones are appended.
+    # rows: (scheme, old position or None, replaced)
+    rows = []
+    for position, scheme_id in enumerate(corpus.scheme_ids):
+        if scheme_id in delete_ids:
+            continue
+        if scheme_id in upserts:
+            rows.append((upserts[scheme_id], position, True))
+        else:
+            rows.append((corpus.schemes[position], position, False))
+    rows.extend((scheme, None, True) for scheme_id, scheme in upserts.items() if scheme_id not in corpus.position_by_id)
+    if not rows:
+        raise ValueError("Cannot delete every scheme")
+
+    schemes = [scheme for scheme, _, _ in rows]
+    reembed = [i for i, (scheme, old, replaced) in enumerate(rows)
+               if old is None or (replaced and scheme['semantic_summary'] != corpus.schemes[old]['semantic_summary'])]
+    reembedded = set(reembed)
+    kept = [i for i in range(len(rows)) if i not in reembedded]
+
+    vectors = np.empty((len(rows), corpus.dimension), dtype='float32')
+    if kept:
+        vectors[kept] = scheme_index_builder.decompress(corpus.embeddings[[rows[i][1] for i in kept]], corpus.vector_scale)
+    if reembed:
+        vectors[reembed] = scheme_index_builder.prepare(
+            encode_summaries(corpus.model, [schemes[i]['semantic_summary'] for i in reembed]))
+
+    # Vectors to drop: deleted schemes and the old vectors of re-embedded ones
+    stale = [corpus.position_by_id[scheme_id] for scheme_id in delete_ids]
+    stale.extend(rows[i][1] for i in reembed if rows[i][1] is not None)
+    ids = faiss_ids([s['scheme_id'] for s in schemes])
+
+    index = corpus.writable_index()
+    strategy = 'in_place'
+    if index is None or not scheme_index_builder.update(index, corpus.faiss_ids[stale], vectors[reembed], ids[reembed]):
+        strategy = 'rebuild'
+        index = scheme_index_builder.build(vectors, ids)
+    stored, vector_scale = scheme_index_builder.compress(vectors)
+
+    # Prompt blocks are only rendered again for schemes that changed
+    old_contexts = corpus.contexts
+    fresh = SchemeContexts.render([schemes[i] for i, (_, _, replaced) in enumerate(rows) if replaced])
+    fresh_rows = iter(range(len(fresh.long)))
+    long, compact, long_tokens, compact_tokens = [], [], [], []
+    for scheme, old, replaced in rows:
+        source, row = (fresh, next(fresh_rows)) if replaced else (old_contexts, old)
+        long.append(source.long[row])
+        compact.append(source.compact[row])
+        long_tokens.append(source.long_tokens[row])
+        compact_tokens.append(source.compact_tokens[row])
+    contexts = SchemeContexts(long, compact, np.array(long_tokens, dtype=np.int32), np.array(compact_tokens, dtype=np.int32))
+
+    metadata = dict(corpus.metadata, revision=corpus.revision + 1)
+    updated = persist_corpus(schemes, corpus.model, index, stored, vector_scale, contexts,
+                             corpus.artifact_key, corpus.model_name, metadata)
+    summary = {
+        "revision": updated.revision,
+        "schemes": len(updated),
+        "added": sum(1 for _, old, _ in rows if old is None),
+        "updated": sum(1 for _, old, replaced in rows if replaced and old is not None),
+        "deleted": len(delete_ids),
+        "reembedded": len(reembed),
+        "index_update": strategy,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+    print(f"✓ Scheme corpus revision {summary['revision']}: +{summary['added']} ~{summary['updated']} "
+          f"-{summary['deleted']}, {len(reembed)} re-embedded, index {strategy} in {summary['seconds']}s")
+    return updated, summary
+
+
+class SchemeCorpusManager:
+    """Builds the scheme corpus in a background thread and hot-swaps reloads and updates atomically.
+
+    Updates are written to the shared artifact under a cross-process lock. Every
+    process serving the artifact, such as the other serve.py workers, notices
+    the new revision through sync() and maps it in before its next request.
+    """
+
+    def __init__(self):
+        self.corpus: Optional[SchemeCorpus] = None
+        self.state = 'idle'  # idle -> loading -> ready | failed; ready -> reloading -> ready
+        self.last_error: Optional[str] = None
+        self.last_build_seconds: Optional[float] = None
+        self.reload_count = 0
+        self.update_count = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._updating = False
+        # Held while the corpus is replaced by an update or a revision read from disk
+        self._swap_lock = threading.Lock()
+        # manifest_stamp() of the artifact revision being served
+        self._disk_stamp = None
+        self.sync_count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.corpus is not None
+
+    @property
+    def busy(self) -> bool:
+        return self._updating or (self._thread is not None and self._thread.is_alive())
+
+    def start(self) -> bool:
+        """Start a background build. Returns False if one is already running."""
+        with self._lock:
+            if self.busy:
+                return False
+            self.state = 'reloading' if self.corpus is not None else 'loading'
+            self._thread = threading.Thread(target=self._build, name='scheme-corpus-loader', daemon=True)
+            self._thread.start()
+            return True
+
+    def preload(self) -> bool:
+        """Build the corpus in the calling thread.
+
+        Used by the pre-fork server (serve.py) before it forks its workers, so
+        the model weights are shared copy-on-write and the artifact mmaps are
+        inherited instead of every worker loading its own copy. Returns True
+        if a corpus is ready afterwards.
+        """
+        with self._lock:
+            if self.busy:
+                return False
+            self.state = 'reloading' if self.corpus is not None else 'loading'
+        self._build()
+        return self.ready
+
+    def apply_changes(self, upserts: List[Dict], delete_ids: List[str]) -> Optional[Dict]:
+        """Upsert raw schemes and delete scheme ids in the live corpus, in the calling thread.
+        Returns a summary of the change, or None if the corpus is not loaded or a build or
+        another update is running. Invalid changes raise ValueError."""
+        with self._lock:
+            if self.busy or self.corpus is None:
+                return None
+            self._updating = True
+        try:
+            key = self.corpus.artifact_key
+            with self._swap_lock, scheme_artifact_store.write_lock(key):
+                # Apply the change on top of whatever another process last wrote
+                self._catch_up()
+                # A single reference assignment, as for reloads
+                self.corpus, summary = update_scheme_corpus(self.corpus, upserts, delete_ids)
+                self._disk_stamp = scheme_artifact_store.manifest_stamp(key) if self.corpus.artifact_backed else None
+            self.update_count += 1
+            return summary
+        finally:
+            self._updating = False
+
+    def is_stale(self) -> bool:
+        """Whether the artifact on disk changed since the served corpus was loaded from it (a stat call)"""
+        corpus = self.corpus
+        if corpus is None or not corpus.artifact_backed or self.busy:
+            return False
+        stamp = scheme_artifact_store.manifest_stamp(corpus.artifact_key)
+        return stamp is not None and stamp != self._disk_stamp
+
+    def sync(self) -> Optional[SchemeCorpus]:
+        """Swap in a newer revision of the served artifact written by another process, and return
+        the corpus to serve. Blocks on disk reads, so run it off the event loop after is_stale()."""
+        # An update or another sync is already replacing the corpus; keep serving the current one
+        if not self._swap_lock.acquire(blocking=False):
+            return self.corpus
+        try:
+            if not self.busy:
+                self._catch_up()
+            return self.corpus
+        finally:
+            self._swap_lock.release()
+
+    def _catch_up(self):
+        corpus = self.corpus
+        if corpus is None or not corpus.artifact_backed:
+            return
+        stamp = scheme_artifact_store.manifest_stamp(corpus.artifact_key)
+        if stamp is None or stamp == self._disk_stamp:
+            return
+        artifact = scheme_artifact_store.load(corpus.artifact_key)
+        # Missing while another process renames a new revision into place; checked again next time
+        if artifact is None:
+            return
+        if artifact['manifest'].get('revision', 0) > corpus.revision:
+            self.corpus = corpus_from_artifact(artifact, corpus.model, corpus.artifact_key, corpus.model_name)
+            self.sync_count += 1
+            print(f"✓ Picked up scheme corpus revision {self.corpus.revision} from {corpus.artifact_key}")
+        self._disk_stamp = stamp
+
+    def _build(self):
+        started = time.perf_counter()
+        live = self.corpus
+        current = encoder_id(settings.SCHEME_EMBEDDING_MODEL, settings.SCHEME_ENCODER_BACKEND)
+        reuse_model = live.model if live is not None and live.model_name == current else None
+        try:
+            corpus = build_scheme_corpus(model=reuse_model)
+        except Exception as e:
+            print(f"✗ Error loading schemes data: {e}")
+            print(traceback.format_exc())
+            self.last_error = str(e)
+            self.state = 'ready' if self.corpus is not None else 'failed'
+            return
+
+        # A single reference assignment; requests already holding the old corpus finish on it
+        self.corpus = corpus
+        self._disk_stamp = scheme_artifact_store.manifest_stamp(corpus.artifact_key) if corpus.artifact_backed else None
+        if live is not None:
+            self.reload_count += 1
+        self.last_error = None
+        self.last_build_seconds = round(time.perf_counter() - started, 3)
+        self.state = 'ready'
+
+    def status(self) -> Dict:
+        corpus = self.corpus
+        return {
+            "state": self.state,
+            "ready": corpus is not None,
+            "artifact_key": corpus.artifact_key if corpus else None,
+            "revision": corpus.revision if corpus else None,
+            "loaded_at": corpus.loaded_at if corpus else None,
+            "last_build_seconds": self.last_build_seconds,
+            "reload_count": self.reload_count,
+            "update_count": self.update_count,
+            "sync_count": self.sync_count,
+            "last_error": self.last_error
+        }
+
+
+scheme_corpus_manager = SchemeCorpusManager()
@@ -0,0 +1,66 @@
+import os
+import re
+from sentence_transformers import SentenceTransformer
+from config.settings import settings
+
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx_int8')
+QUANTIZED_FILE_SUFFIX = 'qint8_avx2'
+
+
+def encoder_id(model_name: str, backend: str) -> str:
+    """Identifier for the vectors an encoder produces; used in artifact and cache keys"""
+    return model_name if backend == 'torch' else f"{model_name}@{backend}"
+
+
+def encoder_lowercases(model) -> bool:
+    """Whether the encoder's tokenizer lowercases its input, so queries differing only in case embed the same"""
+    return bool(getattr(getattr(model, 'tokenizer', None), 'do_lower_case', False))
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        raise RuntimeError(
+            "The onnx encoder backends need ONNX Runtime. Install it with: pip install 'sentence-transformers[onnx]'"
+        )
+
+
+def _local_quantized_dir(model_name: str) -> str:
+    return os.path.join(settings.SCHEME_ENCODER_CACHE_DIR, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+
+
+def load_encoder(model_name: str, backend: str = 'torch', onnx_file: str = ''):
+    """Load the sentence encoder for the given backend.
+
+    torch is the full-precision PyTorch model. onnx runs the same weights through
+    ONNX Runtime, and onnx_int8 uses a dynamically int8-quantized ONNX graph:
+    onnx_file from the model repo if it ships one, otherwise one exported once
+    into SCHEME_ENCODER_CACHE_DIR.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Expected one of: {', '.join(ENCODER_BACKENDS)}")
+
+    if backend == 'torch':
+        return SentenceTransformer(model_name)
+
+    _require_onnxruntime()
+    if backend == 'onnx':
+        return SentenceTransformer(model_name, backend='onnx')
+
+    if onnx_file:
+        try:
+            return SentenceTransformer(model_name, backend='onnx', model_kwargs={'file_name': onnx_file})
+        except Exception as e:
+            print(f"⚠ Quantized ONNX file {onnx_file} not available for {model_name} ({e}), exporting one locally")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = _local_quantized_dir(model_name)
+    quantized_file = os.path.join('onnx', f'model_{QUANTIZED_FILE_SUFFIX}.onnx')
+    if not os.path.exists(os.path.join(export_dir, quantized_file)):
+        onnx_model = SentenceTransformer(model_name, backend='onnx')
+        onnx_model.save(export_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, 'avx2', export_dir, file_suffix=QUANTIZED_FILE_SUFFIX)
+        print(f"✓ Exported int8 ONNX encoder to {export_dir}")
+    return SentenceTransformer(export_dir, backend='onnx', model_kwargs={'file_name': quantized_file})
@@ -0,0 +1,364 @@
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+STATES = ['andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa', 'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka', 'kerala', 'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram', 'nagaland', 'odisha', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu', 'telangana', 'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal', 'delhi']
+
+# Plain substring keywords: a hit means `keyword in text_lower`
+KEYWORDS = [
+    'female', 'women', 'girl', 'male',
+    'farmer', 'agriculture', 'student', 'education', 'unemployed', 'worker', 'labour', 'labor',
+    'rural', 'urban',
+    'scholarship', 'pension', 'loan', 'credit', 'subsidy', 'insurance',
+    'health', 'medical', 'employment', 'skill', 'senior', 'elderly',
+    'aged', 'child', 'disabled', 'handicapped', 'widow', 'minority',
+]
+
+# Word-bounded terms, grouped by the label they set
+BOUNDED_TERMS = {
+    'caste_sc': ['sc', 'scheduled caste'],
+    'caste_st': ['st', 'scheduled tribe'],
+    'caste_obc': ['obc', 'other backward class'],
+    'caste_general': ['general', 'unreserved'],
+    'bpl': ['bpl', 'below poverty line'],
+}
+
+# Patterns where only the first (leftmost) match matters. Each prefilter is a
+# (literal, tail regex) pair that matches at least wherever the pattern can start.
+FIRST_MATCH_PATTERNS = {
+    'age_range': (r'(\d+)\s*(?:to|-)\s*(\d+)\s*years?', [(d, r'\d*\s*(?:to|-)\s*\d') for d in '0123456789']),
+    'age_below': (r'below\s*(\d+)\s*years?', [('below', r'\s*\d')]),
+    'age_above': (r'above\s*(\d+)\s*years?', [('above', r'\s*\d')]),
+    'income': (r'(?:income|earning).*?(?:below|less than|up to|maximum).*?(?:rs\.?|inr|₹)?\s*(\d+(?:,\d+)*)', [('income', ''), ('earning', '')]),
+    'amount': (r'(?:rs\.?|inr|₹)\s*(\d+(?:,\d+)*)', [('rs', r'\.?\s*\d'), ('inr', r'\s*\d'), ('₹', r'\s*\d')]),
+}
+
+
+# Identifiers added to raw records by the scraper and admin API; not scheme content
+ID_FIELDS = ('slug',)
+
+
+def slugify(text: str) -> str:
+    """URL-style slug: lowercase ASCII words joined by hyphens"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'scheme'
+
+
+def scheme_id_for(scheme: Dict) -> str:
+    """Stable id of a raw scheme: its myscheme.gov.in slug, or the slugified name for older dumps"""
+    return str(scheme.get('slug') or '').strip() or slugify(str(scheme.get('schemeName') or ''))
+
+
+def _trie_regex(prefilters: List[Tuple[str, str]]) -> str:
+    """Compile (literal, tail) pairs into one regex with shared literal prefixes factored out"""
+    trie = {}
+    for literal, tail in prefilters:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node.setdefault('', set()).add(tail)
+
+    def render(node) -> str:
+        tails = node.get('', set())
+        if '' in tails:
+            # The literal alone is a hit; longer continuations add nothing
+            return ''
+        branches = [re.escape(char) + render(child) for char, child in node.items() if char != '']
+        branches.extend(f'(?:{tail})' for tail in sorted(tails))
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return render(trie)
+
+
+class SchemeFeatureExtractor:
+    """Extracts every eligibility and benefit feature of a scheme in one scan of its text.
+
+    Every keyword, state name, word-bounded caste term and capture pattern gets a
+    literal-led prefilter, and all prefilters are compiled into one trie-shaped
+    regex, so the lowercased text is walked once. At each hit the exact patterns
+    keyed by that first character are checked, which keeps the result identical
+    to running every check separately.
+    """
+
+    def __init__(self):
+        self.tokens: List[Tuple[Tuple[str, str], str, List[Tuple[str, str]]]] = []  # (label, pattern, prefilters)
+
+        for keyword in KEYWORDS:
+            self.tokens.append((('kw', keyword), re.escape(keyword), [(keyword, '')]))
+        for state in STATES:
+            self.tokens.append((('state', state), re.escape(state), [(state, '')]))
+        for label, terms in BOUNDED_TERMS.items():
+            for term in terms:
+                self.tokens.append((('flag', label), rf'\b{re.escape(term)}\b', [(term, r'\b')]))
+        for label, (pattern, prefilters) in FIRST_MATCH_PATTERNS.items():
+            self.tokens.append((('first', label), pattern, prefilters))
+
+        self.prefilter_pattern = re.compile(_trie_regex(
+            [prefilter for _, _, prefilters in self.tokens for prefilter in prefilters]
+        ))
+
+        # Exact patterns grouped by the first character their prefilters start with
+        self.candidates: Dict[str, List[Tuple[Tuple[str, str], re.Pattern]]] = {}
+        for label, pattern, prefilters in self.tokens:
+            compiled = re.compile(pattern)
+            for lead in {literal[0] for literal, _ in prefilters}:
+                self.candidates.setdefault(lead, []).append((label, compiled))
+
+    def scan(self, text_lower: str):
+        """Single pass over the text; returns (keywords, states, flags, first_matches)"""
+        keywords, states, flags = set(), set(), set()
+        first_matches = {}
+
+        search = self.prefilter_pattern.search
+        pos = 0
+        match = search(text_lower, pos)
+        while match:
+            pos = match.start()
+            for (kind, name), pattern in self.candidates[text_lower[pos]]:
+                if kind == 'first' and name in first_matches:
+                    continue
+                token_match = pattern.match(text_lower, pos)
+                if not token_match:
+                    continue
+                if kind == 'kw':
+                    keywords.add(name)
+                elif kind == 'state':
+                    states.add(name)
+                elif kind == 'flag':
+                    flags.add(name)
+                else:
+                    first_matches[name] = token_match
+            # Tokens may overlap (e.g. "male" inside "female"), so resume one character on
+            match = search(text_lower, pos + 1)
+
+        return keywords, states, flags, first_matches
+
+    def extract(self, text: str) -> Dict:
+        """Return the raw feature values for a scheme's combined text"""
+        text_lower = text.lower()
+        kw, states, flags, first = self.scan(text_lower)
+
+        min_age = None
+        max_age = None
+        if 'age_range' in first:
+            min_age = int(first['age_range'].group(1))
+            max_age = int(first['age_range'].group(2))
+        else:
+            if 'age_below' in first:
+                max_age = int(first['age_below'].group(1))
+            if 'age_above' in first:
+                min_age = int(first['age_above'].group(1))
+
+        if kw & {'female', 'women', 'girl'}:
+            gender = 'female'
+        elif 'male' in kw:
+            gender = 'male'
+        else:
+            gender = 'any'
+
+        if 'income' in first:
+            max_income = int(first['income'].group(1).replace(',', ''))
+        elif 'bpl' in flags:
+            max_income = 100000
+        else:
+            max_income = None
+
+        caste = [name for flag, name in (('caste_sc', 'SC'), ('caste_st', 'ST'), ('caste_obc', 'OBC'), ('caste_general', 'General')) if flag in flags]
+        caste = caste if caste else ['Any']
+
+        occupation = []
+        if kw & {'farmer', 'agriculture'}:
+            occupation.append('farmer')
+        if kw & {'student', 'education'}:
+            occupation.append('student')
+        if 'unemployed' in kw:
+            occupation.append('unemployed')
+        if kw & {'worker', 'labour', 'labor'}:
+            occupation.append('worker')
+        occupation = occupation if occupation else ['any']
+
+        if 'rural' in kw and 'urban' not in kw:
+            residence = 'rural'
+        elif 'urban' in kw and 'rural' not in kw:
+            residence = 'urban'
+        else:
+            residence = 'any'
+
+        state_specific = next((state.title() for state in STATES if state in states), None)
+
+        if kw & {'scholarship', 'education'}:
+            benefit_type = 'scholarship'
+        elif 'pension' in kw:
+            benefit_type = 'pension'
+        elif kw & {'loan', 'credit'}:
+            benefit_type = 'loan'
+        elif 'subsidy' in kw:
+            benefit_type = 'subsidy'
+        elif 'insurance' in kw:
+            benefit_type = 'insurance'
+        else:
+            benefit_type = 'financial_assistance'
+
+        benefit_amount = int(first['amount'].group(1).replace(',', '')) if 'amount' in first else None
+
+        if kw & {'education', 'student', 'scholarship'}:
+            category = 'education'
+        elif kw & {'health', 'medical'}:
+            category = 'health'
+        elif kw & {'agriculture', 'farmer'}:
+            category = 'agriculture'
+        elif kw & {'employment', 'skill'}:
+            category = 'employment'
+        elif kw & {'pension', 'senior', 'elderly'}:
+            category = 'social_security'
+        elif kw & {'women', 'girl'}:
+            category = 'women_empowerment'
+        else:
+            category = 'general_welfare'
+
+        target_groups = []
+        if kw & {'women', 'girl'}:
+            target_groups.append('women')
+        if kw & {'student', 'education'}:
+            target_groups.append('students')
+        if 'farmer' in kw:
+            target_groups.append('farmers')
+        if kw & {'senior', 'elderly', 'aged'}:
+            target_groups.append('senior_citizens')
+        if 'child' in kw:
+            target_groups.append('children')
+        if kw & {'disabled', 'handicapped'}:
+            target_groups.append('disabled')
+        if 'widow' in kw:
+            target_groups.append('widows')
+        if 'minority' in kw:
+            target_groups.append('minorities')
+        target_groups = target_groups if target_groups else ['general']
+
+        return {
+            'min_age': min_age,
+            'max_age': max_age,
+            'gender': gender,
+            'max_family_income': max_income,
+            'caste': caste,
+            'occupation': occupation,
+            'residence': residence,
+            'state_specific': state_specific,
+            'benefit_type': benefit_type,
+            'benefit_amount': benefit_amount,
+            'category': category,
+            'target_groups': target_groups,
+            'level': 'state' if states else 'central',
+        }
+
+    def normalize(self, scheme: Dict) -> Dict:
+        """Build the normalized scheme dict used for eligibility checks and retrieval"""
+        combined_text = ' '.join([str(value) for key, value in scheme.items() if key not in ID_FIELDS])
+        features = self.extract(combined_text)
+        caste = features['caste']
+        occupation = features['occupation']
+        state_specific = features['state_specific']
+
+        semantic_summary = f"{scheme.get('schemeName', '')}. {scheme.get('Details', '')} {scheme.get('Benefits', '')}"
+
+        tags = []
+        tags.extend(features['target_groups'])
+        tags.append(features['category'])
+        tags.extend(caste if caste != ['Any'] else [])
+        tags.extend(occupation if occupation != ['any'] else [])
+
+        return {
+            'scheme_id': scheme_id_for(scheme),
+            'name': scheme.get('schemeName', ''),
+            'level': features['level'],
+            'state': state_specific if state_specific else 'All',
+            'category': features['category'],
+            'target_groups': features['target_groups'],
+            'eligibility': {
+                'min_age': features['min_age'],
+                'max_age': features['max_age'],
+                'gender': features['gender'],
+                'max_family_income': features['max_family_income'],
+                'caste': caste,
+                'occupation': occupation,
+                'residence': features['residence'],
+                'state_specific': state_specific
+            },
+            'benefits': {
+                'type': features['benefit_type'],
+                'amount': features['benefit_amount'],
+                'description': scheme.get('Benefits', '')
+            },
+            'details': scheme.get('Details', ''),
+            'application_process': scheme.get('How to Avail', ''),
+            'tags': list(set(tags)),
+            'semantic_summary': semantic_summary,
+            'full_text': combined_text
+        }
+
+
+scheme_feature_extractor = SchemeFeatureExtractor()
+
+
+def _normalize_chunk(args) -> List[Dict]:
+    start_idx, chunk = args
+    normalized = []
+    for offset, scheme in enumerate(chunk):
+        idx = start_idx + offset
+        try:
+            normalized.append(scheme_feature_extractor.normalize(scheme))
+        except Exception as e:
+            print(f"  ⚠ Error processing scheme {idx}: {e}")
+    return normalized
+
+
+def _chunked(raw_schemes: Iterable[Dict], chunk_size: int):
+    iterator = iter(raw_schemes)
+    start_idx = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start_idx, chunk
+        start_idx += len(chunk)
+
+
+def normalize_schemes(raw_schemes: Iterable[Dict], workers: int = 1, chunk_size: int = 256) -> List[Dict]:
+    """Normalize a corpus (any iterable, e.g. a RawSchemeReader), sharding it across a process pool when workers > 1"""
+    if workers <= 1:
+        normalized = []
+        for chunk in _chunked(raw_schemes, chunk_size):
+            normalized.extend(_normalize_chunk(chunk))
+        return _dedupe_ids(normalized)
+
+    # executor.map would pull every chunk up front; keep a bounded window in flight
+    # instead, so a streamed input is never fully held in memory
+    normalized = []
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in _chunked(raw_schemes, chunk_size):
+            pending.append(executor.submit(_normalize_chunk, chunk))
+            if len(pending) >= workers * 2:
+                normalized.extend(pending.popleft().result())
+        while pending:
+            normalized.extend(pending.popleft().result())
+    return _dedupe_ids(normalized)
+
+
+def _dedupe_ids(schemes: List[Dict]) -> List[Dict]:
+    """Suffix repeated scheme ids (-2, -3, ...) in file order so every id is unique"""
+    seen = set()
+    for scheme in schemes:
+        base = scheme_id = scheme['scheme_id']
+        n = 1
+        while scheme_id in seen:
+            n += 1
+            scheme_id = f"{base}-{n}"
+        if scheme_id != base:
+            print(f"  ⚠ Duplicate scheme id '{base}', using '{scheme_id}'")
+            scheme['scheme_id'] = scheme_id
+        seen.add(scheme_id)
+    return schemes
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import numpy as np
+import faiss
+from typing import Dict, Optional, Sequence
+from config.settings import settings
+
+INDEX_TYPES = ('flat_l2', 'flat_ip', 'hnsw', 'ivf')
+VECTOR_STORAGES = ('float32', 'float16', 'int8', 'pq')
+
+
+def faiss_ids(scheme_ids: Sequence[str]) -> np.ndarray:
+    """Stable non-negative int64 FAISS ids for scheme ids (the first 63 bits of their BLAKE2b hash)"""
+    return np.array([
+        int.from_bytes(hashlib.blake2b(scheme_id.encode('utf-8'), digest_size=8).digest(), 'little') >> 1
+        for scheme_id in scheme_ids
+    ], dtype=np.int64)
+
+
+class SchemeIndexBuilder:
+    """Builds and tunes the FAISS index used for scheme retrieval.
+
+    flat_l2 is the original exact search on raw vectors. The other types work on
+    L2-normalized vectors with inner-product (cosine) scoring: flat_ip is exact,
+    hnsw and ivf are approximate and tuned with efSearch / nprobe.
+
+    Vectors are labelled with faiss_ids() of their scheme ids rather than by
+    position (IVF natively, the others through IDMap2), so single schemes can
+    be removed and added without a rebuild.
+
+    vector_storage picks how the index codes vectors: float32 as before, float16
+    or int8 scalar quantization, or product quantization (flat and ivf only).
+    The raw embeddings kept next to the index are stored at the same width,
+    with pq falling back to float16 there since it has no per-row decoding.
+    """
+
+    def __init__(self, index_type: str = 'flat_l2', hnsw_m: int = 32, hnsw_ef_construction: int = 200,
+                 hnsw_ef_search: int = 64, ivf_nlist: int = 0, ivf_nprobe: int = 8,
+                 vector_storage: str = 'float32', pq_m: int = 48, pq_nbits: int = 8):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown scheme index type '{index_type}'. Expected one of: {', '.join(INDEX_TYPES)}")
+        if vector_storage not in VECTOR_STORAGES:
+            raise ValueError(f"Unknown scheme vector storage '{vector_storage}'. Expected one of: {', '.join(VECTOR_STORAGES)}")
+        if vector_storage == 'pq' and index_type == 'hnsw':
+            raise ValueError("pq vector storage is not supported with the hnsw index type")
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.vector_storage = vector_storage
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            index_type=settings.SCHEME_INDEX_TYPE,
+            hnsw_m=settings.SCHEME_HNSW_M,
+            hnsw_ef_construction=settings.SCHEME_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=settings.SCHEME_HNSW_EF_SEARCH,
+            ivf_nlist=settings.SCHEME_IVF_NLIST,
+            ivf_nprobe=settings.SCHEME_IVF_NPROBE,
+            vector_storage=settings.SCHEME_VECTOR_STORAGE,
+            pq_m=settings.SCHEME_PQ_M,
+            pq_nbits=settings.SCHEME_PQ_NBITS,
+        )
+
+    @property
+    def normalize_vectors(self) -> bool:
+        return self.index_type != 'flat_l2'
+
+    def build_params(self) -> Dict:
+        """Parameters baked into the index at build time (part of the artifact key)"""
+        params = {}
+        if self.index_type == 'hnsw':
+            params = {'m': self.hnsw_m, 'ef_construction': self.hnsw_ef_construction}
+        elif self.index_type == 'ivf':
+            params = {'nlist': self.ivf_nlist}
+        # Omitted for float32 so existing artifacts keep their keys
+        if self.vector_storage != 'float32':
+            params['storage'] = self.vector_storage
+            if self.vector_storage == 'pq':
+                params.update(pq_m=self.pq_m, pq_nbits=self.pq_nbits)
+        return params
+
+    def describe(self) -> Dict:
+        description = {'type': self.index_type, 'normalized_vectors': self.normalize_vectors, 'storage': self.vector_storage}
+        description.update(self.build_params())
+        if self.index_type == 'hnsw':
+            description['ef_search'] = self.hnsw_ef_search
+        elif self.index_type == 'ivf':
+            description['nprobe'] = self.ivf_nprobe
+        return description
+
+    def prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Return float32 vectors in the form the index expects"""
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        if self.normalize_vectors:
+            vectors = vectors.copy()
+            faiss.normalize_L2(vectors)
+        return vectors
+
+    def _nlist_for(self, count: int) -> int:
+        if self.ivf_nlist > 0:
+            return max(1, min(self.ivf_nlist, count))
+        # FAISS wants ~39 training points per centroid
+        return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+    def _storage_code(self) -> str:
+        return {
+            'float32': 'Flat',
+            'float16': 'SQfp16',
+            'int8': 'SQ8',
+            'pq': f'PQ{self.pq_m}x{self.pq_nbits}',
+        }[self.vector_storage]
+
+    def factory_string(self, count: int) -> str:
+        """faiss.index_factory description of the index for a corpus of count vectors"""
+        code = self._storage_code()
+        if self.index_type in ('flat_l2', 'flat_ip'):
+            return f'IDMap2,{code}'
+        if self.index_type == 'hnsw':
+            return f'IDMap2,HNSW{self.hnsw_m}' + ('' if code == 'Flat' else f'_{code}')
+        # IVF lists store ids themselves
+        return f'IVF{self._nlist_for(count)},{code}'
+
+    @staticmethod
+    def base_index(index):
+        """The index under an IDMap wrapper, downcast to its concrete type"""
+        index = faiss.downcast_index(index)
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        return index
+
+    def build(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None):
+        """Build an index over vectors already passed through prepare(), labelled with ids (default: positions)"""
+        if ids is None:
+            ids = np.arange(len(vectors), dtype=np.int64)
+        metric = faiss.METRIC_L2 if self.index_type == 'flat_l2' else faiss.METRIC_INNER_PRODUCT
+        index = faiss.index_factory(vectors.shape[1], self.factory_string(len(vectors)), metric)
+        if self.index_type == 'hnsw':
+            self.base_index(index).hnsw.efConstruction = self.hnsw_ef_construction
+        if not index.is_trained:
+            index.train(vectors)
+        index.add_with_ids(vectors, ids)
+        self.configure(index)
+        return index
+
+    def update(self, index, remove_ids: np.ndarray, vectors: np.ndarray, ids: np.ndarray) -> bool:
+        """Remove remove_ids from a writable index and add vectors under ids, reusing its training.
+        The index must own its data: mmap-read indexes cannot be modified. Returns False
+        for hnsw, which cannot remove vectors; rebuild it with build() instead."""
+        if self.index_type == 'hnsw':
+            return False
+        if len(remove_ids):
+            index.remove_ids(np.ascontiguousarray(remove_ids, dtype=np.int64))
+        if len(ids):
+            index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+        self.configure(index)
+        return True
+
+    def compress(self, vectors: np.ndarray):
+        """Store prepared vectors at the configured width. Returns (stored, scale);
+        int8 uses one symmetric scale for the whole matrix, other widths ignore it."""
+        if self.vector_storage == 'float32':
+            return np.ascontiguousarray(vectors, dtype='float32'), 1.0
+        if self.vector_storage == 'int8':
+            scale = float(np.abs(vectors).max()) / 127.0 or 1.0
+            return np.clip(np.rint(vectors / scale), -127, 127).astype('int8'), scale
+        return vectors.astype('float16'), 1.0
+
+    @staticmethod
+    def decompress(rows: np.ndarray, scale: float = 1.0) -> np.ndarray:
+        """float32 view of rows returned by compress()"""
+        if rows.dtype == np.int8:
+            return rows.astype('float32') * np.float32(scale)
+        return rows.astype('float32', copy=False)
+
+    def configure(self, index):
+        """Apply search-time parameters; needed again after reading an index from disk"""
+        if self.index_type == 'hnsw':
+            self.base_index(index).hnsw.efSearch = self.hnsw_ef_search
+        elif self.index_type == 'ivf':
+            faiss.extract_index_ivf(index).nprobe = self.ivf_nprobe
+        return index
+
+
+scheme_index_builder = SchemeIndexBuilder.from_settings()
@@ -0,0 +1,150 @@
+import json
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+# A '{' that may begin the next record: after a comma or at the start of a line
+_RECORD_START = re.compile(r'[,\n]\s*\{')
+_WHITESPACE_AND_COMMAS = re.compile(r'[\s,]*')
+# Longest token that can be cut off at the end of the buffer: a \uXXXX escape
+_MAX_PARTIAL_TOKEN = 6
+
+
+class SkippedRecord(NamedTuple):
+    offset: int  # character offset of the record in the file
+    length: int
+    error: str
+
+
+def _ran_out(text: str, error: json.JSONDecodeError) -> bool:
+    """Whether decoding failed only because text ends inside the value, so more input may complete it.
+    With strict=False a string can only be unterminated at the end of the text; any other error
+    counts when nothing but a partial token (a literal, number or escape) follows it."""
+    return error.msg.startswith('Unterminated string') or len(text[error.pos:].strip()) < _MAX_PARTIAL_TOKEN
+
+
+class RawSchemeReader:
+    """Streams records from the raw scheme dump without loading the whole file.
+
+    The file is read in chunk_size-character pieces and each record of the top-level
+    array (or of a sequence of concatenated objects) is decoded on its own, so
+    memory holds one chunk plus the current record. Raw control characters
+    inside strings are accepted. A record that still fails to decode is
+    listed in `skipped`, and reading resumes at the next record start that
+    decodes, so a missing bracket or stray quote costs only that record.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 256 * 1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.records = 0
+        self.skipped: List[SkippedRecord] = []
+        self._decoder = json.JSONDecoder(strict=False)
+        # Matches the opening of a record that starts with the same key as the last good one
+        self._record_opening = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.records = 0
+        self.skipped = []
+        self._record_opening = None
+        with open(self.path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            buffer = ''
+            base = 0  # file offset of buffer[0]
+            pos = 0
+            eof = False
+            need_more = False
+            started = False
+            in_array = False
+
+            while True:
+                # Keep a full chunk ahead of pos so records shorter than a chunk are always complete
+                if not eof and (need_more or len(buffer) - pos < self.chunk_size):
+                    need_more = False
+                    data = f.read(self.chunk_size)
+                    if data:
+                        # Keep the line break and indentation before pos, which _next_record() matches records on
+                        newline = buffer.rfind('\n', 0, pos)
+                        keep = newline if newline >= 0 and not buffer[newline + 1:pos].strip() else pos
+                        buffer = buffer[keep:] + data
+                        base += keep
+                        pos -= keep
+                    else:
+                        eof = True
+                    continue
+
+                pos = _WHITESPACE_AND_COMMAS.match(buffer, pos).end()
+                if pos >= len(buffer):
+                    if eof:
+                        return
+                    need_more = True
+                    continue
+                char = buffer[pos]
+                if not started:
+                    started = True
+                    if char == '[':
+                        in_array = True
+                        pos += 1
+                        continue
+                if char == ']' and in_array:
+                    return
+
+                try:
+                    record, end = self._decoder.raw_decode(buffer, pos)
+                    error = None if isinstance(record, dict) else f"expected an object, got {type(record).__name__}"
+                except json.JSONDecodeError as e:
+                    if not eof and _ran_out(buffer, e):
+                        # The record runs past the buffer; read more and decode it again
+                        need_more = True
+                        continue
+                    error = e.msg
+                    if char in '{[':
+                        end = self._next_record(buffer, pos, eof)
+                        if end is None:
+                            # No later record decodes yet; read more and try again
+                            need_more = True
+                            continue
+                    else:
+                        # Not the start of a value: resynchronize on the next object
+                        next_object = buffer.find('{', pos + 1)
+                        end = next_object if next_object >= 0 else len(buffer)
+
+                if error:
+                    length = len(buffer[pos:end].rstrip(' \t\r\n,'))
+                    self.skipped.append(SkippedRecord(base + pos, length, error))
+                    print(f"  ⚠ Skipped malformed scheme record at offset {base + pos}: {error}")
+                else:
+                    self.records += 1
+                    first_key = next(iter(record), None)
+                    if first_key is not None and self._record_opening is None:
+                        self._record_opening = re.compile(r'\{\s*' + re.escape(json.dumps(first_key)) + r'\s*:')
+                    yield record
+                pos = end
+
+    def _next_record(self, text: str, start: int, eof: bool) -> Optional[int]:
+        """Start of the first record after the malformed one at start that decodes to an object.
+
+        Candidates are '{' after a comma or at the start of a line. So that objects
+        nested inside the bad record are not taken for records, a candidate must
+        open with the first key of the records read so far and, when the bad
+        record begins its own line as in an indented dump, be indented like it.
+        Returns len(text) at the end of the file if none decodes, and None if
+        more input is needed to tell.
+        """
+        newline = text.rfind('\n', 0, start)
+        indent = start - newline - 1 if newline >= 0 and not text[newline + 1:start].strip() else None
+        for match in _RECORD_START.finditer(text, start + 1):
+            candidate = match.end() - 1
+            if self._record_opening is not None and not self._record_opening.match(text, candidate):
+                continue
+            if indent is not None:
+                candidate_line = text.rfind('\n', 0, candidate) + 1
+                if text[candidate_line:candidate].strip() or candidate - candidate_line != indent:
+                    continue
+            try:
+                value, _ = self._decoder.raw_decode(text, candidate)
+            except json.JSONDecodeError as e:
+                if not eof and _ran_out(text, e):
+                    return None
+                continue
+            if isinstance(value, dict):
+                return candidate
+        return len(text) if eof else None
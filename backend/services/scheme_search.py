@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import json
+import threading
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional
+from config.settings import settings
+from services.filtered_search import scheme_filtered_searcher
+from services.name_index import normalize_name
+
+
+class SearchPage(NamedTuple):
+    results: List[Dict]         # scheme_id, name and score, best first
+    match: str                  # exact, prefix or semantic
+    next_cursor: Optional[str]  # None on the last page
+    total: Optional[int]        # number of matches, when known without a search
+
+
+class SchemeSearcher:
+    """Ranked scheme lookup for /schemes/search, without the LLM.
+
+    Queries that equal a scheme name, or are a prefix of one, are answered from
+    the corpus name index without running the encoder. Anything else is ranked
+    by the vector index, restricted to a profile's eligible schemes when one is
+    given. Pages are addressed by an opaque cursor tied to the query, profile and
+    corpus revision, so a cursor is rejected after the corpus changes.
+    """
+
+    def __init__(self, filtered_searcher, max_results: int, max_page_size: int, min_prefix_chars: int):
+        self.filtered_searcher = filtered_searcher
+        self.max_results = max_results
+        self.max_page_size = max_page_size
+        self.min_prefix_chars = min_prefix_chars
+        self._lock = threading.Lock()
+        self.matches: Dict[str, int] = {}
+
+    @staticmethod
+    def _fingerprint(query: str, profile: Optional[Dict]) -> str:
+        payload = json.dumps([normalize_name(query), profile], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _corpus_version(corpus) -> str:
+        return f"{corpus.artifact_key}:{corpus.revision}"
+
+    def encode_cursor(self, corpus, fingerprint: str, offset: int) -> str:
+        payload = json.dumps({'v': self._corpus_version(corpus), 'f': fingerprint, 'o': offset})
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor: str, corpus, fingerprint: str) -> int:
+        """Offset a cursor points at. Raises ValueError for a malformed, foreign or stale cursor."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            version, cursor_fingerprint, offset = payload['v'], payload['f'], int(payload['o'])
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if cursor_fingerprint != fingerprint:
+            raise ValueError("Cursor belongs to a different query or profile")
+        if version != self._corpus_version(corpus):
+            raise ValueError("Scheme data changed since this cursor was issued; start the search again")
+        if not 0 <= offset < self.max_results:
+            raise ValueError("Invalid cursor")
+        return offset
+
+    def search(self, corpus, query: str, profile: Optional[Dict] = None, cursor: Optional[str] = None,
+               limit: int = 10) -> SearchPage:
+        if not normalize_name(query):
+            raise ValueError("Query is empty")
+        if not 1 <= limit <= self.max_page_size:
+            raise ValueError(f"limit must be between 1 and {self.max_page_size}")
+        fingerprint = self._fingerprint(query, profile)
+        offset = self.decode_cursor(cursor, corpus, fingerprint) if cursor else 0
+        end = min(offset + limit, self.max_results)
+        eligible_ids = corpus.eligibility_index.eligible_indices(profile) if profile else None
+
+        match, positions, scores = corpus.name_index.lookup(query, self.min_prefix_chars)
+        if eligible_ids is not None and len(positions):
+            eligible = np.isin(positions, eligible_ids)
+            positions, scores = positions[eligible], scores[eligible]
+        if len(positions):
+            total = min(len(positions), self.max_results)
+            page = positions[offset:end], scores[offset:end]
+            has_more = end < total
+        else:
+            match, total = 'semantic', None
+            query_embedding = corpus.encode_query(query)
+            # One extra result tells whether another page exists
+            k = min(end + 1, self.max_results)
+            if eligible_ids is None:
+                ids = corpus.search(query_embedding, k)
+            else:
+                ids = self.filtered_searcher.search(corpus, query_embedding, eligible_ids, k).ids
+            page_ids = np.array(ids[offset:end], dtype=np.int64)
+            page = page_ids, corpus.similarities(query_embedding, page_ids)
+            has_more = len(ids) > end and end < self.max_results
+
+        with self._lock:
+            self.matches[match] = self.matches.get(match, 0) + 1
+        results = [
+            {"scheme_id": corpus.scheme_ids[p], "name": corpus.schemes[p]['name'], "score": round(float(score), 4)}
+            for p, score in zip(*page)
+        ]
+        next_cursor = self.encode_cursor(corpus, fingerprint, end) if has_more else None
+        return SearchPage(results, match, next_cursor, total)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "matches": dict(self.matches),
+                "max_results": self.max_results,
+                "min_prefix_chars": self.min_prefix_chars
+            }
+
+
+scheme_searcher = SchemeSearcher(
+    scheme_filtered_searcher,
+    settings.SCHEME_SEARCH_MAX_RESULTS,
+    settings.SCHEME_SEARCH_MAX_PAGE_SIZE,
+    settings.SCHEME_NAME_PREFIX_MIN_CHARS
+)
@@ -0,0 +1,221 @@
+import json
+import mmap
+import os
+import numpy as np
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional
+
+BLOB_FILE = "schemes.blob"
+OFFSETS_FILE = "schemes.offsets.npy"
+NUMERIC_FILE = "schemes.numeric.npy"
+LAYOUT_FILE = "schemes.layout.json"
+
+# Small per-scheme fields, kept together as one JSON record in the blob
+META_FIELDS = ('level', 'state', 'category', 'target_groups', 'tags', 'gender', 'caste',
+               'occupation', 'residence', 'state_specific', 'benefit_type')
+# Text fields, each its own slice of the blob
+TEXT_FIELDS = ('scheme_id', 'name', 'details', 'benefits_description', 'application_process', 'full_text')
+# Numeric eligibility columns; NaN stands for None
+NUMERIC_FIELDS = ('min_age', 'max_age', 'max_family_income', 'benefit_amount')
+
+SCHEME_KEYS = ('scheme_id', 'name', 'level', 'state', 'category', 'target_groups', 'eligibility', 'benefits',
+               'details', 'application_process', 'tags', 'semantic_summary', 'full_text')
+
+
+def _flatten(scheme: Dict) -> Dict:
+    elig = scheme['eligibility']
+    benefits = scheme['benefits']
+    return {
+        'scheme_id': scheme['scheme_id'],
+        'level': scheme['level'],
+        'state': scheme['state'],
+        'category': scheme['category'],
+        'target_groups': scheme['target_groups'],
+        'tags': scheme['tags'],
+        'gender': elig['gender'],
+        'caste': elig['caste'],
+        'occupation': elig['occupation'],
+        'residence': elig['residence'],
+        'state_specific': elig['state_specific'],
+        'benefit_type': benefits['type'],
+        'name': scheme['name'],
+        'details': scheme['details'],
+        'benefits_description': benefits['description'],
+        'application_process': scheme['application_process'],
+        'full_text': scheme['full_text'],
+        'min_age': elig['min_age'],
+        'max_age': elig['max_age'],
+        'max_family_income': elig['max_family_income'],
+        'benefit_amount': benefits['amount'],
+    }
+
+
+def write_scheme_store(directory: str, schemes: List[Dict], extra_text: Dict[str, List[str]] = None,
+                       extra_numeric: Dict[str, np.ndarray] = None):
+    """Write normalized schemes as a string blob, an offset table and numeric columns.
+
+    extra_text / extra_numeric add derived per-scheme columns (e.g. rendered
+    prompt blocks and their token counts) that are read back by name.
+    """
+    extra_text = extra_text or {}
+    extra_numeric = extra_numeric or {}
+    text_fields = ['meta', *TEXT_FIELDS, *extra_text]
+    numeric_fields = [*NUMERIC_FIELDS, *extra_numeric]
+
+    offsets = np.empty(len(schemes) * len(text_fields) + 1, dtype=np.int64)
+    numeric = np.full((len(schemes), len(numeric_fields)), np.nan, dtype=np.float64)
+    position = 0
+    slot = 0
+    with open(os.path.join(directory, BLOB_FILE), 'wb') as blob:
+        for i, scheme in enumerate(schemes):
+            flat = _flatten(scheme)
+            values = [json.dumps([flat[f] for f in META_FIELDS], ensure_ascii=False)]
+            values.extend(str(flat[f] or '') for f in TEXT_FIELDS)
+            values.extend(column[i] for column in extra_text.values())
+            for value in values:
+                data = value.encode('utf-8')
+                offsets[slot] = position
+                blob.write(data)
+                position += len(data)
+                slot += 1
+            for j, field in enumerate(NUMERIC_FIELDS):
+                if flat[field] is not None:
+                    numeric[i, j] = flat[field]
+        offsets[slot] = position
+
+    for j, column in enumerate(extra_numeric.values(), start=len(NUMERIC_FIELDS)):
+        numeric[:, j] = column
+    np.save(os.path.join(directory, OFFSETS_FILE), offsets)
+    np.save(os.path.join(directory, NUMERIC_FILE), numeric)
+    with open(os.path.join(directory, LAYOUT_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'count': len(schemes), 'text_fields': text_fields, 'numeric_fields': numeric_fields}, f)
+
+
+class TextColumn(Sequence):
+    """Lazy sequence view of one text column"""
+
+    def __init__(self, store: 'SchemeStore', field: str):
+        self._store = store
+        self._field = store.text_field_index(field)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, i):
+        return self._store._text(int(i), self._field)
+
+
+class SchemeStore(Sequence):
+    """Read-only, memory-mapped columnar store of normalized schemes.
+
+    Text lives in one UTF-8 blob addressed by an offset table and numeric
+    eligibility fields in a float64 matrix, all memory-mapped, so every worker
+    reading the same artifact shares the pages through the OS page cache.
+    store[i] returns a SchemeRecord, which behaves like the normalized scheme
+    dict but decodes fields only when they are accessed.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, LAYOUT_FILE), 'r', encoding='utf-8') as f:
+            layout = json.load(f)
+        self._count = layout['count']
+        self._text_fields = layout['text_fields']
+        self._numeric_fields = layout['numeric_fields']
+        self._stride = len(self._text_fields)
+
+        self._offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode='r')
+        self._numeric = np.load(os.path.join(directory, NUMERIC_FILE), mmap_mode='r')
+        with open(os.path.join(directory, BLOB_FILE), 'rb') as f:
+            # mmap rejects empty files
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+
+        if len(self._offsets) != self._count * self._stride + 1 or self._numeric.shape[0] != self._count:
+            raise ValueError("Scheme store files are inconsistent")
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [SchemeRecord(self, j) for j in range(*i.indices(self._count))]
+        i = int(i)
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("scheme index out of range")
+        return SchemeRecord(self, i)
+
+    def text_field_index(self, field: str) -> int:
+        return self._text_fields.index(field)
+
+    def has_column(self, field: str) -> bool:
+        return field in self._text_fields or field in self._numeric_fields
+
+    def text_column(self, field: str) -> TextColumn:
+        return TextColumn(self, field)
+
+    def numeric_column(self, field: str) -> np.ndarray:
+        """Read-only view of a numeric column (NaN where the value is None)"""
+        return self._numeric[:, self._numeric_fields.index(field)]
+
+    def _text(self, i: int, field_index: int) -> str:
+        slot = i * self._stride + field_index
+        return self._blob[self._offsets[slot]:self._offsets[slot + 1]].decode('utf-8')
+
+    def _number(self, i: int, field: str) -> Optional[int]:
+        value = self._numeric[i, self._numeric_fields.index(field)]
+        return None if np.isnan(value) else int(value)
+
+    def _meta(self, i: int) -> Dict:
+        return dict(zip(META_FIELDS, json.loads(self._text(i, 0))))
+
+
+class SchemeRecord(Mapping):
+    """Dict-like view of one scheme in a SchemeStore; nothing is decoded until accessed"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: SchemeStore, index: int):
+        self._store = store
+        self._index = index
+
+    def _text(self, field: str) -> str:
+        return self._store._text(self._index, self._store.text_field_index(field))
+
+    def __getitem__(self, key):
+        store, i = self._store, self._index
+        if key in ('scheme_id', 'name', 'details', 'application_process', 'full_text'):
+            return self._text(key)
+        if key == 'semantic_summary':
+            # Derived instead of stored: it only repeats name, details and benefits
+            return f"{self._text('name')}. {self._text('details')} {self._text('benefits_description')}"
+        if key == 'eligibility':
+            meta = store._meta(i)
+            return {
+                'min_age': store._number(i, 'min_age'),
+                'max_age': store._number(i, 'max_age'),
+                'gender': meta['gender'],
+                'max_family_income': store._number(i, 'max_family_income'),
+                'caste': meta['caste'],
+                'occupation': meta['occupation'],
+                'residence': meta['residence'],
+                'state_specific': meta['state_specific']
+            }
+        if key == 'benefits':
+            return {
+                'type': store._meta(i)['benefit_type'],
+                'amount': store._number(i, 'benefit_amount'),
+                'description': self._text('benefits_description')
+            }
+        if key in SCHEME_KEYS:
+            return store._meta(i)[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(SCHEME_KEYS)
+
+    def __len__(self):
+        return len(SCHEME_KEYS)
+
+    def __repr__(self):
+        return f"SchemeRecord({self._index}, {self['name']!r})"
@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+from config.settings import settings
+
+# Rough fixed cost of a session object, its deque and its slot in the store
+SESSION_OVERHEAD_BYTES = 512
+
+
+class SchemeSession:
+    """One user's scheme conversation.
+
+    Eligibility is a packed bitmap over the corpus positions (one bit per
+    scheme) tagged with the corpus generation it was computed against, and
+    history keeps only the most recent turns.
+    """
+
+    __slots__ = ('user_id', 'profile', 'eligible_bitmap', 'eligible_count', 'corpus_generation',
+                 'history', 'last_access', 'nbytes')
+
+    def __init__(self, user_id: str, profile: Optional[Dict], max_history: int):
+        self.user_id = user_id
+        self.profile = profile
+        self.eligible_bitmap: Optional[np.ndarray] = None
+        self.eligible_count = 0
+        self.corpus_generation: Optional[int] = None
+        self.history = deque(maxlen=max_history)
+        self.last_access = time.monotonic()
+        self.nbytes = 0
+
+    def set_eligibility(self, eligible_ids: np.ndarray, corpus_size: int, corpus_generation: int):
+        mask = np.zeros(corpus_size, dtype=bool)
+        mask[eligible_ids] = True
+        self.eligible_bitmap = np.packbits(mask)
+        self.eligible_count = int(len(eligible_ids))
+        self.corpus_generation = corpus_generation
+
+    def eligible_ids(self, corpus_size: int) -> np.ndarray:
+        """Corpus positions of the eligible schemes"""
+        if self.eligible_bitmap is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(np.unpackbits(self.eligible_bitmap, count=corpus_size))
+
+    def eligibility_stale(self, corpus_generation: int) -> bool:
+        """True when the profile's eligibility was computed against another corpus (or never)"""
+        return self.profile is not None and self.corpus_generation != corpus_generation
+
+    def estimate_bytes(self) -> int:
+        size = SESSION_OVERHEAD_BYTES + len(self.user_id)
+        if self.profile:
+            size += len(json.dumps(self.profile, default=str))
+        if self.eligible_bitmap is not None:
+            size += self.eligible_bitmap.nbytes
+        for turn in self.history:
+            size += len(turn['user']) + len(turn['assistant']) + sum(len(name) for name in turn['schemes_used'])
+        return size
+
+
+class SchemeSessionStore:
+    """Scheme chat sessions with idle TTL, LRU eviction and caps on count and estimated memory"""
+
+    def __init__(self, ttl_seconds: float, max_sessions: int, max_bytes: int, max_history: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_history = max_history
+        self._sessions: "OrderedDict[str, SchemeSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get_or_create(self, user_id: str, profile: Optional[Dict] = None) -> SchemeSession:
+        """Fetch a live session (refreshing its LRU position) or start a new one"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(user_id)
+            if session is None:
+                session = SchemeSession(user_id, profile, self.max_history)
+                self._sessions[user_id] = session
+                self._resize(session)
+            else:
+                self._sessions.move_to_end(user_id)
+            session.last_access = now
+            self._enforce_caps(keep=user_id)
+            return session
+
+    def update(self, session: SchemeSession):
+        """Re-account a session after its profile, eligibility or history changed"""
+        with self._lock:
+            if self._sessions.get(session.user_id) is session:
+                self._resize(session)
+                self._enforce_caps(keep=session.user_id)
+
+    def add_turn(self, session: SchemeSession, user_message: str, response: str, schemes_used):
+        session.history.append({'user': user_message, 'assistant': response, 'schemes_used': list(schemes_used)})
+        self.update(session)
+
+    def _resize(self, session: SchemeSession):
+        nbytes = session.estimate_bytes()
+        self.bytes_used += nbytes - session.nbytes
+        session.nbytes = nbytes
+
+    def _remove(self, user_id: str):
+        session = self._sessions.pop(user_id)
+        self.bytes_used -= session.nbytes
+
+    def _expire(self, now: float):
+        # Sessions are in access order, so expired ones are at the front
+        while self._sessions:
+            user_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.ttl_seconds:
+                break
+            self._remove(user_id)
+            self.expired += 1
+
+    def _enforce_caps(self, keep: str):
+        while self._sessions and (len(self._sessions) > self.max_sessions or self.bytes_used > self.max_bytes):
+            user_id = next(iter(self._sessions))
+            if user_id == keep:
+                break
+            self._remove(user_id)
+            self.evicted += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "active_sessions": len(self._sessions),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "expired": self.expired,
+                "evicted": self.evicted
+            }
+
+
+scheme_session_store = SchemeSessionStore(
+    ttl_seconds=settings.SCHEME_SESSION_TTL_SECONDS,
+    max_sessions=settings.SCHEME_SESSION_MAX_SESSIONS,
+    max_bytes=settings.SCHEME_SESSION_MAX_BYTES,
+    max_history=settings.SCHEME_SESSION_MAX_HISTORY
+)
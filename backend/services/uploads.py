@@ -0,0 +1,114 @@
+import contextlib
+import hashlib
+import io
+import mmap
+from typing import Iterator, NamedTuple, Sequence
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadedDocument(NamedTuple):
+    file: object        # the request's spooled temporary file, rewound
+    size: int
+    sha256: str         # hex digest of the file content
+    filename: str
+    content_type: str   # lowercased
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[memoryview]:
+        """A read-only view of the file content: a memory map when the file has a
+        descriptor, otherwise the content read once. Asking a spooled upload still
+        held in memory for its descriptor writes it (at most 1 MB) to a temporary
+        file first. The view is released on exit, so nothing may keep a reference to it."""
+        try:
+            self.file.flush()
+            fd = self.file.fileno()
+        except (AttributeError, io.UnsupportedOperation, OSError):
+            fd = None
+
+        # An empty file cannot be mapped
+        if fd is None or self.size == 0:
+            self.file.seek(0)
+            view = memoryview(self.file.read())
+            try:
+                yield view
+            finally:
+                view.release()
+                self.file.seek(0)
+            return
+
+        mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+            mapped.close()
+
+
+async def read_upload(upload: UploadFile, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> UploadedDocument:
+    """Hash and measure an upload in chunks, straight from the temporary file Starlette
+    spooled it to (in memory up to 1 MB, on disk past that). Raises a 413 as soon as
+    it passes max_bytes, and leaves the file rewound for the extractors."""
+    digest = hashlib.sha256()
+    size = 0
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit")
+        digest.update(chunk)
+    await upload.seek(0)
+    return UploadedDocument(
+        upload.file,
+        size,
+        digest.hexdigest(),
+        upload.filename or "",
+        upload.content_type.lower() if upload.content_type else ""
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects request bodies over max_bytes on the given paths with a 413 before they are
+    parsed: at once when Content-Length says so, otherwise as soon as the streamed body
+    passes the limit, so an oversized upload is never fully received and spooled."""
+
+    def __init__(self, app, max_bytes: int, paths: Sequence[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {self.max_bytes // (1024 * 1024)}MB limit"
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_bytes:
+                    print(f"⚠ Rejected {scope['path']} upload of {int(value)} bytes")
+                    response = JSONResponse(status_code=413, content={"detail": detail})
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    print(f"⚠ Rejected {scope['path']} upload past {self.max_bytes} bytes")
+                    # Raised into the body parser; FastAPI passes HTTPExceptions through to its handler
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,9 +1,18 @@
 import os
 import tempfile
 import json
+from typing import List, NamedTuple, Optional
 from google.cloud import vision
 from config.settings import settings
 
+class OcrResult(NamedTuple):
+    text: str               # empty when the image has no text or the request failed
+    error: Optional[str]    # why the request failed; the same image may read on a retry
+    
+    def message(self) -> str:
+        """The text, or the message extract_text_from_image() returns in its place"""
+        return self.error or self.text or "No text found in image"
+
 class VisionService:
     def __init__(self):
         self.client = None
@@ -49,11 +58,11 @@ class VisionService:
         print(f"Vision API available: {self.is_available()}")
         print("=" * 40)
     
-    def extract_text_from_image(self, image_bytes: bytes) -> str:
+    def ocr_image(self, image_bytes: bytes) -> OcrResult:
         print("\n=== Extracting Text from Image ===")
         if not self.client:
             print("ERROR: Vision API not configured")
-            return "Vision API not configured"
+            return OcrResult("", "Vision API not configured")
         
         try:
             print(f"Image size: {len(image_bytes)} bytes")
@@ -63,7 +72,7 @@ class VisionService:
             
             if response.error.message:
                 print(f"ERROR: Vision API error: {response.error.message}")
-                return f"Vision API error: {response.error.message}"
+                return OcrResult("", f"Vision API error: {response.error.message}")
             
             texts = response.text_annotations
             print(f"Text annotations found: {len(texts)}")
@@ -72,15 +81,49 @@ class VisionService:
                 extracted_text = texts[0].description.strip()
                 print(f"SUCCESS: Extracted {len(extracted_text)} characters")
                 print(f"Text preview: {extracted_text[:100]}...")
-                return extracted_text
+                return OcrResult(extracted_text, None)
             
             print("WARNING: No text found in image")
-            return "No text found in image"
+            return OcrResult("", None)
         except Exception as e:
             print(f"ERROR: OCR error: {str(e)}")
             import traceback
             print(traceback.format_exc())
-            return f"OCR error: {str(e)}"
+            return OcrResult("", f"OCR error: {str(e)}")
+    
+    def ocr_images(self, images: List[bytes]) -> List[OcrResult]:
+        """OCR several images in one batch_annotate_images request. Returns one result per image, in order."""
+        if not self.client:
+            return [OcrResult("", "Vision API not configured")] * len(images)
+        
+        try:
+            print(f"Calling Vision API batch_annotate_images for {len(images)} images ({sum(map(len, images))} bytes)...")
+            feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+            response = self.client.batch_annotate_images(requests=[
+                vision.AnnotateImageRequest(image=vision.Image(content=image_bytes), features=[feature])
+                for image_bytes in images
+            ])
+            
+            results = []
+            for image_response in response.responses:
+                if image_response.error.message:
+                    print(f"ERROR: Vision API error: {image_response.error.message}")
+                    results.append(OcrResult("", f"Vision API error: {image_response.error.message}"))
+                elif image_response.text_annotations:
+                    results.append(OcrResult(image_response.text_annotations[0].description.strip(), None))
+                else:
+                    results.append(OcrResult("", None))
+            print(f"SUCCESS: Batch returned text for {sum(1 for r in results if r.text)} images")
+            return results
+        except Exception as e:
+            print(f"ERROR: Batch OCR error: {str(e)}")
+            return [OcrResult("", f"OCR error: {str(e)}")] * len(images)
+    
+    def extract_text_from_image(self, image_bytes: bytes) -> str:
+        return self.ocr_image(image_bytes).message()
+    
+    def extract_text_from_images(self, images: List[bytes]) -> List[str]:
+        return [result.message() for result in self.ocr_images(images)]
     
     def is_available(self) -> bool:
         return self.client is not None
@@ -0,0 +1,100 @@
+"""
+Scheme retrieval must run off the event loop: while /schemes/recommend waits
+on a slow encoder, other requests on the same loop are still answered
+promptly. benchmarks/event_loop_benchmark.py measures the same on the real
+model and corpus.
+"""
+import asyncio
+import hashlib
+import os
+import time
+import numpy as np
+import pytest
+
+# The scheme router refuses to import without a key; /recommend never calls Groq
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import httpx
+from fastapi import FastAPI
+from routes.scheme_router import router as scheme_router
+from services.embedding_cache import query_embedding_cache
+from services.scheme_artifact import scheme_artifact_store
+from services.scheme_corpus import build_scheme_corpus, scheme_corpus_manager
+
+ENCODE_SECONDS = 0.3
+CONCURRENT_REQUESTS = 8
+
+PROFILE = {
+    'age': 20, 'gender': 'female', 'family_income': 100000, 'caste': 'SC', 'occupation': 'student',
+    'residence': 'rural', 'state': 'Gujarat', 'interests': 'education scholarship'
+}
+
+
+class SlowEncoder:
+    """Hashed bag-of-words vectors; query encodes block like a model forward pass, releasing the GIL"""
+
+    def __init__(self):
+        self.slow = False
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return 64
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        if self.slow:
+            self.calls += 1
+            time.sleep(ENCODE_SECONDS)
+        vectors = np.zeros((len(texts), 64), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % 64] += 1
+        return vectors
+
+
+@pytest.fixture
+def slow_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheme_artifact_store, 'root_dir', str(tmp_path))
+    encoder = SlowEncoder()
+    live = scheme_corpus_manager.corpus
+    scheme_corpus_manager.corpus = build_scheme_corpus(model=encoder)
+    query_embedding_cache.clear()
+    encoder.slow = True
+    yield encoder
+    scheme_corpus_manager.corpus = live
+    query_embedding_cache.clear()
+
+
+def test_recommend_does_not_block_the_event_loop(slow_corpus):
+    app = FastAPI()
+    app.include_router(scheme_router, prefix='/schemes')
+
+    @app.get('/ping')
+    async def ping():
+        return {}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test', timeout=None) as client:
+            async def recommend(i):
+                # Distinct interests keep every request out of the embedding cache
+                profile = dict(PROFILE, interests=f"{PROFILE['interests']} {i}")
+                response = await client.post('/schemes/recommend', json=profile)
+                assert response.status_code == 200, response.text
+
+            requests = asyncio.ensure_future(asyncio.gather(*(recommend(i) for i in range(CONCURRENT_REQUESTS))))
+            # How late a short sleep wakes up plus a trivial request, sampled until the recommendations finish
+            latencies = []
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                await client.get('/ping')
+                latencies.append(time.perf_counter() - start - 0.01)
+                if requests.done():
+                    break
+            await requests
+            return latencies
+
+    latencies = asyncio.run(run())
+    assert slow_corpus.calls >= 1
+    # Inline retrieval would hold each probe behind at least one whole encode
+    assert max(latencies) < ENCODE_SECONDS / 2, f"slowest probe took {max(latencies) * 1000:.0f} ms"
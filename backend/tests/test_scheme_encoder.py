@@ -0,0 +1,54 @@
+"""
+The ONNX encoder backends must produce vectors close enough to the torch
+model's that an artifact built with one can be queried with another.
+benchmarks/encoder_benchmark.py measures the same parity on the full corpus.
+"""
+import json
+import os
+import random
+import numpy as np
+import pytest
+from config.settings import settings
+from services.scheme_encoder import load_encoder
+from services.scheme_extractor import normalize_schemes
+from benchmarks.index_benchmark import build_queries
+
+# The onnx backends need sentence-transformers[onnx]
+pytest.importorskip('onnxruntime')
+pytest.importorskip('optimum.onnxruntime')
+
+MIN_COSINE = 0.98
+SAMPLE_SCHEMES = 64
+
+
+@pytest.fixture(scope='module')
+def texts():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(backend_dir, 'myscheme_raw.json'), 'r', encoding='utf-8') as f:
+        schemes = normalize_schemes(json.load(f)[:SAMPLE_SCHEMES])
+    return [s['semantic_summary'] for s in schemes] + build_queries(schemes, 32, random.Random(0))
+
+
+@pytest.fixture(scope='module')
+def torch_vectors(texts):
+    try:
+        model = load_encoder(settings.SCHEME_EMBEDDING_MODEL, 'torch')
+    except Exception as e:
+        pytest.skip(f"{settings.SCHEME_EMBEDDING_MODEL} is not available: {e}")
+    return model.encode(texts, convert_to_numpy=True)
+
+
+def cosine_rows(a, b):
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+@pytest.mark.parametrize('backend', ['onnx', 'onnx_int8'])
+def test_onnx_backends_match_torch(backend, texts, torch_vectors, tmp_path, monkeypatch):
+    # A locally exported int8 model goes to a scratch directory, not the shared encoder cache
+    monkeypatch.setattr(settings, 'SCHEME_ENCODER_CACHE_DIR', str(tmp_path))
+    model = load_encoder(settings.SCHEME_EMBEDDING_MODEL, backend, settings.SCHEME_ONNX_FILE)
+    vectors = model.encode(texts, convert_to_numpy=True)
+
+    assert vectors.shape == torch_vectors.shape
+    cosines = cosine_rows(vectors, torch_vectors)
+    assert cosines.min() >= MIN_COSINE, f"{backend}: min cosine {cosines.min():.4f}, mean {cosines.mean():.4f}"
@@ -0,0 +1,100 @@
+"""
+A malformed record in the raw dump costs only that record: reading resumes at
+the next record that decodes, whatever the chunk boundaries.
+"""
+import json
+import pytest
+from services.scheme_reader import RawSchemeReader
+
+CHUNK_SIZES = [16, 64, 4096]
+
+RECORDS = [
+    {"schemeName": f"Scheme {i}", "Details": f"Details of scheme {i}. " * 4, "Benefits": ["cash", {"amount": i}]}
+    for i in range(5)
+]
+
+
+def pretty(records):
+    return json.dumps(records, indent=4)
+
+
+def compact(records):
+    return json.dumps(records)
+
+
+def read(tmp_path, text, chunk_size):
+    path = tmp_path / 'schemes.json'
+    path.write_text(text, encoding='utf-8')
+    reader = RawSchemeReader(str(path), chunk_size=chunk_size)
+    return list(reader), reader.skipped
+
+
+def break_record(text, index, old, new):
+    """Replace the first occurrence of old inside record index (found by its name)"""
+    start = text.index(f'"Scheme {index}"')
+    at = text.index(old, start)
+    return text[:at] + new + text[at + len(old):]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('dump', [pretty, compact])
+def test_missing_closing_brace(tmp_path, chunk_size, dump):
+    text = dump(RECORDS)
+    # Drop the brace closing record 1
+    close = text.index(f'"Scheme 2"')
+    close = text.rindex('}', 0, close)
+    text = text[:close] + text[close + 1:]
+
+    records, skipped = read(tmp_path, text, chunk_size)
+    assert records == [RECORDS[0]] + RECORDS[2:]
+    assert len(skipped) == 1
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('dump', [pretty, compact])
+def test_unterminated_string(tmp_path, chunk_size, dump):
+    # The closing quote of record 2's name is missing
+    text = break_record(dump(RECORDS), 2, '"Scheme 2"', '"Scheme 2')
+
+    records, skipped = read(tmp_path, text, chunk_size)
+    assert records == RECORDS[:2] + RECORDS[3:]
+    assert len(skipped) == 1
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('dump', [pretty, compact])
+def test_mismatched_bracket(tmp_path, chunk_size, dump):
+    # Record 1's Benefits array is closed with a brace
+    text = dump(RECORDS)
+    start = text.index('"Scheme 1"')
+    close = text.index(']', start)
+    text = text[:close] + '}' + text[close + 1:]
+
+    records, skipped = read(tmp_path, text, chunk_size)
+    assert records == [RECORDS[0]] + RECORDS[2:]
+    assert len(skipped) == 1
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_record_across_chunk_boundary(tmp_path, chunk_size):
+    # Valid with strict=False: raw newlines inside a string longer than a chunk,
+    # followed by brackets that would end the record if the newline ended the string
+    records = [dict(record) for record in RECORDS]
+    records[1]["Details"] = "line one\n}] more text, " + "y" * 300 + "\nend"
+    text = '[\n' + ',\n'.join(json.dumps(record).replace('\\n', '\n') for record in records) + '\n]'
+
+    read_records, skipped = read(tmp_path, text, chunk_size)
+    assert read_records == records
+    assert skipped == []
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_malformed_record_across_chunk_boundary(tmp_path, chunk_size):
+    records = [dict(record) for record in RECORDS]
+    records[1]["Details"] = "z" * 300
+    text = break_record(pretty(records), 1, '"Details":', '"Details"')
+
+    read_records, skipped = read(tmp_path, text, chunk_size)
+    assert read_records == [records[0]] + records[2:]
+    assert len(skipped) == 1
+    assert text[skipped[0].offset] == '{' and text[skipped[0].offset + skipped[0].length - 1] == '}'